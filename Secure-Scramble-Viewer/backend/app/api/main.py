@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field
+from app.core import metrics, profiling
 from app.core.config import settings
-from app.db.database import init_db
+from app.core.workers import worker_pool
+from app.db.database import init_db, pool_stats
 from app.api import routes
 
 app = FastAPI(title="SecureScramble Viewer API", version="1.0.0")
@@ -15,10 +20,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request timing and in-flight count for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Opt-in request profiling; outermost so writing a dump isn't counted as request time
+profiler = profiling.Profiler(
+    settings.PROFILE_DIR,
+    admin_token=settings.ADMIN_TOKEN,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    keep=settings.PROFILE_KEEP
+)
+app.add_middleware(profiling.ProfilingMiddleware, profiler=profiler)
+
 # Initialize database
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    await init_db()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    worker_pool.shutdown()
 
 # Include routes
 app.include_router(routes.router, prefix="/api")
@@ -30,3 +51,71 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/stats")
+async def stats():
+    return {
+        "key_cache": routes.encryptor.key_cache.stats(),
+        "plaintext_cache": routes.plaintext_cache.stats() if routes.plaintext_cache else None,
+        "file_record_cache": routes.record_cache.stats(),
+        "db_pool": pool_stats()
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    key_cache = routes.encryptor.key_cache.stats()
+    metrics.KEY_CACHE_LOOKUPS.set(key_cache["hits"], result="hit")
+    metrics.KEY_CACHE_LOOKUPS.set(key_cache["misses"], result="miss")
+    metrics.KEY_CACHE_ENTRIES.set(key_cache["size"])
+    
+    if routes.plaintext_cache is not None:
+        plaintext_cache = routes.plaintext_cache.stats()
+        for result, key in (("hit", "hits"), ("shared_hit", "shared_hits"), ("miss", "misses")):
+            metrics.PLAINTEXT_CACHE_LOOKUPS.set(plaintext_cache[key], result=result)
+        metrics.PLAINTEXT_CACHE_BYTES.set(plaintext_cache["bytes"])
+    
+    record_cache = routes.record_cache.stats()
+    metrics.FILE_RECORD_CACHE_LOOKUPS.set(record_cache["hits"], result="hit")
+    metrics.FILE_RECORD_CACHE_LOOKUPS.set(record_cache["misses"], result="miss")
+    metrics.FILE_RECORD_CACHE_ENTRIES.set(record_cache["size"])
+    
+    db_pool = pool_stats()
+    for state in ("size", "checked_out", "overflow"):
+        if state in db_pool:
+            metrics.DB_POOL_CONNECTIONS.set(db_pool[state], state=state)
+    
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+class ProfilingUpdate(BaseModel):
+    sample_rate: float = Field(..., ge=0, le=1)
+
+def _profiling_status() -> dict:
+    return {
+        "sample_rate": profiler.sample_rate,
+        "profiled_requests": profiler.profiled_requests,
+        "profiles": profiler.list_profiles()
+    }
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling():
+    """Current sample rate and the stored profile dumps, newest first"""
+    return _profiling_status()
+
+@app.put("/admin/profiling", dependencies=[Depends(require_admin)])
+async def update_profiling(body: ProfilingUpdate):
+    """Change the sampling rate without a restart"""
+    profiler.sample_rate = body.sample_rate
+    return _profiling_status()
+
+@app.get("/admin/profiling/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
+    """Fetch one pstats dump"""
+    path = profiler.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
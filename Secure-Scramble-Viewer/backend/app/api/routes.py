@@ -1,151 +1,997 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, Depends, Header, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import delete, insert, literal, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.db.models import EncryptedFile
-from app.utils.encryption import FileEncryption
+from app.db.models import EncryptedFile, StoredBlob, UploadSession
+from app.utils.archive import iter_zip, unique_arcnames
+from app.utils.digest import DigestWriter, file_digest
+from app.utils.encryption import FileEncryption, FileTooLargeError, SSVWriter
+from app.utils.plaintext_cache import DecodedFile, PlaintextCache, RedisPlaintextCache
+from app.utils.record_cache import FileRecord, FileRecordCache
+from app.core import metrics
 from app.core.config import settings
+from app.core.workers import worker_pool
+from app.storage import storage
+import asyncio
+import functools
 import os
+import uuid
+import base64
 import mimetypes
-from typing import List
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
 
 router = APIRouter()
-encryptor = FileEncryption(settings.SECRET_KEY)
+encryptor = FileEncryption(
+    settings.SECRET_KEY,
+    chunk_size=settings.SSV_CHUNK_SIZE,
+    key_cache_size=settings.KEY_CACHE_SIZE,
+    cipher=settings.SSV_CIPHER,
+    parallelism=settings.SSV_CHUNK_THREADS
+)
+
+def _create_plaintext_cache() -> Optional[PlaintextCache]:
+    """Decoded-file cache per PLAINTEXT_CACHE_*, or None when disabled"""
+    shared = None
+    if settings.PLAINTEXT_CACHE_REDIS_URL:
+        shared = RedisPlaintextCache(encryptor.key, settings.PLAINTEXT_CACHE_REDIS_URL)
+    if settings.PLAINTEXT_CACHE_BYTES <= 0 and shared is None:
+        return None
+    return PlaintextCache(
+        settings.PLAINTEXT_CACHE_BYTES,
+        ttl=settings.PLAINTEXT_CACHE_TTL,
+        max_entry_bytes=settings.PLAINTEXT_CACHE_MAX_ENTRY,
+        shared=shared
+    )
+
+plaintext_cache = _create_plaintext_cache()
+record_cache = FileRecordCache(settings.FILE_RECORD_CACHE_SIZE, ttl=settings.FILE_RECORD_CACHE_TTL)
+
+# Read size when streaming stored .ssv blobs untouched
+BLOB_READ_SIZE = 1024 * 1024
+
+# Columns returned by the file listing
+LIST_COLUMNS = (
+    EncryptedFile.id,
+    EncryptedFile.original_filename,
+    EncryptedFile.file_size,
+    EncryptedFile.mime_type,
+    EncryptedFile.upload_date
+)
+
+# Columns snapshotted into the file record cache
+RECORD_COLUMNS = tuple(getattr(EncryptedFile, field) for field in FileRecord._fields)
+
+def _file_summary(row) -> dict:
+    return {
+        "file_id": row.id,
+        "filename": row.original_filename,
+        "size": row.file_size,
+        "mime_type": row.mime_type,
+        "upload_date": row.upload_date.isoformat() if row.upload_date else None
+    }
+
+def _encode_cursor(upload_date: datetime, file_id: str) -> str:
+    """Opaque keyset cursor pointing just past (upload_date, id)"""
+    raw = f"{upload_date.isoformat()}|{file_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        upload_date, file_id = raw.split("|", 1)
+        return datetime.fromisoformat(upload_date), str(uuid.UUID(file_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _canonical_id(file_id: str) -> Optional[str]:
+    """Lower-case dashed form of a file id, or None when it is not a UUID and so cannot exist"""
+    try:
+        return str(uuid.UUID(file_id))
+    except ValueError:
+        return None
+
+def _snapshot(file_record: EncryptedFile) -> FileRecord:
+    return FileRecord(*(getattr(file_record, field) for field in FileRecord._fields))
+
+async def _get_file_record(db: AsyncSession, file_id: str) -> FileRecord:
+    """File metadata from the record cache, reading through to the database on a miss"""
+    key = _canonical_id(file_id)
+    file_record = record_cache.get(key) if key else None
+    
+    if file_record is None and key:
+        generation = record_cache.generation()
+        row = (await db.execute(select(*RECORD_COLUMNS).where(EncryptedFile.id == key))).first()
+        if row:
+            file_record = FileRecord(*row)
+            record_cache.put(key, file_record, generation)
+    
+    if file_record is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_record
+
+def _remove_quietly(path: str):
+    """Remove a partially written file, ignoring errors"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" Range header into a half-open (start, end) pair.
+    Returns None when the header is absent, malformed or not a single byte
+    range, so the full file is sent, and raises 416 when a valid range
+    cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    
+    first, dash, last = range_header[len("bytes="):].strip().partition("-")
+    digits = first + last
+    if not dash or not digits.isascii() or not digits.isdigit():
+        return None
+    
+    if first:
+        start = int(first)
+        end = int(last) + 1 if last else size
+        if last and end <= start:
+            # A last position before the first is invalid syntax, not an unsatisfiable range
+            return None
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size
+    
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size)
+
+def _digest_upload(source, original_filename: str) -> Tuple[str, int]:
+    """Hash an upload spool for dedup, then rewind it for encryption"""
+    with metrics.stage("digest"):
+        digest = encryptor.content_digest(source, original_filename, max_size=settings.MAX_FILE_SIZE)
+    source.seek(0)
+    return digest
+
+async def _reference_blob(db: AsyncSession, content_hash: str, count: int = 1) -> Optional[Tuple[str, Optional[str], Optional[int]]]:
+    """
+    Take references on an existing blob; returns its (filename, ssv digest,
+    ssv size), or None if there is none
+    """
+    result = await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.content_hash == content_hash, StoredBlob.ref_count > 0)
+        .values(ref_count=StoredBlob.ref_count + count)
+        .returning(StoredBlob.encrypted_filename, StoredBlob.ssv_digest, StoredBlob.ssv_size)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row else None
+
+async def _release_blob(db: AsyncSession, content_hash: str) -> bool:
+    """Drop a reference on a blob; returns True when it was the last one"""
+    await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.content_hash == content_hash)
+        .values(ref_count=StoredBlob.ref_count - 1)
+    )
+    result = await db.execute(
+        delete(StoredBlob).where(StoredBlob.content_hash == content_hash, StoredBlob.ref_count <= 0)
+    )
+    return result.rowcount > 0
+
+def _encrypt_to_storage(source, encrypted_filename: str, original_filename: str) -> Tuple[str, int]:
+    """
+    Stream an upload spool through the encryptor straight into blob storage.
+    Returns the stored .ssv's SHA-256 and size.
+    """
+    # Always from the start: a retried upload re-encrypts a spool already read to EOF
+    source.seek(0)
+    with storage.open_write(encrypted_filename) as f, metrics.stage("encrypt"):
+        dest = DigestWriter(f)
+        plaintext_size = encryptor.encrypt_stream(
+            source,
+            dest,
+            original_filename,
+            max_size=settings.MAX_FILE_SIZE
+        )
+    metrics.BYTES_ENCRYPTED.inc(plaintext_size)
+    return dest.hexdigest(), dest.size
+
+def _open_reader(encrypted_filename: str):
+    """Open a stored .ssv and parse its header; returns (reader, source)"""
+    source = storage.open_read(encrypted_filename)
+    try:
+        with metrics.stage("open"):
+            return encryptor.open_ssv(source), source
+    except Exception:
+        source.close()
+        raise
+
+def _open_upload(source):
+    """Parse the header of an uploaded .ssv spool"""
+    with metrics.stage("open"):
+        return encryptor.open_ssv(source)
+
+def _open_blob(encrypted_filename: str):
+    """Open a stored blob for raw reading; returns (source, size)"""
+    source = storage.open_read(encrypted_filename)
+    size = source.seek(0, os.SEEK_END)
+    source.seek(0)
+    return source, size
+
+def _read_blob_range(source, start: int, end: int) -> Iterator[bytes]:
+    """Read bytes [start, end) of a stored blob in BLOB_READ_SIZE blocks"""
+    source.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = source.read(min(BLOB_READ_SIZE, remaining))
+        if not block:
+            return
+        remaining -= len(block)
+        yield block
+
+async def _stream_blob(source, start: int, end: int) -> AsyncIterator[bytes]:
+    """Send part or all of a stored blob as-is, reading it on the worker pool"""
+    try:
+        async for block in worker_pool.iterate(_read_blob_range(source, start, end)):
+            yield block
+    finally:
+        source.close()
+
+def _stat_local_blob(encrypted_filename: str) -> Tuple[Optional[str], Optional[os.stat_result]]:
+    """
+    Path and stat of a blob on local disk. The path is None when storage is
+    not local; the stat is None when the file is missing.
+    """
+    path = storage.local_path(encrypted_filename)
+    if path is None:
+        return None, None
+    try:
+        return path, os.stat(path)
+    except FileNotFoundError:
+        return path, None
+
+def _http_date(value: datetime) -> str:
+    # SQLite hands back naive UTC timestamps
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _validators(file_record: FileRecord) -> dict:
+    """ETag (the .ssv's SHA-256, when recorded) and Last-Modified (the upload date)"""
+    headers = {}
+    if file_record.ssv_digest:
+        headers["ETag"] = f'"{file_record.ssv_digest}"'
+    if file_record.upload_date:
+        headers["Last-Modified"] = _http_date(file_record.upload_date)
+    return headers
+
+def _not_modified(validators: dict, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """RFC 9110 conditional GET: If-None-Match (weak comparison) wins over If-Modified-Since"""
+    if if_none_match is not None:
+        etag = validators.get("ETag")
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or (etag is not None and any(tag.removeprefix("W/") == etag for tag in tags))
+    
+    if if_modified_since is not None and "Last-Modified" in validators:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(validators["Last-Modified"])
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return modified <= since
+    
+    return False
+
+def _if_range_matches(if_range: Optional[str], validators: dict) -> bool:
+    """Whether a Range may be honoured: If-Range must strongly match the ETag or equal Last-Modified"""
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == validators.get("ETag")
+    return if_range == validators.get("Last-Modified")
+
+async def _gather_all(jobs) -> list:
+    """
+    Await every job before re-raising the first failure, so no worker is
+    still writing a file when the caller cleans up.
+    """
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+def _timed_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Time and count each chunk as it is decrypted"""
+    while True:
+        with metrics.stage("decrypt_chunk"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        metrics.BYTES_DECRYPTED.inc(len(chunk))
+        yield chunk
+
+async def _stream(chunks: Iterator[bytes], on_close: Optional[Callable[[], None]] = None) -> AsyncIterator[bytes]:
+    """Decrypt chunks on the worker pool and release the source when streaming ends"""
+    try:
+        async for chunk in worker_pool.iterate_crypto(_timed_chunks(chunks)):
+            # Readers yield any bytes-like object; ASGI bodies must be bytes
+            yield chunk if isinstance(chunk, bytes) else bytes(chunk)
+    finally:
+        if on_close:
+            on_close()
+
+def _plaintext_range(filename: str, size: int, range_header: Optional[str]) -> Tuple[int, int, int, dict]:
+    """Status, byte range and headers for sending a decoded file of size bytes"""
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Accept-Ranges": "bytes"
+    }
+    status_code = 200
+    start, end = 0, size
+    
+    byte_range = _parse_range(range_header, size)
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    
+    headers["Content-Length"] = str(end - start)
+    return status_code, start, end, headers
+
+def _decrypted_response(
+    reader,
+    mime_type: str,
+    range_header: Optional[str],
+    on_close: Optional[Callable[[], None]] = None
+) -> StreamingResponse:
+    """Stream plaintext from an .ssv reader, decrypting only the chunks that are sent"""
+    status_code, start, end, headers = _plaintext_range(reader.filename, reader.size, range_header)
+    
+    return StreamingResponse(
+        _stream(reader.iter_range(start, end), on_close),
+        status_code=status_code,
+        media_type=mime_type,
+        headers=headers
+    )
+
+def _decrypt_whole(encrypted_filename: str) -> DecodedFile:
+    """Decrypt a stored .ssv completely into memory"""
+    reader, source = _open_reader(encrypted_filename)
+    try:
+        return DecodedFile(reader.filename, b"".join(_timed_chunks(reader.iter_range())))
+    finally:
+        source.close()
+
+async def _plaintext_cache_call(func: Callable, *args):
+    """Plaintext cache calls only block when a shared tier is configured"""
+    if plaintext_cache.shared is None:
+        return func(*args)
+    return await worker_pool.run(func, *args)
+
+async def _decode_cached(file_record: FileRecord) -> DecodedFile:
+    """Serve a file from the plaintext cache, decrypting and caching all of it on a miss"""
+    decoded = plaintext_cache.get_local(file_record.id)
+    if decoded is None:
+        decoded = await _plaintext_cache_call(plaintext_cache.get_shared, file_record.id)
+    if decoded is None:
+        # A delete that lands while this decrypts must not be undone by the put below
+        generation = plaintext_cache.generation()
+        decoded = await worker_pool.run_crypto(_decrypt_whole, file_record.encrypted_filename)
+        await _plaintext_cache_call(plaintext_cache.put, file_record.id, decoded, generation)
+    return decoded
+
+def _cached_response(decoded: DecodedFile, mime_type: str, range_header: Optional[str]) -> Response:
+    """Send a decoded file held in memory, honouring a single byte range"""
+    size = len(decoded.data)
+    status_code, start, end, headers = _plaintext_range(decoded.filename, size, range_header)
+    body = decoded.data if (start, end) == (0, size) else decoded.data[start:end]
+    return Response(body, status_code=status_code, media_type=mime_type, headers=headers)
 
 @router.post("/upload")
 async def upload_file(
+    request: Request,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload and encrypt a file"""
+    """Upload and encrypt a file, reusing the stored blob when the content was seen before"""
+    metrics.observe_since_request_start(request, "multipart")
+    file_id = str(uuid.uuid4())
+    stored_filename = None
+    
     try:
-        # Read file data
-        file_data = await file.read()
+        content_hash, file_size = await worker_pool.run_crypto(_digest_upload, file.file, file.filename)
         
-        # Check file size
-        if len(file_data) > settings.MAX_FILE_SIZE:
-            raise HTTPException(status_code=413, detail="File too large")
+        for attempt in range(2):
+            blob = await _reference_blob(db, content_hash)
+            
+            if blob is None:
+                # New content: encrypt on the worker pool so other requests keep being served
+                encrypted_filename = f"{file_id}.ssv"
+                ssv_digest, ssv_size = await worker_pool.run_crypto(
+                    _encrypt_to_storage, file.file, encrypted_filename, file.filename
+                )
+                stored_filename = encrypted_filename
+                db.add(StoredBlob(
+                    content_hash=content_hash,
+                    encrypted_filename=encrypted_filename,
+                    ref_count=1,
+                    ssv_digest=ssv_digest,
+                    ssv_size=ssv_size
+                ))
+            else:
+                encrypted_filename, ssv_digest, ssv_size = blob
+            
+            file_record = EncryptedFile(
+                id=file_id,
+                original_filename=file.filename,
+                encrypted_filename=encrypted_filename,
+                file_size=file_size,
+                mime_type=file.content_type,
+                content_hash=content_hash,
+                ssv_digest=ssv_digest,
+                ssv_size=ssv_size
+            )
+            
+            # Save to database
+            db.add(file_record)
+            try:
+                with metrics.stage("db_commit"):
+                    await db.commit()
+                break
+            except IntegrityError:
+                # A concurrent upload of the same content stored its blob first
+                await db.rollback()
+                if stored_filename:
+                    await worker_pool.run(storage.delete, stored_filename)
+                    stored_filename = None
+                if attempt:
+                    raise
         
-        # Encrypt and create SSV file
-        ssv_data = encryptor.create_ssv_file(file_data, file.filename)
-        
-        # Generate unique filename
-        file_record = EncryptedFile(
-            original_filename=file.filename,
-            encrypted_filename=f"{EncryptedFile().id}.ssv",
-            file_size=len(file_data),
-            mime_type=file.content_type
+        await db.refresh(file_record)
+        record_cache.put(file_id, _snapshot(file_record))
+        return file_record.to_dict()
+    
+    except FileTooLargeError:
+        if stored_filename:
+            await worker_pool.run(storage.delete, stored_filename)
+        raise HTTPException(status_code=413, detail="File too large")
+    
+    except Exception as e:
+        if stored_filename:
+            await worker_pool.run(storage.delete, stored_filename)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/upload/batch")
+async def upload_files(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload and encrypt many files in one request. Parts are hashed and
+    encrypted concurrently on the worker pool and every record is inserted
+    in a single transaction, so the batch is stored entirely or not at all.
+    """
+    metrics.observe_since_request_start(request, "multipart")
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {settings.MAX_BATCH_FILES} files per batch")
+    
+    file_ids = [str(uuid.uuid4()) for _ in files]
+    written: List[str] = []
+    
+    async def encrypt(index: int) -> Tuple[str, str, int]:
+        encrypted_filename = f"{file_ids[index]}.ssv"
+        ssv_digest, ssv_size = await worker_pool.run_crypto(
+            _encrypt_to_storage, files[index].file, encrypted_filename, files[index].filename
+        )
+        written.append(encrypted_filename)
+        return encrypted_filename, ssv_digest, ssv_size
+    
+    async def discard_written():
+        for encrypted_filename in written:
+            await worker_pool.run(storage.delete, encrypted_filename)
+        written.clear()
+    
+    try:
+        digests = await _gather_all(
+            worker_pool.run_crypto(_digest_upload, upload.file, upload.filename) for upload in files
         )
         
-        # Save encrypted file
-        encrypted_path = os.path.join(settings.STORAGE_PATH, file_record.encrypted_filename)
-        with open(encrypted_path, 'wb') as f:
-            f.write(ssv_data)
+        # Identical parts within the batch share one blob, encrypted from the first of them
+        parts_by_hash = {}
+        for index, (content_hash, _) in enumerate(digests):
+            parts_by_hash.setdefault(content_hash, []).append(index)
         
-        # Save to database
-        db.add(file_record)
-        db.commit()
-        db.refresh(file_record)
+        for attempt in range(2):
+            existing = await db.scalars(
+                select(StoredBlob.content_hash)
+                .where(StoredBlob.content_hash.in_(parts_by_hash), StoredBlob.ref_count > 0)
+            )
+            # content hash -> (encrypted filename, ssv digest, ssv size)
+            blobs = {}
+            for content_hash in existing.all():
+                blob = await _reference_blob(db, content_hash, len(parts_by_hash[content_hash]))
+                if blob:
+                    blobs[content_hash] = blob
+            
+            new_hashes = [content_hash for content_hash in parts_by_hash if content_hash not in blobs]
+            new_blobs = await _gather_all(
+                encrypt(parts_by_hash[content_hash][0]) for content_hash in new_hashes
+            )
+            for content_hash, (encrypted_filename, ssv_digest, ssv_size) in zip(new_hashes, new_blobs):
+                blobs[content_hash] = (encrypted_filename, ssv_digest, ssv_size)
+                db.add(StoredBlob(
+                    content_hash=content_hash,
+                    encrypted_filename=encrypted_filename,
+                    ref_count=len(parts_by_hash[content_hash]),
+                    ssv_digest=ssv_digest,
+                    ssv_size=ssv_size
+                ))
+            
+            rows = [
+                {
+                    "id": file_id,
+                    "original_filename": upload.filename,
+                    "encrypted_filename": blobs[content_hash][0],
+                    "file_size": file_size,
+                    "mime_type": upload.content_type,
+                    "content_hash": content_hash,
+                    "ssv_digest": blobs[content_hash][1],
+                    "ssv_size": blobs[content_hash][2]
+                }
+                for file_id, upload, (content_hash, file_size) in zip(file_ids, files, digests)
+            ]
+            
+            try:
+                await db.flush()
+                # One multi-row INSERT ... RETURNING for the whole batch
+                file_records = (await db.scalars(insert(EncryptedFile).returning(EncryptedFile), rows)).all()
+                with metrics.stage("db_commit"):
+                    await db.commit()
+                break
+            except IntegrityError:
+                # A concurrent upload of the same content stored its blob first
+                await db.rollback()
+                await discard_written()
+                if attempt:
+                    raise
         
-        return file_record.to_dict()
+        for file_record in file_records:
+            record_cache.put(file_record.id, _snapshot(file_record))
+        return {"files": [file_record.to_dict() for file_record in file_records]}
+    
+    except FileTooLargeError:
+        await discard_written()
+        raise HTTPException(status_code=413, detail="File too large")
     
     except Exception as e:
+        await discard_written()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/files")
-async def list_files(db: Session = Depends(get_db)):
-    """List all uploaded files"""
-    files = db.query(EncryptedFile).order_by(EncryptedFile.upload_date.desc()).all()
-    return [file.to_dict() for file in files]
+async def list_files(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    mime_type: Optional[str] = None,
+    filename_prefix: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """List uploaded files newest first, one keyset page at a time"""
+    query = select(*LIST_COLUMNS)
+    
+    if mime_type:
+        query = query.where(EncryptedFile.mime_type == mime_type)
+    if filename_prefix:
+        query = query.where(EncryptedFile.original_filename.startswith(filename_prefix, autoescape=True))
+    if cursor:
+        upload_date, file_id = _decode_cursor(cursor)
+        # Row-value comparison so Postgres can seek straight into the (upload_date, id) index
+        query = query.where(
+            tuple_(EncryptedFile.upload_date, EncryptedFile.id)
+            < tuple_(literal(upload_date, EncryptedFile.upload_date.type), literal(file_id, EncryptedFile.id.type))
+        )
+    
+    query = query.order_by(EncryptedFile.upload_date.desc(), EncryptedFile.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].upload_date, rows[-1].id)
+    
+    return {
+        "files": [_file_summary(row) for row in rows],
+        "next_cursor": next_cursor
+    }
 
 @router.get("/download/{file_id}")
-async def download_file(file_id: str, db: Session = Depends(get_db)):
-    """Download encrypted .ssv file"""
-    file_record = db.query(EncryptedFile).filter(EncryptedFile.id == file_id).first()
+async def download_file(
+    file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download encrypted .ssv file. Unchanged files revalidate with a 304 from
+    the database record alone, and interrupted downloads resume with Range.
+    """
+    file_record = await _get_file_record(db, file_id)
     
-    if not file_record:
-        raise HTTPException(status_code=404, detail="File not found")
+    validators = _validators(file_record)
+    if _not_modified(validators, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=validators)
+    
+    download_name = f"{os.path.splitext(file_record.original_filename)[0]}.ssv"
+    headers = {**validators, "Accept-Ranges": "bytes"}
+    if not _if_range_matches(if_range, validators):
+        range_header = None
     
-    encrypted_path = os.path.join(settings.STORAGE_PATH, file_record.encrypted_filename)
+    if not range_header:
+        # Resolving the path probes the disk (sharded and legacy locations), so do it off the event loop
+        local_path, stat_result = await worker_pool.run(_stat_local_blob, file_record.encrypted_filename)
+        if local_path:
+            if stat_result is None:
+                raise HTTPException(status_code=404, detail="File not found on disk")
+            
+            # Local blobs go out with sendfile
+            return FileResponse(
+                local_path,
+                media_type="application/octet-stream",
+                filename=download_name,
+                headers=headers,
+                stat_result=stat_result
+            )
     
-    if not os.path.exists(encrypted_path):
-        raise HTTPException(status_code=404, detail="File not found on disk")
+    try:
+        source, size = await worker_pool.run(_open_blob, file_record.encrypted_filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+    
+    status_code = 200
+    start, end = 0, size
+    try:
+        byte_range = _parse_range(range_header, size)
+    except HTTPException:
+        source.close()
+        raise
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
     
-    return FileResponse(
-        encrypted_path,
+    headers["Content-Disposition"] = f"attachment; filename={download_name}"
+    headers["Content-Length"] = str(end - start)
+    
+    return StreamingResponse(
+        _stream_blob(source, start, end),
+        status_code=status_code,
         media_type="application/octet-stream",
-        filename=f"{os.path.splitext(file_record.original_filename)[0]}.ssv"
+        headers=headers
     )
 
-@router.post("/decode")
-async def decode_file(file_id: str, db: Session = Depends(get_db)):
-    """Decode and return original file (for testing)"""
-    file_record = db.query(EncryptedFile).filter(EncryptedFile.id == file_id).first()
+class BatchDownloadRequest(BaseModel):
+    file_ids: List[str] = Field(..., min_length=1)
+
+@router.post("/download/batch")
+async def download_files(body: BatchDownloadRequest, db: AsyncSession = Depends(get_db)):
+    """Stream several encrypted .ssv files as one ZIP, built on the fly"""
+    file_ids = list(dict.fromkeys(body.file_ids))
+    if len(file_ids) > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {settings.MAX_BATCH_FILES} files per batch")
     
-    if not file_record:
-        raise HTTPException(status_code=404, detail="File not found")
+    keys = {file_id: _canonical_id(file_id) for file_id in file_ids}
+    records = {}
+    for key in keys.values():
+        file_record = record_cache.get(key) if key else None
+        if file_record:
+            records[key] = file_record
     
-    encrypted_path = os.path.join(settings.STORAGE_PATH, file_record.encrypted_filename)
+    # One query for whatever the record cache did not hold
+    uncached = [key for key in keys.values() if key and key not in records]
+    if uncached:
+        generation = record_cache.generation()
+        rows = (await db.execute(select(*RECORD_COLUMNS).where(EncryptedFile.id.in_(uncached)))).all()
+        for row in rows:
+            file_record = FileRecord(*row)
+            records[file_record.id] = file_record
+            record_cache.put(file_record.id, file_record, generation)
     
-    if not os.path.exists(encrypted_path):
-        raise HTTPException(status_code=404, detail="File not found on disk")
+    missing = [file_id for file_id in file_ids if keys[file_id] not in records]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Files not found: {', '.join(missing)}")
+    
+    file_records = [records[keys[file_id]] for file_id in file_ids]
     
     try:
-        # Read and decrypt
-        with open(encrypted_path, 'rb') as f:
-            ssv_data = f.read()
-        
-        original_data, original_filename = encryptor.parse_ssv_file(ssv_data)
-        
-        # Determine mime type
-        mime_type = file_record.mime_type or mimetypes.guess_type(original_filename)[0] or "application/octet-stream"
+        sizes = await worker_pool.run(lambda: [storage.size(record.encrypted_filename) for record in file_records])
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found in storage")
+    
+    arcnames = unique_arcnames((file_record.original_filename for file_record in file_records), ".ssv")
+    members = [
+        (arcname, size, functools.partial(storage.open_read, file_record.encrypted_filename), file_record.upload_date)
+        for arcname, size, file_record in zip(arcnames, sizes, file_records)
+    ]
+    
+    return StreamingResponse(
+        worker_pool.iterate(iter_zip(members)),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=ssv-files.zip"}
+    )
+
+@router.api_route("/decode", methods=["GET", "POST"])
+async def decode_file(
+    file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Decode and stream the original file, honouring single byte ranges"""
+    file_record = await _get_file_record(db, file_id)
+    
+    if plaintext_cache is not None and plaintext_cache.cacheable(file_record.file_size):
+        # Small enough to keep: serve repeat decodes from memory
+        try:
+            decoded = await _decode_cached(file_record)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found in storage")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
         
-        return StreamingResponse(
-            iter([original_data]),
-            media_type=mime_type,
-            headers={"Content-Disposition": f"attachment; filename={original_filename}"}
-        )
+        mime_type = file_record.mime_type or mimetypes.guess_type(decoded.filename)[0] or "application/octet-stream"
+        return _cached_response(decoded, mime_type, range_header)
     
+    try:
+        reader, source = await worker_pool.run_crypto(_open_reader, file_record.encrypted_filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found in storage")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
+    
+    try:
+        # Determine mime type
+        mime_type = file_record.mime_type or mimetypes.guess_type(reader.filename)[0] or "application/octet-stream"
+        
+        return _decrypted_response(reader, mime_type, range_header, on_close=source.close)
+    
+    except Exception:
+        source.close()
+        raise
 
 @router.post("/decode-upload")
-async def decode_uploaded_file(file: UploadFile = File(...)):
-    """Upload a .ssv file and decode it"""
+async def decode_uploaded_file(
+    request: Request,
+    file: UploadFile = File(...),
+    range_header: Optional[str] = Header(None, alias="Range")
+):
+    """Upload a .ssv file and stream back the decoded original"""
+    metrics.observe_since_request_start(request, "multipart")
     try:
-        # Read the .ssv file
-        ssv_data = await file.read()
-        
-        # Decode it
-        original_data, original_filename = encryptor.parse_ssv_file(ssv_data)
+        # Decrypt straight from the upload spool
+        reader = await worker_pool.run_crypto(_open_upload, file.file)
         
         # Determine mime type
-        mime_type = mimetypes.guess_type(original_filename)[0] or "application/octet-stream"
+        mime_type = mimetypes.guess_type(reader.filename)[0] or "application/octet-stream"
         
-        return StreamingResponse(
-            iter([original_data]),
-            media_type=mime_type,
-            headers={"Content-Disposition": f"attachment; filename={original_filename}"}
-        )
+        return _decrypted_response(reader, mime_type, range_header)
+    
+    except HTTPException:
+        raise
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
 
 @router.delete("/files/{file_id}")
-async def delete_file(file_id: str, db: Session = Depends(get_db)):
+async def delete_file(file_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a file"""
-    file_record = db.query(EncryptedFile).filter(EncryptedFile.id == file_id).first()
+    key = _canonical_id(file_id)
+    file_record = None
+    if key:
+        # Delete from database in one statement, without loading the record first
+        file_record = (await db.execute(
+            delete(EncryptedFile)
+            .where(EncryptedFile.id == key)
+            .returning(EncryptedFile.encrypted_filename, EncryptedFile.content_hash)
+        )).first()
     
     if not file_record:
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Delete from disk
-    encrypted_path = os.path.join(settings.STORAGE_PATH, file_record.encrypted_filename)
-    if os.path.exists(encrypted_path):
-        os.remove(encrypted_path)
+    # Drop this record's reference on a shared blob
+    unlink = True
+    if file_record.content_hash:
+        unlink = await _release_blob(db, file_record.content_hash)
+    await db.commit()
     
-    # Delete from database
-    db.delete(file_record)
-    db.commit()
+    record_cache.invalidate(key)
+    if plaintext_cache is not None:
+        await _plaintext_cache_call(plaintext_cache.invalidate, key)
+    
+    # Delete from storage once nothing references it
+    if unlink:
+        await worker_pool.run(storage.delete, file_record.encrypted_filename)
     
     return {"message": "File deleted successfully"}
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1)
+    size: int = Field(..., ge=0)
+    mime_type: Optional[str] = None
+
+def _partial_path(upload_id: str) -> str:
+    return os.path.join(settings.STORAGE_PATH, f"{upload_id}.ssv.part")
+
+def _create_partial(upload_id: str, original_filename: str):
+    """Write the .ssv header for a new resumable upload"""
+    with open(_partial_path(upload_id), 'wb') as f:
+        encryptor.new_writer(f, original_filename)
+
+def _resume_partial(upload_id: str) -> SSVWriter:
+    f = open(_partial_path(upload_id), 'r+b')
+    try:
+        return encryptor.resume_writer(f)
+    except Exception:
+        f.close()
+        raise
+
+def _write_chunk(writer: SSVWriter, index: int, chunk: bytes):
+    with metrics.stage("encrypt_chunk"):
+        writer.write_chunk_at(index, chunk)
+    metrics.BYTES_ENCRYPTED.inc(len(chunk))
+
+def _finish_partial(upload_id: str, total_size: int, encrypted_filename: str) -> Tuple[str, int]:
+    """
+    Write the trailer and move the completed .ssv into blob storage.
+    Returns the .ssv's SHA-256 and size.
+    """
+    with open(_partial_path(upload_id), 'r+b') as f:
+        encryptor.resume_writer(f).finish(total_size)
+    # Chunks were written out of order, so hash the sealed file in one pass
+    ssv_digest, ssv_size = file_digest(_partial_path(upload_id))
+    storage.put_file(encrypted_filename, _partial_path(upload_id))
+    return ssv_digest, ssv_size
+
+async def _get_upload_session(db: AsyncSession, upload_id: str) -> UploadSession:
+    upload = await db.get(UploadSession, upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+@router.post("/uploads")
+async def create_upload_session(body: UploadSessionCreate, db: AsyncSession = Depends(get_db)):
+    """Start a resumable upload; chunks are then PUT at chunk_size-aligned offsets"""
+    if body.size > settings.MAX_RESUMABLE_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+    
+    upload = UploadSession(
+        id=str(uuid.uuid4()),
+        original_filename=body.filename,
+        mime_type=body.mime_type,
+        total_size=body.size,
+        chunk_size=encryptor.chunk_size,
+        received_size=0
+    )
+    await worker_pool.run_crypto(_create_partial, upload.id, upload.original_filename)
+    
+    db.add(upload)
+    await db.commit()
+    return upload.to_dict()
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_session(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """Report how much of a resumable upload has been received"""
+    upload = await _get_upload_session(db, upload_id)
+    return upload.to_dict()
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Receive raw bytes starting at offset and encrypt them into place chunk by
+    chunk. The body must be a multiple of chunk_size unless it ends the file.
+    Progress is recorded even if the connection drops mid-request.
+    """
+    upload = await _get_upload_session(db, upload_id)
+    chunk_size = upload.chunk_size
+    
+    if offset % chunk_size or offset > upload.received_size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload must resume at offset {upload.received_size}"
+        )
+    
+    try:
+        writer = await worker_pool.run_crypto(_resume_partial, upload_id)
+    except FileNotFoundError:
+        # Aborted or finalized since the session was looked up
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    position = offset
+    buffer = bytearray()
+    
+    try:
+        async for piece in request.stream():
+            buffer += piece
+            if position + len(buffer) > upload.total_size:
+                raise HTTPException(status_code=413, detail="Chunk exceeds declared upload size")
+            
+            while len(buffer) >= chunk_size:
+                await worker_pool.run_crypto(_write_chunk, writer, position // chunk_size, bytes(buffer[:chunk_size]))
+                del buffer[:chunk_size]
+                position += chunk_size
+        
+        if buffer:
+            if position + len(buffer) != upload.total_size:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Only the final chunk may be shorter than {chunk_size} bytes"
+                )
+            await worker_pool.run_crypto(_write_chunk, writer, position // chunk_size, bytes(buffer))
+            position += len(buffer)
+    
+    finally:
+        await worker_pool.run(writer.dest.close)
+        if position > upload.received_size:
+            upload.received_size = position
+            await db.commit()
+    
+    return upload.to_dict()
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """Seal a fully received upload and register it as a stored file"""
+    upload = await _get_upload_session(db, upload_id)
+    
+    if upload.received_size != upload.total_size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {upload.received_size} of {upload.total_size} bytes received"
+        )
+    
+    encrypted_filename = f"{upload_id}.ssv"
+    ssv_digest, ssv_size = await worker_pool.run_crypto(_finish_partial, upload_id, upload.total_size, encrypted_filename)
+    
+    file_record = EncryptedFile(
+        id=upload_id,
+        original_filename=upload.original_filename,
+        encrypted_filename=encrypted_filename,
+        file_size=upload.total_size,
+        mime_type=upload.mime_type,
+        ssv_digest=ssv_digest,
+        ssv_size=ssv_size
+    )
+    db.add(file_record)
+    await db.delete(upload)
+    await db.commit()
+    await db.refresh(file_record)
+    record_cache.put(file_record.id, _snapshot(file_record))
+    
+    return file_record.to_dict()
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str, db: AsyncSession = Depends(get_db)):
+    """Abandon a resumable upload and discard what was received"""
+    upload = await _get_upload_session(db, upload_id)
+    
+    await db.delete(upload)
+    await db.commit()
+    await worker_pool.run(_remove_quietly, _partial_path(upload_id))
+    
+    return {"message": "Upload aborted"}
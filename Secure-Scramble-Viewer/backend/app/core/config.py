@@ -1,13 +1,45 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
-    STORAGE_PATH: str = "./storage"
+    STORAGE_BACKEND: str = "local"  # "local" or "s3"
+    STORAGE_PATH: str = "./storage"  # local blob root; also holds in-progress resumable uploads
+    STORAGE_SHARD_DEPTH: int = 2  # levels of hash-prefixed subdirectories for local blobs
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://minio:9000 for MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PART_SIZE: int = 8388608  # 8MB multipart upload parts
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     MAX_FILE_SIZE: int = 104857600  # 100MB
+    MAX_RESUMABLE_UPLOAD_SIZE: int = 53687091200  # 50GB via /api/uploads
+    MAX_BATCH_FILES: int = 1000  # parts per batch upload / files per batch download
+    SSV_CHUNK_SIZE: int = 1048576  # 1MB plaintext per .ssv chunk
+    SSV_CIPHER: str = "aes-256-gcm"  # aes-256-gcm / chacha20-poly1305 (v3) or aes-256-cbc (v2)
+    SSV_CHUNK_THREADS: int = 4  # chunks of one file encrypted/decrypted in parallel
+    KEY_CACHE_SIZE: int = 1024  # derived file keys kept in memory (0 disables)
+    PLAINTEXT_CACHE_BYTES: int = 0  # decrypted files kept in memory for repeat decodes (0 disables)
+    PLAINTEXT_CACHE_TTL: int = 300  # seconds a decrypted file may be served from cache
+    PLAINTEXT_CACHE_MAX_ENTRY: int = 16777216  # 16MB; larger files are always streamed
+    PLAINTEXT_CACHE_REDIS_URL: str = ""  # optional shared tier, e.g. redis://redis:6379/0
+    FILE_RECORD_CACHE_SIZE: int = 10000  # file metadata records kept in memory (0 disables)
+    FILE_RECORD_CACHE_TTL: int = 30  # seconds; bounds staleness after a delete on another process
+    WORKER_THREADS: int = 8  # thread pool for crypto and blocking I/O
+    MAX_CONCURRENT_CRYPTO: int = 4  # in-flight encrypt/decrypt jobs
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a pooled connection
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    ADMIN_TOKEN: str = ""  # enables /admin endpoints and X-Profile requests; empty disables them
+    PROFILE_DIR: str = "./profiles"  # where pstats dumps of profiled requests are written
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of all requests profiled (also settable via /admin/profiling)
+    PROFILE_KEEP: int = 100  # newest dumps kept in PROFILE_DIR
     
     @property
     def allowed_origins_list(self) -> List[str]:
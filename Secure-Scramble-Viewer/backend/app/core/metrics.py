@@ -0,0 +1,296 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; fine at the low end, where key-cache hits and small DB queries land
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """A named family of time series, one per combination of label values"""
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+    
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+        return tuple(str(labels[name]) for name in self.labels)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            lines.extend(self._render_series(key, value))
+        return lines
+    
+    def _render_series(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonic total"""
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def set(self, value: float, **labels):
+        """Publish a total that is counted elsewhere (e.g. the key cache's own counters)"""
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+    
+    kind = "gauge"
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed upper bounds, plus their count and sum"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (the last is +Inf), then the sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+    
+    def _render_series(self, key: Tuple[str, ...], series) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series):
+            cumulative += count
+            labels = _format_labels(self.labels, key, f'le="{_format_value(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+HTTP_REQUESTS = Counter("ssv_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "ssv_http_request_duration_seconds",
+    "Time from request arrival to the last response byte",
+    ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("ssv_http_requests_in_flight", "HTTP requests currently being served")
+STAGE_SECONDS = Histogram(
+    "ssv_stage_duration_seconds",
+    "Time spent in each upload/decode pipeline stage, excluding storage I/O and nested stages",
+    ("stage",)
+)
+BYTES_ENCRYPTED = Counter("ssv_encrypted_bytes_total", "Plaintext bytes encrypted")
+BYTES_DECRYPTED = Counter("ssv_decrypted_bytes_total", "Plaintext bytes decrypted")
+STORAGE_SECONDS = Histogram(
+    "ssv_storage_operation_duration_seconds",
+    "Blob storage latency; read and write are the total I/O time of one opened blob",
+    ("backend", "operation")
+)
+DB_QUERY_SECONDS = Histogram("ssv_db_query_duration_seconds", "Database statement latency", ("statement",))
+DB_POOL_WAIT_SECONDS = Histogram("ssv_db_pool_wait_seconds", "Time spent waiting for a pooled database connection")
+DB_POOL_CONNECTIONS = Gauge("ssv_db_pool_connections", "Database pool occupancy at scrape time", ("state",))
+KEY_CACHE_LOOKUPS = Counter("ssv_key_cache_lookups_total", "Derived key cache lookups", ("result",))
+KEY_CACHE_ENTRIES = Gauge("ssv_key_cache_entries", "Derived keys currently cached")
+PLAINTEXT_CACHE_LOOKUPS = Counter(
+    "ssv_plaintext_cache_lookups_total",
+    "Decoded-file cache lookups by outcome (hit, shared_hit, miss)",
+    ("result",)
+)
+PLAINTEXT_CACHE_BYTES = Gauge("ssv_plaintext_cache_bytes", "Decrypted bytes held in the local plaintext cache")
+FILE_RECORD_CACHE_LOOKUPS = Counter("ssv_file_record_cache_lookups_total", "File metadata cache lookups", ("result",))
+FILE_RECORD_CACHE_ENTRIES = Gauge("ssv_file_record_cache_entries", "File metadata records currently cached")
+
+
+# Time already attributed to storage I/O and nested stages inside the current stage.
+# A ContextVar keeps concurrent requests apart both on the event loop and on worker threads.
+_nested_seconds: ContextVar[Optional[List[float]]] = ContextVar("ssv_nested_seconds", default=None)
+
+
+def exclude_from_stage(seconds: float):
+    """Attribute seconds to something reported separately, such as storage I/O"""
+    nested = _nested_seconds.get()
+    if nested is not None:
+        nested[0] += seconds
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage. Storage I/O and stages nested inside it are
+    reported on their own and subtracted here, so "encrypt" is cipher time
+    rather than cipher + PBKDF2 + disk.
+    """
+    nested = [0.0]
+    token = _nested_seconds.set(nested)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _nested_seconds.reset(token)
+        STAGE_SECONDS.observe(max(elapsed - nested[0], 0.0), stage=name)
+        exclude_from_stage(elapsed)
+
+
+def observe_since_request_start(request, stage_name: str):
+    """Record the time between the request arriving and now, e.g. multipart parsing before the handler runs"""
+    start = getattr(request.state, "metrics_start", None)
+    if start is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage_name)
+
+
+class TimedFile:
+    """
+    File object wrapper that totals the time spent in read/write calls and
+    reports it as one storage observation when closed.
+    """
+    
+    def __init__(self, f: BinaryIO, backend: str, operation: str):
+        self._f = f
+        self._backend = backend
+        self._operation = operation
+        self._seconds = 0.0
+        self._reported = False
+    
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._seconds += elapsed
+            exclude_from_stage(elapsed)
+    
+    def read(self, *args):
+        return self._timed(self._f.read, *args)
+    
+    def readinto(self, buffer):
+        return self._timed(self._f.readinto, buffer)
+    
+    def write(self, data):
+        return self._timed(self._f.write, data)
+    
+    def report(self):
+        """Record the accumulated I/O time once; called on close"""
+        if not self._reported:
+            self._reported = True
+            STORAGE_SECONDS.observe(self._seconds, backend=self._backend, operation=self._operation)
+    
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            self.report()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+    
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request, including streamed bodies,
+    labelled by route template so file ids don't explode the series count.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        scope.setdefault("state", {})["metrics_start"] = start
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route)
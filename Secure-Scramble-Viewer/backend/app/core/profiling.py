@@ -0,0 +1,200 @@
+import asyncio
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-admin-token"
+PROFILE_SUFFIX = ".prof"
+
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("ssv_profile_session", default=None)
+_thread = threading.local()
+
+
+class ProfileSession:
+    """
+    cProfile data for one request. cProfile only sees the thread it is
+    enabled on, so the event-loop part and every worker job run for the
+    request each get their own Profile; dump() merges them into one pstats file.
+    """
+    
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+    
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func on this thread under a profiler attributed to the session"""
+        if getattr(_thread, "profiling", False):
+            # Already inside a profiled call on this thread
+            return func(*args, **kwargs)
+        
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler owns this interpreter; run unprofiled rather than fail the request
+            return func(*args, **kwargs)
+        
+        _thread.profiling = True
+        token = _session.set(self)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            _session.reset(token)
+            _thread.profiling = False
+            self.add(profile)
+    
+    def add(self, profile: cProfile.Profile):
+        with self._lock:
+            self.profiles.append(profile)
+    
+    def dump(self, path: str):
+        with self._lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+
+def bind(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Carry the calling request's profiling session into func, which may run
+    on another thread. Returns func itself when nothing is being profiled.
+    """
+    session = _session.get()
+    if session is None:
+        return func
+    
+    def profiled(*args, **kwargs):
+        return session.call(func, *args, **kwargs)
+    
+    return profiled
+
+
+class Profiler:
+    """
+    Opt-in request profiling. A request is profiled when it carries
+    "X-Profile: 1" with a valid X-Admin-Token, or when it is picked at
+    sample_rate. Dumps are pstats files, readable with pstats, snakeviz or
+    flameprof, named after the time, route and a short id.
+    """
+    
+    def __init__(self, output_dir: str, admin_token: str = "", sample_rate: float = 0.0, keep: int = 100):
+        self.output_dir = output_dir
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.profiled_requests = 0
+    
+    def is_admin(self, token: Optional[str]) -> bool:
+        return bool(self.admin_token) and token is not None and hmac.compare_digest(token, self.admin_token)
+    
+    def should_profile(self, scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if not self.admin_token:
+            return False
+        
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER) not in (b"1", b"true"):
+            return False
+        return self.is_admin(headers.get(TOKEN_HEADER, b"").decode("latin-1"))
+    
+    def profile_name(self, scope) -> str:
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        return f"{stamp}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}"
+    
+    def list_profiles(self) -> List[str]:
+        """Profile dump names, newest first"""
+        try:
+            names = [name for name in os.listdir(self.output_dir) if name.endswith(PROFILE_SUFFIX)]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+    
+    def profile_path(self, name: str) -> Optional[str]:
+        """Path of an existing dump, refusing anything that is not a plain dump name"""
+        if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIX):
+            return None
+        path = os.path.join(self.output_dir, name)
+        return path if os.path.isfile(path) else None
+    
+    def save(self, session: ProfileSession, name: str):
+        """Write a session's dump and prune the oldest beyond keep"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        session.dump(os.path.join(self.output_dir, name))
+        for old in self.list_profiles()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.output_dir, old))
+            except OSError:
+                pass
+
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests end to end: the handler and response
+    streaming on the event loop, plus every job they hand to the worker
+    pool. The dump name is returned in an X-Profile header.
+    
+    Only one request at a time profiles the event loop, and that profile
+    also sees anything else the loop ran meanwhile. Worker jobs are
+    profiled per request. Requests that are not selected pay for one
+    sample-rate check.
+    """
+    
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+        self._loop_profiling = False
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        session = ProfileSession()
+        names = []
+        
+        async def send_with_name(message):
+            if message["type"] == "http.response.start":
+                names.append(self.profiler.profile_name(scope))
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile", names[0].encode())]}
+            await send(message)
+        
+        loop_profile = None
+        if not self._loop_profiling:
+            loop_profile = cProfile.Profile()
+            try:
+                loop_profile.enable()
+                self._loop_profiling = True
+            except ValueError:
+                loop_profile = None
+        
+        token = _session.set(session)
+        try:
+            await self.app(scope, receive, send_with_name)
+        finally:
+            _session.reset(token)
+            if loop_profile is not None:
+                loop_profile.disable()
+                self._loop_profiling = False
+                session.add(loop_profile)
+            
+            self.profiler.profiled_requests += 1
+            name = names[0] if names else self.profiler.profile_name(scope)
+            await asyncio.get_running_loop().run_in_executor(None, self.profiler.save, session, name)
@@ -0,0 +1,71 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, Optional, TypeVar
+from app.core import profiling
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class WorkerPool:
+    """
+    Dedicated thread pool for CPU-bound crypto and blocking file/DB I/O.
+
+    hashlib's PBKDF2 and OpenSSL's AES both release the GIL, so threads give
+    real parallelism here while keeping file objects and sessions shareable
+    with the request. Crypto jobs additionally go through a semaphore so a
+    burst of large uploads cannot starve the pool.
+    """
+    
+    def __init__(self, max_workers: int, max_concurrent_crypto: int):
+        self.max_workers = max_workers
+        self.max_concurrent_crypto = max_concurrent_crypto
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._crypto_slots = asyncio.Semaphore(max_concurrent_crypto)
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="ssv-worker"
+            )
+        return self._executor
+    
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run blocking I/O off the event loop"""
+        loop = asyncio.get_running_loop()
+        # Jobs of a profiled request are profiled on the worker thread too
+        return await loop.run_in_executor(self.executor, profiling.bind(functools.partial(func, *args, **kwargs)))
+    
+    async def run_crypto(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run encryption/decryption work, bounded by MAX_CONCURRENT_CRYPTO"""
+        async with self._crypto_slots:
+            return await self.run(func, *args, **kwargs)
+    
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Drive a blocking iterator one item at a time on the pool"""
+        while True:
+            item = await self.run(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    
+    async def iterate_crypto(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Drive a blocking decrypting iterator one item at a time on the pool"""
+        while True:
+            item = await self.run_crypto(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+worker_pool = WorkerPool(settings.WORKER_THREADS, settings.MAX_CONCURRENT_CRYPTO)
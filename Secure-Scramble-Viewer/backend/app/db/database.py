@@ -1,19 +1,160 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import Column, DateTime, String, Table, Uuid, event, func, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sync driver -> asyncio driver
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+class PoolCheckoutStats:
+    """Running totals of how long requests waited for a pooled connection"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "wait_seconds_total": self.total_seconds,
+                "wait_seconds_avg": self.total_seconds / self.count if self.count else 0.0,
+                "wait_seconds_max": self.max_seconds
+            }
+
+pool_checkout_stats = PoolCheckoutStats()
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait time (including new connects)"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_checkout_stats.record(elapsed)
+            metrics.DB_POOL_WAIT_SECONDS.observe(elapsed)
+
+def async_database_url(database_url: str):
+    """Map a configured sync DATABASE_URL onto its asyncio driver"""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    return url.set(drivername=driver) if driver else url
+
+def _engine_options(url) -> dict:
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # An in-memory database only exists on a single shared connection
+        return {}
+    
+    return {
+        "poolclass": TimedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+_url = async_database_url(settings.DATABASE_URL)
+engine = create_async_engine(_url, **_engine_options(_url))
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+    # Label by statement kind only; full SQL text would be unbounded
+    kind = statement.split(None, 1)[0].upper() if statement.strip() else "EMPTY"
+    metrics.DB_QUERY_SECONDS.observe(elapsed, statement=kind)
+
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# One-off data migrations already applied to this database
+schema_migrations = Table(
+    "schema_migrations",
+    Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now())
+)
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+def _upgrade_uuid_column(conn, table_name: str, column_name: str, existing_type):
+    """Move an id column created as VARCHAR onto the compact Uuid storage"""
+    if isinstance(existing_type, Uuid) or getattr(existing_type, "length", None) == 32:
+        return
+    
+    if conn.dialect.name == "postgresql":
+        # Rewrites the table and rebuilds every index on the column
+        conn.execute(text(f'ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE uuid USING {column_name}::uuid'))
+    else:
+        # SQLite cannot change a column's type, so store the 32-digit hex the Uuid type binds
+        conn.execute(text(f"UPDATE {table_name} SET {column_name} = replace({column_name}, '-', '') WHERE {column_name} LIKE '%-%'"))
+
+def _run_once(conn, name: str, migrate):
+    """Apply a one-off migration unless schema_migrations records that it already ran"""
+    applied = conn.execute(select(schema_migrations.c.name).where(schema_migrations.c.name == name)).first()
+    if applied is None:
+        migrate(conn)
+        conn.execute(schema_migrations.insert().values(name=name))
+
+def _create_schema(conn):
+    Base.metadata.create_all(conn)
+    
+    # create_all skips existing tables, so add any nullable columns and
+    # indexes introduced since the table was first created
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            elif column.name in existing and isinstance(column.type, Uuid):
+                _run_once(
+                    conn,
+                    f"{table.name}.{column.name} uuid",
+                    lambda conn: _upgrade_uuid_column(conn, table.name, column.name, existing[column.name])
+                )
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def init_db():
+    """Initialize database tables and indexes"""
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+
+def pool_stats() -> dict:
+    """Pool occupancy plus checkout wait times"""
+    pool = engine.pool
+    stats = pool_checkout_stats.snapshot()
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        })
+    return stats
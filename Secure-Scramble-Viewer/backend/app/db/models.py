@@ -1,17 +1,45 @@
-from sqlalchemy import Column, String, Integer, DateTime, BigInteger
+from sqlalchemy import Column, String, Integer, DateTime, BigInteger, Index, Uuid
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.db.database import Base
 import uuid
 
+# SQLite stores datetimes as text; match CURRENT_TIMESTAMP's format so that
+# bound cursor values compare correctly against server-generated upload dates
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
 class EncryptedFile(Base):
     __tablename__ = "encrypted_files"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    # Native 16-byte uuid on Postgres, CHAR(32) hex elsewhere; still read and written as "xxxxxxxx-xxxx-..." strings
+    id = Column(Uuid(as_uuid=False), primary_key=True, default=lambda: str(uuid.uuid4()))
     original_filename = Column(String, nullable=False)
     encrypted_filename = Column(String, nullable=False)
     file_size = Column(BigInteger, nullable=False)
     mime_type = Column(String, nullable=True)
-    upload_date = Column(DateTime(timezone=True), server_default=func.now())
+    # Keyed digest of filename + content; shared by every record using the same StoredBlob
+    content_hash = Column(String(64), nullable=True, index=True)
+    # SHA-256 and size of the stored .ssv, served as a strong ETag; NULL for files stored before they were recorded
+    ssv_digest = Column(String(64), nullable=True)
+    ssv_size = Column(BigInteger, nullable=True)
+    upload_date = Column(
+        DateTime(timezone=True).with_variant(SQLITE_TIMESTAMP, "sqlite"),
+        server_default=func.now()
+    )
+    
+    __table_args__ = (
+        # Keyset pagination walks (upload_date, id) newest first
+        Index("ix_encrypted_files_upload_date_id", "upload_date", "id"),
+        Index("ix_encrypted_files_mime_type_upload_date_id", "mime_type", "upload_date", "id"),
+        # text_pattern_ops lets Postgres use the index for prefix LIKE under any collation
+        Index(
+            "ix_encrypted_files_original_filename",
+            "original_filename",
+            postgresql_ops={"original_filename": "text_pattern_ops"}
+        ),
+    )
     
     def to_dict(self):
         return {
@@ -21,3 +49,37 @@ class EncryptedFile(Base):
             "mime_type": self.mime_type,
             "upload_date": self.upload_date.isoformat() if self.upload_date else None
         }
+
+class StoredBlob(Base):
+    """One encrypted .ssv on disk, shared by all uploads of identical content"""
+    __tablename__ = "stored_blobs"
+    
+    content_hash = Column(String(64), primary_key=True)
+    encrypted_filename = Column(String, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    # Copied onto every EncryptedFile that reuses this blob
+    ssv_digest = Column(String(64), nullable=True)
+    ssv_size = Column(BigInteger, nullable=True)
+
+class UploadSession(Base):
+    """A resumable upload being encrypted chunk by chunk into a .ssv.part file"""
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=True)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    # Plaintext bytes received so far; always a multiple of chunk_size until complete
+    received_size = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def to_dict(self):
+        return {
+            "upload_id": self.id,
+            "filename": self.original_filename,
+            "size": self.total_size,
+            "chunk_size": self.chunk_size,
+            "received": self.received_size,
+            "complete": self.received_size == self.total_size
+        }
@@ -0,0 +1,30 @@
+# Blob storage package
+from app.core.config import settings
+from app.storage.base import StorageBackend
+from app.storage.instrumented import InstrumentedStorage
+from app.storage.local import LocalStorage
+from app.storage.s3 import S3Storage
+
+
+def create_storage(config=settings) -> StorageBackend:
+    """Build the backend selected by STORAGE_BACKEND"""
+    if config.STORAGE_BACKEND == "local":
+        return LocalStorage(config.STORAGE_PATH, shard_depth=config.STORAGE_SHARD_DEPTH)
+    if config.STORAGE_BACKEND == "s3":
+        if not config.S3_BUCKET:
+            raise ValueError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return S3Storage(
+            config.S3_BUCKET,
+            prefix=config.S3_PREFIX,
+            endpoint_url=config.S3_ENDPOINT_URL or None,
+            region=config.S3_REGION or None,
+            access_key_id=config.S3_ACCESS_KEY_ID or None,
+            secret_access_key=config.S3_SECRET_ACCESS_KEY or None,
+            part_size=config.S3_PART_SIZE
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {config.STORAGE_BACKEND}")
+
+
+storage = InstrumentedStorage(create_storage(), settings.STORAGE_BACKEND)
+
+__all__ = ["StorageBackend", "LocalStorage", "S3Storage", "InstrumentedStorage", "create_storage", "storage"]
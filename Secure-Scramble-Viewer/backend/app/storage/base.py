@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+
+class StorageBackend(ABC):
+    """
+    Where encrypted .ssv blobs live, addressed by their encrypted filename.
+    Every method blocks, so routes call them through the worker pool.
+    Missing keys raise FileNotFoundError.
+    """
+    
+    @abstractmethod
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        """
+        Yield a sequential writer for key. The object only becomes visible
+        when the block exits cleanly; on error it is discarded.
+        """
+    
+    @abstractmethod
+    def open_read(self, key: str) -> BinaryIO:
+        """Open key as a seekable binary file object"""
+    
+    @abstractmethod
+    def put_file(self, key: str, path: str):
+        """Move a finished local file into storage under key"""
+    
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """Size of the stored object in bytes"""
+    
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove key; a missing key is not an error"""
+    
+    def exists(self, key: str) -> bool:
+        try:
+            self.size(key)
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for key when the backend has one, so it can be sent with sendfile"""
+        return None
+
+
+def check_key(key: str) -> str:
+    """Keys are flat names; refuse anything that could escape the storage root"""
+    if not key or key in (".", "..") or "/" in key or "\\" in key:
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+from app.core import metrics
+from app.storage.base import StorageBackend
+
+
+class InstrumentedStorage(StorageBackend):
+    """
+    Wraps another backend and reports each operation's latency to /metrics.
+    Opened blobs are wrapped in metrics.TimedFile, so their reads and writes
+    are reported as one total per blob and left out of the crypto stages.
+    """
+    
+    def __init__(self, backend: StorageBackend, name: str):
+        self.backend = backend
+        self.name = name
+    
+    @contextmanager
+    def _timed(self, operation: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.STORAGE_SECONDS.observe(elapsed, backend=self.name, operation=operation)
+            metrics.exclude_from_stage(elapsed)
+    
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        with self.backend.open_write(key) as f:
+            writer = metrics.TimedFile(f, self.name, "write")
+            try:
+                yield writer
+            finally:
+                writer.report()
+            start = time.perf_counter()
+        # Leaving the backend's block publishes the blob (rename / multipart completion)
+        elapsed = time.perf_counter() - start
+        metrics.STORAGE_SECONDS.observe(elapsed, backend=self.name, operation="commit")
+        metrics.exclude_from_stage(elapsed)
+    
+    def open_read(self, key: str) -> BinaryIO:
+        with self._timed("open_read"):
+            source = self.backend.open_read(key)
+        return metrics.TimedFile(source, self.name, "read")
+    
+    def put_file(self, key: str, path: str):
+        with self._timed("put_file"):
+            self.backend.put_file(key, path)
+    
+    def size(self, key: str) -> int:
+        with self._timed("size"):
+            return self.backend.size(key)
+    
+    def delete(self, key: str):
+        with self._timed("delete"):
+            self.backend.delete(key)
+    
+    def exists(self, key: str) -> bool:
+        with self._timed("exists"):
+            return self.backend.exists(key)
+    
+    def local_path(self, key: str) -> Optional[str]:
+        return self.backend.local_path(key)
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+from app.storage.base import StorageBackend, check_key
+
+
+class LocalStorage(StorageBackend):
+    """
+    Blobs on a local (or shared network) filesystem, fanned out into
+    sha256(key)-prefixed subdirectories so no directory grows past a few
+    thousand entries: root/ab/cd/<key> with the default depth of 2.
+    
+    Files written before sharding sit flat in root and are still found there.
+    """
+    
+    def __init__(self, root: str, shard_depth: int = 2):
+        self.root = root
+        self.shard_depth = shard_depth
+        os.makedirs(root, exist_ok=True)
+    
+    def path(self, key: str) -> str:
+        """Sharded location for key"""
+        digest = hashlib.sha256(check_key(key).encode()).hexdigest()
+        shards = [digest[2 * level:2 * level + 2] for level in range(self.shard_depth)]
+        return os.path.join(self.root, *shards, key)
+    
+    def _existing_path(self, key: str) -> str:
+        path = self.path(key)
+        if not os.path.exists(path):
+            legacy_path = os.path.join(self.root, key)
+            if os.path.exists(legacy_path):
+                return legacy_path
+        return path
+    
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write beside the target and rename, so readers never see a partial file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                yield f
+            os.replace(temp_path, path)
+        except BaseException:
+            _remove_quietly(temp_path)
+            raise
+    
+    def open_read(self, key: str) -> BinaryIO:
+        return open(self._existing_path(key), 'rb')
+    
+    def put_file(self, key: str, path: str):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+    
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._existing_path(key))
+    
+    def delete(self, key: str):
+        _remove_quietly(self._existing_path(key))
+    
+    def local_path(self, key: str) -> Optional[str]:
+        return self._existing_path(key)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,227 @@
+import io
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+from app.storage.base import StorageBackend, check_key
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller non-final parts
+READ_AHEAD_SIZE = 64 * 1024  # small reads (headers, trailers) fetch at least this much
+
+
+class S3Storage(StorageBackend):
+    """
+    Blobs in an S3-compatible object store (AWS S3, MinIO, Ceph RGW...), so
+    any number of backend replicas can share them.
+    
+    Writes stream out as a multipart upload, one part_size part at a time;
+    reads are seekable and fetch only the byte ranges asked for, so decoding
+    a range of a large .ssv never downloads the whole object.
+    """
+    
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        client=None
+    ):
+        if client is None:
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+            
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+                config=Config(max_pool_connections=32)
+            )
+        
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = max(part_size, MIN_PART_SIZE)
+    
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{check_key(key)}"
+    
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[BinaryIO]:
+        writer = _MultipartWriter(self.client, self.bucket, self.object_key(key), self.part_size)
+        try:
+            yield writer
+            writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+    
+    def open_read(self, key: str) -> BinaryIO:
+        object_key = self.object_key(key)
+        return _RangeReader(self.client, self.bucket, object_key, self._head(object_key))
+    
+    def put_file(self, key: str, path: str):
+        with open(path, 'rb') as source, self.open_write(key) as dest:
+            while True:
+                data = source.read(self.part_size)
+                if not data:
+                    break
+                dest.write(data)
+        os.remove(path)
+    
+    def size(self, key: str) -> int:
+        return self._head(self.object_key(key))
+    
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+    
+    def _head(self, object_key: str) -> int:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=object_key)["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(object_key)
+            raise
+
+
+class _MultipartWriter(io.RawIOBase):
+    """
+    Buffers one part at a time and uploads it as soon as it fills.
+    Objects smaller than a single part are sent with one PutObject instead.
+    """
+    
+    def __init__(self, client, bucket: str, object_key: str, part_size: int):
+        self.client = client
+        self.bucket = bucket
+        self.object_key = object_key
+        self.part_size = part_size
+        self.upload_id: Optional[str] = None
+        self.parts: List[dict] = []
+        self._buffer = bytearray()
+        self._position = 0
+        self._finished = False
+    
+    def writable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+    
+    def close(self):
+        """Upload the final part and complete the object"""
+        if self._finished:
+            return
+        self._finished = True
+        
+        if self.upload_id is None:
+            self.client.put_object(Bucket=self.bucket, Key=self.object_key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.object_key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts}
+            )
+        self._buffer = bytearray()
+        super().close()
+    
+    def abort(self):
+        """Discard uploaded parts so they are not billed as orphaned storage"""
+        if self._finished:
+            return
+        self._finished = True
+        
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.object_key, UploadId=self.upload_id)
+        self._buffer = bytearray()
+        super().close()
+    
+    def _upload_part(self, data: bytes):
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.object_key)["UploadId"]
+        
+        part_number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.object_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+
+class _RangeReader(io.RawIOBase):
+    """
+    Seekable reader that turns each read into one ranged GetObject. Large
+    reads (whole .ssv chunks) fetch exactly what was asked for; small ones
+    read ahead so parsing a header costs a single request.
+    """
+    
+    def __init__(self, client, bucket: str, object_key: str, size: int):
+        self.client = client
+        self.bucket = bucket
+        self.object_key = object_key
+        self.size = size
+        self._position = 0
+        self._cache = b""
+        self._cache_start = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Negative seek position")
+        self._position = offset
+        return offset
+    
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self.size - self._position)
+        if length <= 0:
+            return 0
+        
+        offset = self._position - self._cache_start
+        if not (0 <= offset and offset + length <= len(self._cache)):
+            fetch = min(max(length, READ_AHEAD_SIZE), self.size - self._position)
+            response = self.client.get_object(
+                Bucket=self.bucket,
+                Key=self.object_key,
+                Range=f"bytes={self._position}-{self._position + fetch - 1}"
+            )
+            self._cache = response["Body"].read()
+            self._cache_start = self._position
+            offset = 0
+        
+        data = self._cache[offset:offset + length]
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
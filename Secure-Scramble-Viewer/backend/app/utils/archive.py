@@ -0,0 +1,75 @@
+import os
+import time
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+READ_SIZE = 1024 * 1024
+
+# (name inside the archive, size, opener for the content, modification time)
+ArchiveMember = Tuple[str, int, Callable[[], BinaryIO], Optional[datetime]]
+
+
+class _ZipSink:
+    """
+    Write-only, non-seekable target for ZipFile. zipfile then emits data
+    descriptors instead of seeking back, so finished bytes can be handed to
+    the client as soon as they are written.
+    """
+    
+    def __init__(self):
+        self._pieces: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self._pieces.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._pieces)
+        self._pieces.clear()
+        return data
+
+
+def iter_zip(members: Iterable[ArchiveMember], read_size: int = READ_SIZE) -> Iterator[bytes]:
+    """
+    Stream a ZIP of the given members without building it anywhere.
+    Entries are stored uncompressed; .ssv ciphertext does not compress.
+    """
+    sink = _ZipSink()
+    
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for arcname, size, open_source, modified in members:
+            date_time = (modified.timetuple() if modified else time.localtime())[:6]
+            info = zipfile.ZipInfo(arcname, date_time=date_time)
+            # A known size lets zipfile decide up front whether the entry needs zip64
+            info.file_size = size
+            
+            with open_source() as source, archive.open(info, 'w') as entry:
+                while True:
+                    data = source.read(read_size)
+                    if not data:
+                        break
+                    entry.write(data)
+                    yield sink.drain()
+    
+    # Central directory
+    yield sink.drain()
+
+
+def unique_arcnames(filenames: Iterable[str], extension: str) -> List[str]:
+    """Flat archive names with the given extension, numbering repeats"""
+    seen = set()
+    names = []
+    for filename in filenames:
+        stem = os.path.splitext(os.path.basename(filename))[0] or "file"
+        name = f"{stem}{extension}"
+        counter = 1
+        while name in seen:
+            counter += 1
+            name = f"{stem} ({counter}){extension}"
+        seen.add(name)
+        names.append(name)
+    return names
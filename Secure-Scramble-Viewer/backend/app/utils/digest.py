@@ -0,0 +1,38 @@
+import hashlib
+from typing import BinaryIO, Tuple
+
+READ_SIZE = 1024 * 1024
+
+
+class DigestWriter:
+    """
+    Sequential writer that passes everything through to dest while hashing
+    it, so a blob's SHA-256 and size are known the moment it is written.
+    """
+
+    def __init__(self, dest: BinaryIO):
+        self.dest = dest
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, data) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self.dest.write(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def file_digest(path: str) -> Tuple[str, int]:
+    """SHA-256 hex digest and size of a file on disk"""
+    h = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f, memoryview(bytearray(READ_SIZE)) as block:
+        while True:
+            read = f.readinto(block)
+            if not read:
+                break
+            h.update(block[:read])
+            size += read
+    return h.hexdigest(), size
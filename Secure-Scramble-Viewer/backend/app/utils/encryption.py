@@ -1,18 +1,143 @@
 import os
 import hashlib
+import hmac
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
-from typing import Tuple
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from app.core import profiling
+from app.utils.keys import DerivedKeyCache
+
+SSV_VERSION_1 = 1
+SSV_VERSION_2 = 2
+SSV_VERSION_3 = 3
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB of plaintext per v2 chunk
+
+# v2 layout sizes
+V2_HEADER = struct.Struct('>I16sI16sI')  # version, salt, chunk size, filename iv, filename length
+V2_TRAILER = struct.Struct('>QQ')        # chunk count, plaintext size
+IV_SIZE = 16
+TAG_SIZE = 32
+TRAILER_SIZE = V2_TRAILER.size + TAG_SIZE
+
+# HKDF info labels for the v2 filename, data and MAC subkeys
+V2_KEY_INFO = (b'ssv v2 filename', b'ssv v2 data', b'ssv v2 mac')
+
+# v3 layout sizes
+V3_HEADER = struct.Struct('>I16sIB12sI')  # version, salt, chunk size, cipher id, filename nonce, filename length
+NONCE_SIZE = 12
+AEAD_TAG_SIZE = 16
+V3_TRAILER_SIZE = V2_TRAILER.size + NONCE_SIZE + AEAD_TAG_SIZE
+V3_KEY_INFO = b'ssv v3 data'
+
+# v3 cipher ids, stored in the header
+CIPHER_AES_256_GCM = 1
+CIPHER_CHACHA20_POLY1305 = 2
+AEAD_CIPHERS = {
+    CIPHER_AES_256_GCM: AESGCM,
+    CIPHER_CHACHA20_POLY1305: ChaCha20Poly1305,
+}
+
+# Cipher names accepted by FileEncryption; aes-256-cbc writes the v2 format
+CIPHERS = {
+    "aes-256-gcm": CIPHER_AES_256_GCM,
+    "chacha20-poly1305": CIPHER_CHACHA20_POLY1305,
+    "aes-256-cbc": None,
+}
+
+
+class SSVFormatError(ValueError):
+    """Raised when an .ssv file is malformed or fails authentication"""
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a streamed upload exceeds the configured size limit"""
+
+
+class V2Keys(NamedTuple):
+    """Subkeys expanded from a v2 file key"""
+    filename_key: bytes
+    data_key: bytes
+    mac_key: bytes
+
 
 class FileEncryption:
-    """AES-256-CBC encryption for files"""
+    """
+    .ssv file encryption. New files are written as v3 (AEAD) or, with
+    cipher="aes-256-cbc", v2; every version can be read back.
+    """
     
-    def __init__(self, secret_key: str):
+    def __init__(
+        self,
+        secret_key: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        key_cache_size: int = 1024,
+        cipher: str = "aes-256-gcm",
+        parallelism: int = 1
+    ):
         # Derive a 32-byte key from the secret
         self.key = hashlib.sha256(secret_key.encode()).digest()
+        self.key_cache = DerivedKeyCache(self.key, max_entries=key_cache_size)
+        
+        if chunk_size <= 0 or chunk_size % 16 != 0:
+            raise ValueError("chunk_size must be a positive multiple of 16")
+        if cipher not in CIPHERS:
+            raise ValueError(f"Unknown cipher: {cipher}")
+        self.chunk_size = chunk_size
+        self.cipher = cipher
+        self.parallelism = max(parallelism, 1)
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def map_chunks(self, func: Callable, *iterables: Iterable) -> list:
+        """
+        map() over independent chunks, spread across `parallelism` threads.
+        OpenSSL releases the GIL while it encrypts, so this uses several cores.
+        """
+        if self.parallelism == 1:
+            return list(map(func, *iterables))
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="ssv-chunk")
+        return list(self._executor.map(profiling.bind(func), *iterables))
     
-    def encrypt_file(self, file_data: bytes) -> Tuple[bytes, bytes, bytes]:
+    def content_digest(self, source: BinaryIO, original_filename: str, max_size: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Keyed SHA-256 over the filename and everything readable from source.
+        Used to find identical uploads without storing a plain content hash.
+        Returns (hex digest, plaintext size).
+        """
+        filename_bytes = original_filename.encode('utf-8')
+        h = hmac.new(self.key, b'ssv content digest', hashlib.sha256)
+        h.update(len(filename_bytes).to_bytes(4, byteorder='big'))
+        h.update(filename_bytes)
+        
+        size = 0
+        with memoryview(bytearray(self.chunk_size)) as block:
+            while True:
+                read = _read_into(source, block)
+                if not read:
+                    break
+                size += read
+                if max_size is not None and size > max_size:
+                    raise FileTooLargeError("File too large")
+                h.update(block[:read])
+        
+        return h.hexdigest(), size
+    
+    def derive_key(self, salt: bytes) -> bytes:
+        """
+        PBKDF2 key for salt, served from the LRU when the salt was seen recently
+        """
+        return self.key_cache.derive(salt)
+    
+    def encrypt_file(self, file_data: bytes) -> Tuple[bytearray, bytes, bytes]:
         """
         Encrypt file data using AES-256-CBC
         Returns: (encrypted_data, salt, iv)
@@ -21,97 +146,670 @@ class FileEncryption:
         salt = os.urandom(16)
         iv = os.urandom(16)
         
-        # Derive key with salt using PBKDF2
-        derived_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
-        
-        # Pad the data to AES block size (128 bits = 16 bytes)
-        padder = padding.PKCS7(128).padder()
-        padded_data = padder.update(file_data) + padder.finalize()
-        
-        # Encrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        encrypted_data = encryptor.update(padded_data) + encryptor.finalize()
+        # Derive key with salt using PBKDF2, then pad and encrypt in one pass
+        encrypted_data = _cbc_encrypt(self.derive_key(salt), iv, file_data)
         
         return encrypted_data, salt, iv
     
-    def decrypt_file(self, encrypted_data: bytes, salt: bytes, iv: bytes) -> bytes:
+    def decrypt_file(self, encrypted_data: bytes, salt: bytes, iv: bytes) -> bytearray:
         """
-        Decrypt file data using AES-256-CBC
+        Decrypt file data using AES-256-CBC; encrypted_data may be any bytes-like object
         """
-        # Derive the same key with salt
-        derived_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+        # Derive the same key with salt, then decrypt and unpad in place
+        return _cbc_decrypt(self.derive_key(salt), iv, encrypted_data)
+    
+    def derive_v2_keys(self, salt: bytes) -> V2Keys:
+        """
+        Derive one PBKDF2 file key per v2 file and split it into
+        filename, data and MAC subkeys with HKDF
+        """
+        file_key = self.derive_key(salt)
+        return V2Keys(*(_hkdf_expand(file_key, info) for info in V2_KEY_INFO))
+    
+    def derive_v3_key(self, salt: bytes) -> bytes:
+        """Derive the AEAD data key of a v3 file"""
+        return _hkdf_expand(self.derive_key(salt), V3_KEY_INFO)
+    
+    def new_writer(self, dest: BinaryIO, original_filename: str) -> 'SSVWriter':
+        """Start a .ssv file in dest using the configured cipher"""
+        cipher_id = CIPHERS[self.cipher]
+        if cipher_id is None:
+            return SSVWriter(self, dest, original_filename)
+        return AEADSSVWriter(self, dest, original_filename, cipher_id)
+    
+    def resume_writer(self, dest: BinaryIO) -> 'SSVWriter':
+        """Reattach to a partially written .ssv file (opened 'r+b'), whatever its version"""
+        dest.seek(0)
+        version = int.from_bytes(dest.read(4), byteorder='big')
         
-        # Decrypt
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        padded_data = decryptor.update(encrypted_data) + decryptor.finalize()
+        if version == SSV_VERSION_3:
+            return AEADSSVWriter.resume(self, dest)
+        if version == SSV_VERSION_2:
+            return SSVWriter.resume(self, dest)
+        raise SSVFormatError(f"Unsupported .ssv version: {version}")
+    
+    def encrypt_stream(
+        self,
+        source: BinaryIO,
+        dest: BinaryIO,
+        original_filename: str,
+        max_size: Optional[int] = None
+    ) -> int:
+        """
+        Encrypt everything readable from source into dest as a .ssv file.
+        One chunk per thread is held in memory at a time.
+        Returns the plaintext size in bytes.
+        """
+        writer = self.new_writer(dest, original_filename)
         
-        # Unpad
-        unpadder = padding.PKCS7(128).unpadder()
-        original_data = unpadder.update(padded_data) + unpadder.finalize()
+        # One reusable read buffer; the writer copies anything it keeps
+        with memoryview(bytearray(self.chunk_size * self.parallelism)) as block:
+            while True:
+                read = _read_into(source, block)
+                if not read:
+                    break
+                writer.write(block[:read])
+                if max_size is not None and writer.plaintext_size > max_size:
+                    raise FileTooLargeError("File too large")
         
-        return original_data
+        writer.close()
+        return writer.plaintext_size
     
-    def create_ssv_file(self, file_data: bytes, original_filename: str) -> bytes:
+    def open_ssv(self, source: BinaryIO):
         """
-        Create .ssv file format:
-        [4 bytes: version]
-        [16 bytes: salt]
-        [16 bytes: iv]
-        [4 bytes: filename length]
-        [N bytes: encrypted filename]
-        [remaining: encrypted file data]
+        Open a seekable .ssv file object for streaming/ranged decryption.
+        Returns an AEADSSVReader (v3), SSVReader (v2) or LegacySSVReader (v1);
+        all expose filename, size and iter_range().
         """
-        encrypted_data, salt, iv = self.encrypt_file(file_data)
-        
-        # Encrypt filename
-        filename_bytes = original_filename.encode('utf-8')
-        encrypted_filename, fn_salt, fn_iv = self.encrypt_file(filename_bytes)
-        
-        # Build SSV format
-        version = b'\x00\x00\x00\x01'  # Version 1
-        filename_length = len(encrypted_filename).to_bytes(4, byteorder='big')
-        
-        ssv_data = (
-            version +
-            salt +
-            iv +
-            fn_salt +
-            fn_iv +
-            filename_length +
-            encrypted_filename +
-            encrypted_data
-        )
+        source.seek(0)
+        version = int.from_bytes(source.read(4), byteorder='big')
         
-        return ssv_data
+        if version == SSV_VERSION_3:
+            return AEADSSVReader(self, source)
+        if version == SSV_VERSION_2:
+            return SSVReader(self, source)
+        if version == SSV_VERSION_1:
+            return LegacySSVReader(self, source)
+        raise SSVFormatError(f"Unsupported .ssv version: {version}")
+    
+    def create_ssv_file(self, file_data: bytes, original_filename: str) -> bytes:
+        """
+        Create a .ssv file in memory (see AEADSSVWriter and SSVWriter for the layouts)
+        """
+        output = BytesIO()
+        self.encrypt_stream(BytesIO(file_data), output, original_filename)
+        return output.getvalue()
     
     def parse_ssv_file(self, ssv_data: bytes) -> Tuple[bytes, str]:
         """
         Parse .ssv file and return (decrypted_data, original_filename)
         """
-        # Parse header
-        version = ssv_data[0:4]
-        salt = ssv_data[4:20]
-        iv = ssv_data[20:36]
-        fn_salt = ssv_data[36:52]
-        fn_iv = ssv_data[52:68]
-        filename_length = int.from_bytes(ssv_data[68:72], byteorder='big')
+        version = int.from_bytes(ssv_data[0:4], byteorder='big')
+        
+        if version in (SSV_VERSION_2, SSV_VERSION_3):
+            # BytesIO shares the bytes it wraps; plaintext goes into one preallocated buffer
+            reader = self.open_ssv(BytesIO(ssv_data))
+            original_data = bytearray(reader.size)
+            reader.readinto(original_data)
+            return original_data, reader.filename
+        
+        if version != SSV_VERSION_1:
+            raise SSVFormatError(f"Unsupported .ssv version: {version}")
+        
+        # Parse v1 header; memoryview slices reference ssv_data instead of copying it
+        view = memoryview(ssv_data)
+        salt = bytes(view[4:20])
+        iv = bytes(view[20:36])
+        fn_salt = bytes(view[36:52])
+        fn_iv = bytes(view[52:68])
+        filename_length = int.from_bytes(view[68:72], byteorder='big')
         
         # Extract encrypted filename and data
-        encrypted_filename = ssv_data[72:72+filename_length]
-        encrypted_data = ssv_data[72+filename_length:]
+        encrypted_filename = view[72:72+filename_length]
+        encrypted_data = view[72+filename_length:]
         
         # Decrypt
         original_filename = self.decrypt_file(encrypted_filename, fn_salt, fn_iv).decode('utf-8')
         original_data = self.decrypt_file(encrypted_data, salt, iv)
         
         return original_data, original_filename
+
+
+def _hkdf_expand(file_key: bytes, info: bytes) -> bytes:
+    return HKDFExpand(algorithm=hashes.SHA256(), length=32, info=info, backend=default_backend()).derive(file_key)
+
+
+def _read_into(source: BinaryIO, buffer: memoryview) -> int:
+    """readinto() until buffer is full or source is exhausted"""
+    filled = 0
+    while filled < len(buffer):
+        read = source.readinto(buffer[filled:])
+        if not read:
+            break
+        filled += read
+    return filled
+
+
+def _cbc_encrypt(key: bytes, iv: bytes, data: bytes) -> bytearray:
+    """
+    AES-CBC with PKCS7 padding, encrypted straight into one preallocated
+    buffer. Only the final, padded block is copied.
+    """
+    full_blocks = len(data) - len(data) % 16
+    pad = 16 - len(data) % 16
+    # update_into needs a block of slack beyond the output
+    encrypted = bytearray(full_blocks + 16 + 15)
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).encryptor()
+    
+    with memoryview(data) as source, memoryview(encrypted) as out:
+        written = encryptor.update_into(source[:full_blocks], out)
+        written += encryptor.update_into(bytes(source[full_blocks:]) + bytes([pad]) * pad, out[written:])
+    encryptor.finalize()
+    
+    del encrypted[written:]
+    return encrypted
+
+
+def _cbc_decrypt(key: bytes, iv: bytes, data: bytes) -> bytearray:
+    """AES-CBC decryption into one preallocated buffer, unpadded in place"""
+    decrypted = bytearray(len(data) + 15)
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).decryptor()
+    written = decryptor.update_into(data, decrypted)
+    decryptor.finalize()
+    
+    pad = decrypted[written - 1] if written else 0
+    if not 1 <= pad <= 16 or decrypted[written - pad:written] != bytes([pad]) * pad:
+        raise ValueError("Invalid padding bytes.")
+    del decrypted[written - pad:]
+    return decrypted
+
+
+def _mac(mac_key: bytes, label: bytes, *parts: bytes) -> bytes:
+    h = hmac.new(mac_key, label, hashlib.sha256)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+def _padded_size(plaintext_size: int) -> int:
+    """CBC ciphertext size of a chunk after PKCS7 padding"""
+    return (plaintext_size // 16 + 1) * 16
+
+
+def _read_v2_header(encryption: 'FileEncryption', source: BinaryIO) -> Tuple[V2Keys, int, str, int]:
+    """
+    Parse and authenticate a v2 header.
+    Returns (keys, chunk_size, original_filename, body_offset).
+    """
+    source.seek(0)
+    header = source.read(V2_HEADER.size)
+    if len(header) != V2_HEADER.size:
+        raise SSVFormatError("Truncated .ssv header")
+    
+    version, salt, chunk_size, fn_iv, filename_length = V2_HEADER.unpack(header)
+    if version != SSV_VERSION_2:
+        raise SSVFormatError(f"Unsupported .ssv version: {version}")
+    if chunk_size <= 0 or chunk_size % 16 != 0:
+        raise SSVFormatError("Invalid chunk size")
+    
+    keys = encryption.derive_v2_keys(salt)
+    
+    encrypted_filename = source.read(filename_length)
+    header_tag = source.read(TAG_SIZE)
+    if not hmac.compare_digest(header_tag, _mac(keys.mac_key, b'H', header, encrypted_filename)):
+        raise SSVFormatError("Header authentication failed")
+    original_filename = _cbc_decrypt(keys.filename_key, fn_iv, encrypted_filename).decode('utf-8')
+    
+    return keys, chunk_size, original_filename, V2_HEADER.size + filename_length + TAG_SIZE
+
+
+def _read_v3_header(encryption: 'FileEncryption', source: BinaryIO) -> Tuple[object, int, str, int]:
+    """
+    Parse and authenticate a v3 header.
+    Returns (aead, chunk_size, original_filename, body_offset).
+    """
+    source.seek(0)
+    header = source.read(V3_HEADER.size)
+    if len(header) != V3_HEADER.size:
+        raise SSVFormatError("Truncated .ssv header")
+    
+    version, salt, chunk_size, cipher_id, fn_nonce, filename_length = V3_HEADER.unpack(header)
+    if version != SSV_VERSION_3:
+        raise SSVFormatError(f"Unsupported .ssv version: {version}")
+    if chunk_size <= 0:
+        raise SSVFormatError("Invalid chunk size")
+    if cipher_id not in AEAD_CIPHERS:
+        raise SSVFormatError(f"Unknown cipher id: {cipher_id}")
+    
+    aead = AEAD_CIPHERS[cipher_id](encryption.derive_v3_key(salt))
+    
+    encrypted_filename = source.read(filename_length)
+    try:
+        original_filename = aead.decrypt(fn_nonce, encrypted_filename, b'H' + header).decode('utf-8')
+    except InvalidTag:
+        raise SSVFormatError("Header authentication failed")
+    
+    return aead, chunk_size, original_filename, V3_HEADER.size + filename_length
+
+
+def _readinto(reader, buffer) -> int:
+    position = 0
+    with memoryview(buffer) as out:
+        for chunk in reader.iter_range():
+            out[position:position + len(chunk)] = chunk
+            position += len(chunk)
+    return position
+
+
+class SSVWriter:
+    """
+    Incremental writer for the chunked v2 .ssv format:
+    [4 bytes: version = 2]
+    [16 bytes: salt]
+    [4 bytes: plaintext chunk size]
+    [16 bytes: filename iv]
+    [4 bytes: filename length]
+    [N bytes: encrypted filename]
+    [32 bytes: header HMAC]
+    then one record per chunk of plaintext:
+        [16 bytes: iv] [encrypted chunk] [32 bytes: HMAC over index, iv and ciphertext]
+    and a trailer:
+        [8 bytes: chunk count] [8 bytes: plaintext size] [32 bytes: HMAC]
+    
+    Every chunk except the last holds exactly chunk_size bytes of plaintext,
+    so any chunk can be located and authenticated on its own, and complete
+    chunks are sealed in parallel (see FileEncryption.map_chunks).
+    
+    Keys: a single PBKDF2 derivation from the salt gives the file key, which
+    HKDF expands into the filename, data and MAC subkeys.
+    
+    Chunks are normally appended with write()/close(). Because every record
+    sits at a fixed offset, a seekable file can also be filled out of band
+    with write_chunk_at() and sealed with finish() (see resume()).
+    """
+    
+    def __init__(self, encryption: FileEncryption, dest: BinaryIO, original_filename: str):
+        self._start(encryption, dest, encryption.chunk_size)
+        
+        salt = os.urandom(16)
+        keys = encryption.derive_v2_keys(salt)
+        self._enc_key, self._mac_key = keys.data_key, keys.mac_key
+        
+        fn_iv = os.urandom(IV_SIZE)
+        encrypted_filename = _cbc_encrypt(keys.filename_key, fn_iv, original_filename.encode('utf-8'))
+        header = V2_HEADER.pack(SSV_VERSION_2, salt, self.chunk_size, fn_iv, len(encrypted_filename))
+        
+        self.dest.write(header)
+        self.dest.write(encrypted_filename)
+        self.dest.write(_mac(self._mac_key, b'H', header, encrypted_filename))
+        
+        self.body_offset = len(header) + len(encrypted_filename) + TAG_SIZE
+    
+    @classmethod
+    def resume(cls, encryption: FileEncryption, dest: BinaryIO) -> 'SSVWriter':
+        """Reattach to a partially written v2 file (opened 'r+b') for positional writes"""
+        keys, chunk_size, _, body_offset = _read_v2_header(encryption, dest)
+        
+        writer = cls.__new__(cls)
+        writer._start(encryption, dest, chunk_size)
+        writer._enc_key, writer._mac_key = keys.data_key, keys.mac_key
+        writer.body_offset = body_offset
+        return writer
+    
+    def _start(self, encryption: FileEncryption, dest: BinaryIO, chunk_size: int):
+        self.encryption = encryption
+        self.dest = dest
+        self.chunk_size = chunk_size
+        self.plaintext_size = 0
+        self.chunk_count = 0
+        self._buffer = bytearray()
+        self.record_size = self._sealed_size(chunk_size)
+    
+    def write(self, data: bytes):
+        """Buffer data and flush every complete chunk"""
+        if not self._buffer:
+            complete = len(data) - len(data) % self.chunk_size
+            self._buffer += data[complete:]
+            if complete:
+                with memoryview(data) as view:
+                    self._write_views(view, complete)
+            return
+        
+        self._buffer += data
+        complete = len(self._buffer) - len(self._buffer) % self.chunk_size
+        if complete:
+            # Seal straight out of the buffer; it can only be resized once every view onto it is released
+            with memoryview(self._buffer) as view:
+                self._write_views(view, complete)
+            del self._buffer[:complete]
+    
+    def _write_views(self, view: memoryview, complete: int):
+        """Write view[:complete] as whole chunks without copying, releasing each chunk view afterwards"""
+        chunks = [view[i:i + self.chunk_size] for i in range(0, complete, self.chunk_size)]
+        try:
+            self._write_chunks(chunks)
+        finally:
+            for chunk in chunks:
+                chunk.release()
+    
+    def close(self):
+        """Flush the final partial chunk and write the trailer"""
+        if self._buffer:
+            self._write_chunks([bytes(self._buffer)])
+            self._buffer.clear()
+        
+        self._write_trailer(self.chunk_count, self.plaintext_size)
+    
+    def write_chunk_at(self, index: int, chunk: bytes):
+        """Encrypt chunk number index into its fixed slot; only the last chunk may be short"""
+        if len(chunk) > self.chunk_size:
+            raise ValueError("Chunk larger than chunk_size")
+        self.dest.seek(self.body_offset + index * self.record_size)
+        for part in self._seal(index, chunk):
+            self.dest.write(part)
+    
+    def finish(self, plaintext_size: int):
+        """Seal a file filled with write_chunk_at(): write the trailer and drop anything after it"""
+        chunk_count = -(-plaintext_size // self.chunk_size)
+        end = self.body_offset
+        if chunk_count:
+            last_chunk_size = plaintext_size - (chunk_count - 1) * self.chunk_size
+            end += (chunk_count - 1) * self.record_size + self._sealed_size(last_chunk_size)
+        
+        self.dest.seek(end)
+        self._write_trailer(chunk_count, plaintext_size)
+        self.dest.truncate()
+    
+    def _write_chunks(self, chunks: List[bytes]):
+        indexes = range(self.chunk_count, self.chunk_count + len(chunks))
+        for record in self.encryption.map_chunks(self._seal, indexes, chunks):
+            for part in record:
+                self.dest.write(part)
+        self.chunk_count += len(chunks)
+        self.plaintext_size += sum(len(chunk) for chunk in chunks)
+    
+    def _sealed_size(self, plaintext_size: int) -> int:
+        """Record size on disk for a chunk of plaintext_size bytes"""
+        return IV_SIZE + _padded_size(plaintext_size) + TAG_SIZE
+    
+    def _seal(self, index: int, chunk: bytes) -> Tuple[bytes, ...]:
+        """Encrypt one chunk; returns the record's parts, written in order without joining"""
+        iv = os.urandom(IV_SIZE)
+        encrypted_chunk = _cbc_encrypt(self._enc_key, iv, chunk)
+        tag = _mac(self._mac_key, b'C', index.to_bytes(8, byteorder='big'), iv, encrypted_chunk)
+        return iv, encrypted_chunk, tag
+    
+    def _write_trailer(self, chunk_count: int, plaintext_size: int):
+        trailer = V2_TRAILER.pack(chunk_count, plaintext_size)
+        self.dest.write(trailer)
+        self.dest.write(_mac(self._mac_key, b'T', trailer))
+
+
+class AEADSSVWriter(SSVWriter):
+    """
+    Writer for the v3 .ssv format, which seals each chunk with an AEAD
+    cipher (AES-256-GCM or ChaCha20-Poly1305) instead of CBC + HMAC:
+    [4 bytes: version = 3]
+    [16 bytes: salt]
+    [4 bytes: plaintext chunk size]
+    [1 byte: cipher id]
+    [12 bytes: filename nonce]
+    [4 bytes: filename length]
+    [N bytes: encrypted filename + 16 byte tag, header as associated data]
+    then one record per chunk of plaintext:
+        [12 bytes: nonce] [encrypted chunk] [16 bytes: tag over index and ciphertext]
+    and a trailer:
+        [8 bytes: chunk count] [8 bytes: plaintext size] [12 bytes: nonce] [16 bytes: tag]
+    
+    No padding is needed, so a record is exactly 28 bytes longer than its
+    chunk. The single data key is HKDF-expanded from the PBKDF2 file key;
+    associated data is prefixed with b'H', b'C' or b'T' to keep header,
+    chunk and trailer tags apart.
+    """
+    
+    def __init__(self, encryption: FileEncryption, dest: BinaryIO, original_filename: str, cipher_id: int):
+        self._start(encryption, dest, encryption.chunk_size)
+        
+        salt = os.urandom(16)
+        self._aead = AEAD_CIPHERS[cipher_id](encryption.derive_v3_key(salt))
+        
+        fn_nonce = os.urandom(NONCE_SIZE)
+        filename_bytes = original_filename.encode('utf-8')
+        header = V3_HEADER.pack(
+            SSV_VERSION_3, salt, self.chunk_size, cipher_id, fn_nonce, len(filename_bytes) + AEAD_TAG_SIZE
+        )
+        
+        self.dest.write(header)
+        self.dest.write(self._aead.encrypt(fn_nonce, filename_bytes, b'H' + header))
+        self.body_offset = len(header) + len(filename_bytes) + AEAD_TAG_SIZE
+    
+    @classmethod
+    def resume(cls, encryption: FileEncryption, dest: BinaryIO) -> 'AEADSSVWriter':
+        """Reattach to a partially written v3 file (opened 'r+b') for positional writes"""
+        aead, chunk_size, _, body_offset = _read_v3_header(encryption, dest)
+        
+        writer = cls.__new__(cls)
+        writer._start(encryption, dest, chunk_size)
+        writer._aead = aead
+        writer.body_offset = body_offset
+        return writer
+    
+    def _sealed_size(self, plaintext_size: int) -> int:
+        return NONCE_SIZE + plaintext_size + AEAD_TAG_SIZE
+    
+    def _seal(self, index: int, chunk: bytes) -> Tuple[bytes, ...]:
+        # Random nonces keep slots safe to rewrite when a resumable upload retries
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce, self._aead.encrypt(nonce, chunk, b'C' + index.to_bytes(8, byteorder='big'))
+    
+    def _write_trailer(self, chunk_count: int, plaintext_size: int):
+        trailer = V2_TRAILER.pack(chunk_count, plaintext_size)
+        nonce = os.urandom(NONCE_SIZE)
+        self.dest.write(trailer)
+        self.dest.write(nonce)
+        self.dest.write(self._aead.encrypt(nonce, b'', b'T' + trailer))
+
+
+class SSVReader:
+    """
+    Random-access reader for v2 .ssv files.
+    source must be a seekable binary file object; records are read one at a
+    time and authenticated and decrypted in parallel batches.
+    """
+    
+    TRAILER_SIZE = TRAILER_SIZE
+    
+    def __init__(self, encryption: FileEncryption, source: BinaryIO):
+        keys, chunk_size, self.filename, body_offset = _read_v2_header(encryption, source)
+        self._enc_key, self._mac_key = keys.data_key, keys.mac_key
+        self._start(encryption, source, chunk_size, body_offset)
+    
+    def _start(self, encryption: FileEncryption, source: BinaryIO, chunk_size: int, body_offset: int):
+        self.encryption = encryption
+        self.source = source
+        self.chunk_size = chunk_size
+        self.body_offset = body_offset
+        self.record_size = self._sealed_size(chunk_size)
+        
+        total_size = source.seek(0, os.SEEK_END)
+        body_size = total_size - self.body_offset - self.TRAILER_SIZE
+        if body_size < 0:
+            raise SSVFormatError("Truncated .ssv file")
+        
+        source.seek(total_size - self.TRAILER_SIZE)
+        trailer = source.read(self.TRAILER_SIZE)
+        self.chunk_count, self.size = self._open_trailer(trailer)
+        
+        full_chunks, remainder = divmod(body_size, self.record_size)
+        if full_chunks + (1 if remainder else 0) != self.chunk_count:
+            raise SSVFormatError("Chunk count mismatch")
+        self._last_record_size = remainder or self.record_size
+    
+    def _sealed_size(self, plaintext_size: int) -> int:
+        return IV_SIZE + _padded_size(plaintext_size) + TAG_SIZE
+    
+    def _open_trailer(self, trailer: bytes) -> Tuple[int, int]:
+        body, trailer_tag = trailer[:V2_TRAILER.size], trailer[V2_TRAILER.size:]
+        if not hmac.compare_digest(trailer_tag, _mac(self._mac_key, b'T', body)):
+            raise SSVFormatError("Trailer authentication failed")
+        return V2_TRAILER.unpack(body)
+    
+    def _open(self, index: int, record: bytes) -> bytes:
+        record = memoryview(record)
+        iv = bytes(record[:IV_SIZE])
+        encrypted_chunk = record[IV_SIZE:-TAG_SIZE]
+        tag = bytes(record[-TAG_SIZE:])
+        
+        expected = _mac(self._mac_key, b'C', index.to_bytes(8, byteorder='big'), iv, encrypted_chunk)
+        if not hmac.compare_digest(tag, expected):
+            raise SSVFormatError(f"Chunk {index} authentication failed")
+        return _cbc_decrypt(self._enc_key, iv, encrypted_chunk)
+    
+    def _read_record(self, index: int, buffer: Optional[bytearray] = None) -> memoryview:
+        """Read a record with readinto(), reusing buffer when one is given"""
+        if not 0 <= index < self.chunk_count:
+            raise IndexError("Chunk index out of range")
+        
+        record_size = self._last_record_size if index == self.chunk_count - 1 else self.record_size
+        record = memoryview(buffer if buffer is not None else bytearray(self.record_size))[:record_size]
+        self.source.seek(self.body_offset + index * self.record_size)
+        if _read_into(self.source, record) != record_size:
+            raise SSVFormatError("Truncated chunk")
+        return record
+    
+    def _open_checked(self, index: int, record: bytes) -> bytes:
+        chunk = self._open(index, record)
+        if index != self.chunk_count - 1 and len(chunk) != self.chunk_size:
+            raise SSVFormatError(f"Chunk {index} has invalid length")
+        return chunk
+    
+    def read_chunk(self, index: int) -> bytes:
+        """Authenticate and decrypt a single chunk"""
+        return self._open_checked(index, self._read_record(index))
+    
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the plaintext bytes in [start, end), decrypting only the covering chunks"""
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return
+        
+        first = start // self.chunk_size
+        last = (end - 1) // self.chunk_size
+        batch_size = self.encryption.parallelism
+        # Record buffers are reused for every batch; each decrypted chunk is a fresh buffer
+        buffers = [bytearray(self.record_size) for _ in range(min(batch_size, last - first + 1))]
+        for batch_start in range(first, last + 1, batch_size):
+            indexes = range(batch_start, min(batch_start + batch_size, last + 1))
+            records = [self._read_record(index, buffer) for index, buffer in zip(indexes, buffers)]
+            for index, chunk in zip(indexes, self.encryption.map_chunks(self._open_checked, indexes, records)):
+                chunk_start = index * self.chunk_size
+                lo = max(start - chunk_start, 0)
+                hi = min(end - chunk_start, len(chunk))
+                yield chunk if (lo, hi) == (0, len(chunk)) else memoryview(chunk)[lo:hi]
+    
+    def readinto(self, buffer) -> int:
+        """Decrypt the whole file into a preallocated buffer of at least size bytes"""
+        return _readinto(self, buffer)
+
+
+class AEADSSVReader(SSVReader):
+    """Random-access reader for v3 (AEAD) .ssv files"""
+    
+    TRAILER_SIZE = V3_TRAILER_SIZE
+    
+    def __init__(self, encryption: FileEncryption, source: BinaryIO):
+        self._aead, chunk_size, self.filename, body_offset = _read_v3_header(encryption, source)
+        self._start(encryption, source, chunk_size, body_offset)
+    
+    def _sealed_size(self, plaintext_size: int) -> int:
+        return NONCE_SIZE + plaintext_size + AEAD_TAG_SIZE
+    
+    def _open_trailer(self, trailer: bytes) -> Tuple[int, int]:
+        body = trailer[:V2_TRAILER.size]
+        nonce = trailer[V2_TRAILER.size:V2_TRAILER.size + NONCE_SIZE]
+        try:
+            self._aead.decrypt(nonce, trailer[V2_TRAILER.size + NONCE_SIZE:], b'T' + body)
+        except InvalidTag:
+            raise SSVFormatError("Trailer authentication failed")
+        return V2_TRAILER.unpack(body)
+    
+    def _open(self, index: int, record: bytes) -> bytes:
+        record = memoryview(record)
+        try:
+            return self._aead.decrypt(bytes(record[:NONCE_SIZE]), record[NONCE_SIZE:], b'C' + index.to_bytes(8, byteorder='big'))
+        except InvalidTag:
+            raise SSVFormatError(f"Chunk {index} authentication failed")
+
+
+class LegacySSVReader:
+    """
+    Streaming reader for v1 .ssv files (a single AES-256-CBC stream).
+    CBC decryption only needs the previous ciphertext block as IV, so any
+    block-aligned range can be decrypted without touching the rest of the file.
+    """
+    
+    HEADER_SIZE = 72
+    
+    def __init__(self, encryption: FileEncryption, source: BinaryIO):
+        self.source = source
+        self.chunk_size = encryption.chunk_size
+        
+        source.seek(0)
+        header = source.read(self.HEADER_SIZE)
+        if len(header) != self.HEADER_SIZE:
+            raise SSVFormatError("Truncated .ssv header")
+        
+        salt = header[4:20]
+        self._iv = header[20:36]
+        fn_salt = header[36:52]
+        fn_iv = header[52:68]
+        filename_length = int.from_bytes(header[68:72], byteorder='big')
+        
+        encrypted_filename = source.read(filename_length)
+        self.filename = encryption.decrypt_file(encrypted_filename, fn_salt, fn_iv).decode('utf-8')
+        self._key = encryption.derive_key(salt)
+        
+        self.body_offset = self.HEADER_SIZE + filename_length
+        body_size = source.seek(0, os.SEEK_END) - self.body_offset
+        if body_size < 16 or body_size % 16 != 0:
+            raise SSVFormatError("Invalid v1 ciphertext length")
+        
+        # The plaintext size is only known once the padding in the last block is read
+        last_block = self._decrypt_blocks(body_size // 16 - 1, 1)
+        pad = last_block[-1]
+        if not 1 <= pad <= 16 or last_block[-pad:] != bytes([pad]) * pad:
+            raise SSVFormatError("Invalid padding (wrong key or corrupted file)")
+        self.size = body_size - pad
+    
+    def _decrypt_blocks(self, first_block: int, block_count: int) -> bytes:
+        """Decrypt block_count raw AES blocks starting at first_block"""
+        if first_block == 0:
+            iv = self._iv
+            self.source.seek(self.body_offset)
+        else:
+            self.source.seek(self.body_offset + (first_block - 1) * 16)
+            iv = self.source.read(16)
+        
+        encrypted_data = self.source.read(block_count * 16)
+        decryptor = Cipher(algorithms.AES(self._key), modes.CBC(iv), backend=default_backend()).decryptor()
+        return decryptor.update(encrypted_data) + decryptor.finalize()
+    
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the plaintext bytes in [start, end), chunk_size bytes at a time"""
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return
+        
+        blocks_per_read = self.chunk_size // 16
+        block = start // 16
+        last_block = (end - 1) // 16
+        while block <= last_block:
+            count = min(blocks_per_read, last_block - block + 1)
+            data = self._decrypt_blocks(block, count)
+            offset = block * 16
+            yield data[max(start - offset, 0):min(end - offset, len(data))]
+            block += count
+    
+    def readinto(self, buffer) -> int:
+        """Decrypt the whole file into a preallocated buffer of at least size bytes"""
+        return _readinto(self, buffer)
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict
+from app.core import metrics
+
+PBKDF2_ITERATIONS = 100000
+
+
+class DerivedKeyCache:
+    """
+    Bounded LRU of PBKDF2-derived file keys, keyed by salt.
+    Every .ssv file has its own random salt, so repeated decodes of the same
+    file skip the 100k-iteration derivation once its key is cached.
+    """
+    
+    def __init__(self, master_key: bytes, max_entries: int = 1024):
+        self.master_key = master_key
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def derive(self, salt: bytes) -> bytes:
+        """Return the 32-byte PBKDF2 key for salt, deriving it on a miss"""
+        salt = bytes(salt)
+        
+        with self._lock:
+            key = self._keys.get(salt)
+            if key is not None:
+                self._keys.move_to_end(salt)
+                self.hits += 1
+                return key
+            self.misses += 1
+        
+        # Derive outside the lock so concurrent misses don't serialise
+        with metrics.stage("kdf"):
+            key = hashlib.pbkdf2_hmac('sha256', self.master_key, salt, PBKDF2_ITERATIONS, dklen=32)
+        
+        if self.max_entries > 0:
+            with self._lock:
+                self._keys[salt] = key
+                self._keys.move_to_end(salt)
+                while len(self._keys) > self.max_entries:
+                    self._keys.popitem(last=False)
+        
+        return key
+    
+    def clear(self):
+        """Drop all cached keys"""
+        with self._lock:
+            self._keys.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._keys),
+                "max_entries": self.max_entries
+            }
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+NONCE_SIZE = 12
+
+
+class DecodedFile(NamedTuple):
+    """A decrypted file as served by /api/decode"""
+    filename: str
+    data: bytes
+
+
+class PlaintextCache:
+    """
+    LRU of decrypted files, bounded by total bytes and by age.
+    Repeat decodes of hot files skip the storage read, the key derivation
+    and the decrypt.
+    
+    An optional shared tier (RedisPlaintextCache) sits behind the local LRU
+    so several worker processes can reuse each other's work. A shared hit is
+    copied into the local LRU.
+    
+    Take generation() before decrypting and hand it to put(): if the file
+    was invalidated in the meantime, the stale plaintext is dropped.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float = 300,
+        max_entry_bytes: int = 16 * 1024 * 1024,
+        shared: Optional["RedisPlaintextCache"] = None
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes) if max_bytes > 0 else max_entry_bytes
+        self.shared = shared
+        self.size = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (expires_at, DecodedFile)
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def cacheable(self, size: int) -> bool:
+        """Whether a plaintext of size bytes would be kept"""
+        return size <= self.max_entry_bytes and (self.max_bytes > 0 or self.shared is not None)
+    
+    def get(self, key: str) -> Optional[DecodedFile]:
+        """Return the cached plaintext for key, or None. With a shared tier this may block on the network."""
+        decoded = self.get_local(key)
+        return decoded if decoded is not None else self.get_shared(key)
+    
+    def get_local(self, key: str) -> Optional[DecodedFile]:
+        """Look only in the in-process LRU, without blocking; counts hits but not misses"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, decoded = entry
+            if expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return decoded
+    
+    def get_shared(self, key: str) -> Optional[DecodedFile]:
+        """Look in the shared tier after a local miss; counts the lookup's outcome"""
+        generation = self.generation()
+        decoded = self.shared.get(key) if self.shared is not None else None
+        with self._lock:
+            if decoded is None:
+                self.misses += 1
+            else:
+                self.shared_hits += 1
+        if decoded is not None:
+            self._put_local(key, decoded, generation)
+        return decoded
+    
+    def generation(self) -> int:
+        """Token to pass to put() for a file about to be decrypted"""
+        with self._lock:
+            return self._generation
+    
+    def put(self, key: str, decoded: DecodedFile, generation: Optional[int] = None):
+        """Cache a decrypted file in both tiers, unless something was invalidated since generation was taken"""
+        if len(decoded.data) > self.max_entry_bytes:
+            return
+        if not self._put_local(key, decoded, generation):
+            return
+        if self.shared is not None:
+            self.shared.put(key, decoded, self.ttl)
+            if generation is not None and self.generation() != generation:
+                # Invalidated while the shared write was in flight
+                self.shared.delete(key)
+    
+    def _put_local(self, key: str, decoded: DecodedFile, generation: Optional[int] = None) -> bool:
+        """Store decoded in the local LRU; returns False if generation is stale"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            if self.max_bytes <= 0 or len(decoded.data) > self.max_entry_bytes:
+                return True
+            
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, decoded)
+            self.size += len(decoded.data)
+            
+            # Drop expired entries from the cold end, then evict least recently used until within budget
+            now = time.monotonic()
+            while self._entries and next(iter(self._entries.values()))[0] <= now:
+                self._remove(next(iter(self._entries)))
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+    
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1].data)
+    
+    def invalidate(self, key: str):
+        """Forget key everywhere, e.g. when its file is deleted"""
+        with self._lock:
+            self._remove(key)
+            self._generation += 1
+        if self.shared is not None:
+            self.shared.delete(key)
+    
+    def clear(self):
+        """Drop all locally cached plaintext"""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self._generation += 1
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and occupancy for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "shared": self.shared is not None
+            }
+
+
+class RedisPlaintextCache:
+    """
+    Shared plaintext tier in Redis or anything speaking its get/set/delete
+    commands (Valkey, KeyDB, a test fake). Values are sealed with AES-GCM
+    under a key derived from SECRET_KEY, so the shared store never holds
+    plaintext. Redis enforces the TTL.
+    """
+    
+    def __init__(self, secret_key: bytes, url: str = "", prefix: str = "ssv:plain:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("PLAINTEXT_CACHE_REDIS_URL requires redis (pip install redis)")
+            client = redis.Redis.from_url(url)
+        
+        self.client = client
+        self.prefix = prefix
+        self._aead = AESGCM(hashlib.sha256(b"ssv plaintext cache" + secret_key).digest())
+    
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+    
+    def get(self, key: str) -> Optional[DecodedFile]:
+        value = self.client.get(self._key(key))
+        if value is None:
+            return None
+        
+        try:
+            plain = self._aead.decrypt(value[:NONCE_SIZE], value[NONCE_SIZE:], self._key(key).encode())
+        except Exception:
+            # Written under another key or corrupted: treat as a miss
+            return None
+        name_length = int.from_bytes(plain[:4], byteorder='big')
+        filename = plain[4:4 + name_length].decode('utf-8')
+        return DecodedFile(filename, plain[4 + name_length:])
+    
+    def put(self, key: str, decoded: DecodedFile, ttl: float):
+        filename = decoded.filename.encode('utf-8')
+        plain = len(filename).to_bytes(4, byteorder='big') + filename + decoded.data
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = nonce + self._aead.encrypt(nonce, plain, self._key(key).encode())
+        self.client.set(self._key(key), sealed, ex=max(int(ttl), 1))
+    
+    def delete(self, key: str):
+        self.client.delete(self._key(key))
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+
+class FileRecord(NamedTuple):
+    """Read-only snapshot of an EncryptedFile row, safe to share between requests"""
+    id: str
+    original_filename: str
+    encrypted_filename: str
+    file_size: int
+    mime_type: Optional[str]
+    content_hash: Optional[str]
+    ssv_digest: Optional[str]
+    ssv_size: Optional[int]
+    upload_date: Optional[datetime]
+
+
+class FileRecordCache:
+    """
+    Bounded LRU of file metadata keyed by file id, so download, decode and
+    delete skip the primary-key lookup for hot files.
+    
+    Uploads prime it and deletes invalidate it. Entries also expire after
+    ttl seconds, which bounds how long another process's delete can go
+    unnoticed. A lookup that raced with an invalidation is not cached: call
+    generation() before reading the database and pass it to put().
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # key -> (expires_at, FileRecord)
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[FileRecord]:
+        """Return the cached record for key, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def generation(self) -> int:
+        """Token to pass to put() for a record about to be read from the database"""
+        with self._lock:
+            return self._generation
+    
+    def put(self, key: str, record: FileRecord, generation: Optional[int] = None):
+        """Cache a record, unless something was invalidated since generation was taken"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: str):
+        """Forget key, e.g. when its file is deleted"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self.invalidations += 1
+    
+    def clear(self):
+        """Drop all cached records"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and occupancy for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries
+            }
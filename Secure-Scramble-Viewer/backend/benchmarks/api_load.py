@@ -0,0 +1,191 @@
+"""
+Concurrency sweep against the FastAPI app: POST /api/upload then
+GET /api/decode at increasing numbers of concurrent clients.
+
+    inprocess   httpx over ASGITransport, no sockets: the app's own cost
+    uvicorn     a real uvicorn server on localhost
+
+Both run against a throwaway SQLite database and local storage directory.
+Each upload is fresh random content, so deduplication never short-cuts it.
+
+Run from backend/:
+    python -m benchmarks.api_load --concurrency 1 4 16 --output api.json
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from benchmarks import results
+
+SECRET = "benchmark-secret-key-benchmark-secret-key"
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def bench_environment(workdir: str) -> dict:
+    """Settings for a throwaway app instance rooted at workdir"""
+    return {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "STORAGE_PATH": os.path.join(workdir, "storage"),
+        "STORAGE_BACKEND": "local",
+        "SECRET_KEY": SECRET,
+        "MAX_FILE_SIZE": str(1024 ** 3),
+    }
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+async def _sweep_phase(concurrency: int, requests: int, send) -> dict:
+    """Run send(i) requests times with at most concurrency in flight"""
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    transferred = 0
+    
+    async def one(index: int):
+        nonlocal errors, transferred
+        async with slots:
+            start = time.perf_counter()
+            try:
+                transferred += await send(index)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "req_s": len(latencies) / elapsed,
+        "mb_s": transferred / 1e6 / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+async def sweep(client: httpx.AsyncClient, mode: str, concurrency_levels: list, requests: int,
+                payload_size: int, log=print) -> list:
+    records = []
+    
+    for concurrency in concurrency_levels:
+        file_ids = [None] * requests
+        
+        async def upload(index: int) -> int:
+            payload = os.urandom(payload_size)
+            response = await client.post("/api/upload", files={"file": (f"bench-{index}.bin", payload, "application/octet-stream")})
+            response.raise_for_status()
+            file_ids[index] = response.json()["file_id"]
+            return payload_size
+        
+        async def decode(index: int) -> int:
+            if file_ids[index] is None:
+                raise RuntimeError("upload failed")
+            response = await client.get("/api/decode", params={"file_id": file_ids[index]})
+            response.raise_for_status()
+            return len(response.content)
+        
+        for endpoint, send in (("upload", upload), ("decode", decode)):
+            metrics = await _sweep_phase(concurrency, requests, send)
+            params = {"mode": mode, "endpoint": endpoint, "concurrency": concurrency, "payload_bytes": payload_size}
+            records.append(results.record("api_load", endpoint, params, metrics))
+            log(f"{mode:<10}{endpoint:<8}c={concurrency:<4}{metrics['req_s']:>9.1f} req/s"
+                f"{metrics['p50_ms']:>10.1f} ms p50{metrics['p99_ms']:>10.1f} ms p99  errors={metrics['errors']}")
+    
+    return records
+
+
+async def run_inprocess(workdir: str, concurrency_levels: list, requests: int, payload_size: int, log=print) -> list:
+    # Settings are read at import time, so configure before the app is imported
+    os.environ.update(bench_environment(workdir))
+    sys.path.insert(0, BACKEND_DIR)
+    from app.api.main import app
+    from app.core.workers import worker_pool
+    from app.db.database import engine, init_db
+    
+    await init_db()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await sweep(client, "inprocess", concurrency_levels, requests, payload_size, log)
+    finally:
+        worker_pool.shutdown()
+        await engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(workdir: str, concurrency_levels: list, requests: int, payload_size: int, log=print) -> list:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **bench_environment(workdir)}
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        limits = httpx.Limits(max_connections=max(concurrency_levels), max_keepalive_connections=max(concurrency_levels))
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            
+            return await sweep(client, "uvicorn", concurrency_levels, requests, payload_size, log)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run(modes: list, concurrency_levels: list, requests: int, payload_size: int, log=print) -> list:
+    records = []
+    for mode in modes:
+        with tempfile.TemporaryDirectory(prefix=f"ssv-bench-{mode}-") as workdir:
+            runner = run_inprocess if mode == "inprocess" else run_uvicorn
+            records += asyncio.run(runner(workdir, concurrency_levels, requests, payload_size, log))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=("inprocess", "uvicorn"), default=["inprocess", "uvicorn"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=64, help="requests per endpoint and concurrency level")
+    parser.add_argument("--payload-kb", type=int, default=256)
+    parser.add_argument("--output", "-o", help="write JSON results here ('-' for stdout)")
+    args = parser.parse_args()
+    
+    log = (lambda line: print(line, file=sys.stderr)) if args.output == "-" else print
+    records = run(args.modes, args.concurrency, args.requests, args.payload_kb * 1024, log)
+    
+    if args.output:
+        results.write(records, args.output)
+
+
+if __name__ == "__main__":
+    main()
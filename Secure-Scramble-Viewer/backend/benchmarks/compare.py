@@ -0,0 +1,62 @@
+"""
+Diff two benchmark result files, matching measurements by benchmark, case
+and parameters. Prints the relative change of the headline metric of each
+and exits 1 when any regressed by more than --threshold.
+
+Run from backend/:
+    python -m benchmarks.compare baseline.json results.json --threshold 10
+"""
+import argparse
+import sys
+from benchmarks import results
+
+# Headline metric per benchmark, and whether bigger is better
+HEADLINE = {
+    "size_sweep": ("seconds", False),
+    "api_load": ("p50_ms", False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = parser.parse_args()
+    
+    baseline = results.load(args.baseline)
+    current = results.load(args.current)
+    before = {results.record_key(result): result for result in baseline["results"]}
+    
+    for field in ("git_commit", "python", "openssl", "cpu_count"):
+        old, new = baseline["environment"].get(field), current["environment"].get(field)
+        if old != new:
+            print(f"note: {field} differs: {old} -> {new}")
+    
+    regressions = 0
+    for result in current["results"]:
+        old = before.pop(results.record_key(result), None)
+        label = f"{result['benchmark']}/{result['case']} " + " ".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+        if old is None:
+            print(f"new       {label}")
+            continue
+        
+        metric, higher_is_better = HEADLINE.get(result["benchmark"], ("seconds", False))
+        old_value, new_value = old["metrics"].get(metric), result["metrics"].get(metric)
+        if not old_value or new_value is None:
+            continue
+        
+        change = (new_value - old_value) / old_value * 100
+        worse = -change if higher_is_better else change
+        status = "REGRESSED" if worse > args.threshold else "improved " if worse < -args.threshold else "same     "
+        regressions += status == "REGRESSED"
+        print(f"{status} {label}: {metric} {old_value:.4g} -> {new_value:.4g} ({change:+.1f}%)")
+    
+    for old in before.values():
+        print(f"missing   {old['benchmark']}/{old['case']} {old['params']}")
+    
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Check that building and parsing .ssv files in memory does not copy the
+payload more than necessary: peak traced allocation must stay under
+--limit x the file size (default 1.5).
+
+Covers FileEncryption (v1, v2 and v3) and, when it is importable, the
+desktop SSVDecoder. Exits non-zero on failure.
+
+Run from backend/:
+    python -m benchmarks.memory_peak --size-mb 64
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from app.utils.encryption import FileEncryption
+
+SECRET = "benchmark-secret-key"
+DESKTOP_DECODER = os.path.join(os.path.dirname(__file__), "..", "..", "desktop-decoder")
+
+
+def peak_allocation(func, *args) -> int:
+    """Peak bytes allocated while func runs, including what it returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+
+def build_v1(encryption: FileEncryption, data: bytes, filename: str) -> bytes:
+    """v1 files are no longer written by the backend; assemble one for the read path"""
+    encrypted_data, salt, iv = encryption.encrypt_file(data)
+    encrypted_filename, fn_salt, fn_iv = encryption.encrypt_file(filename.encode('utf-8'))
+    return b''.join((
+        (1).to_bytes(4, byteorder='big'), salt, iv, fn_salt, fn_iv,
+        len(encrypted_filename).to_bytes(4, byteorder='big'), encrypted_filename, encrypted_data
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--limit", type=float, default=1.5, help="allowed peak as a multiple of the file size")
+    args = parser.parse_args()
+    
+    size = args.size_mb * 1024 * 1024
+    data = os.urandom(size)
+    
+    cases = []
+    for cipher in ("aes-256-gcm", "chacha20-poly1305", "aes-256-cbc"):
+        encryption = FileEncryption(SECRET, cipher=cipher)
+        ssv = encryption.create_ssv_file(data, "payload.bin")
+        cases.append((f"create_ssv_file ({cipher})", encryption.create_ssv_file, data, "payload.bin"))
+        cases.append((f"parse_ssv_file ({cipher})", encryption.parse_ssv_file, ssv))
+    
+    encryption = FileEncryption(SECRET)
+    v1 = build_v1(encryption, data, "payload.bin")
+    encrypted_data, salt, iv = encryption.encrypt_file(data)
+    cases.append(("encrypt_file (v1)", encryption.encrypt_file, data))
+    cases.append(("decrypt_file (v1)", encryption.decrypt_file, encrypted_data, salt, iv))
+    cases.append(("parse_ssv_file (v1)", encryption.parse_ssv_file, v1))
+    
+    if os.path.isdir(DESKTOP_DECODER):
+        sys.path.insert(0, DESKTOP_DECODER)
+        try:
+            from ssv_decoder import SSVDecoder
+        except ImportError as e:
+            print(f"Skipping desktop SSVDecoder: {e}")
+        else:
+            decoder = SSVDecoder(SECRET)
+            for label, ssv in (("v3", FileEncryption(SECRET).create_ssv_file(data, "payload.bin")),
+                               ("v2", FileEncryption(SECRET, cipher="aes-256-cbc").create_ssv_file(data, "payload.bin")),
+                               ("v1", v1)):
+                cases.append((f"SSVDecoder.parse_ssv_file ({label})", decoder.parse_ssv_file, ssv))
+    
+    failed = False
+    print(f"{args.size_mb} MB payload, limit {args.limit}x")
+    for name, func, *func_args in cases:
+        ratio = peak_allocation(func, *func_args) / size
+        ok = ratio <= args.limit
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<44}{ratio:6.2f}x")
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Machine-readable benchmark results.
+
+Every benchmark produces records of the form
+
+    {"benchmark": "size_sweep", "case": "parse_ssv_file",
+     "params": {"format": "v3", "size_bytes": 1024, ...},
+     "metrics": {"seconds": 0.001, "mb_s": 1.0, ...}}
+
+benchmark, case and params identify a measurement across runs, so two
+result files can be diffed with benchmarks.compare.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+FORMAT_VERSION = 1
+
+
+def record(benchmark: str, case: str, params: dict, metrics: dict) -> dict:
+    return {"benchmark": benchmark, "case": case, "params": params, "metrics": metrics}
+
+
+def record_key(result: dict) -> str:
+    """Stable identity of a measurement, used to match records between runs"""
+    return json.dumps([result["benchmark"], result["case"], result["params"]], sort_keys=True)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    """What the numbers depend on: interpreter, machine and crypto library"""
+    from cryptography.hazmat.backends.openssl.backend import backend
+    
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "openssl": backend.openssl_version_text(),
+    }
+
+
+def document(results: List[dict]) -> dict:
+    return {"format_version": FORMAT_VERSION, "environment": environment(), "results": results}
+
+
+def write(results: List[dict], path: str):
+    """Write a results document to path, or to stdout for '-'"""
+    text = json.dumps(document(results), indent=2)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported results format {data.get('format_version')}")
+    return data
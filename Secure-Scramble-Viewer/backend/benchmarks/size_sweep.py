@@ -0,0 +1,168 @@
+"""
+Sweep .ssv create/parse time over plaintext sizes (1 KB to 1 GB by default),
+plus the cost of one PBKDF2 file-key derivation.
+
+    create_ssv_file   new random salt, so it includes PBKDF2
+    parse_ssv_file    warm key cache: the bulk cipher and parsing only
+    desktop_decode    desktop SSVDecoder.parse_ssv_file; it has no key cache,
+                      so this is the cold open the viewer pays
+
+The largest sizes need about three times the size in RAM; cap them with
+--max-size.
+
+Run from backend/:
+    python -m benchmarks.size_sweep --max-size 64M --output sweep.json
+"""
+import argparse
+import gc
+import hashlib
+import os
+import sys
+import time
+from app.utils.encryption import FileEncryption
+from app.utils.keys import PBKDF2_ITERATIONS
+from benchmarks import results
+
+SECRET = "benchmark-secret-key"
+DESKTOP_DECODER = os.path.join(os.path.dirname(__file__), "..", "..", "desktop-decoder")
+CIPHERS = ("aes-256-gcm", "chacha20-poly1305", "aes-256-cbc")
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """'1K', '64M', '1G' or a plain byte count"""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+def sizes_between(min_size: int, max_size: int, step: int) -> list:
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= step
+    return sizes
+
+
+def timed(repeat: int, func) -> dict:
+    """Best and median wall time over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {"seconds": times[0], "median_seconds": times[len(times) // 2], "runs": repeat}
+
+
+def repeats_for(size: int, repeat: int) -> int:
+    # Large payloads are dominated by the cipher and already stable
+    if size >= 256 * UNITS["M"]:
+        return 1
+    if size >= 16 * UNITS["M"]:
+        return min(repeat, 3)
+    return repeat
+
+
+def bench_pbkdf2(repeat: int) -> dict:
+    key = hashlib.sha256(SECRET.encode()).digest()
+    metrics = timed(repeat, lambda: hashlib.pbkdf2_hmac('sha256', key, os.urandom(16), PBKDF2_ITERATIONS, dklen=32))
+    return results.record("size_sweep", "pbkdf2", {"iterations": PBKDF2_ITERATIONS}, metrics)
+
+
+def load_desktop_decoder():
+    if not os.path.isdir(DESKTOP_DECODER):
+        return None
+    sys.path.insert(0, DESKTOP_DECODER)
+    try:
+        from ssv_decoder import SSVDecoder
+    except ImportError as e:
+        print(f"Skipping desktop SSVDecoder: {e}", file=sys.stderr)
+        return None
+    return SSVDecoder(SECRET, verbose=False)
+
+
+def run(sizes: list, ciphers=CIPHERS, chunk_size: int = 1024 * 1024, threads: int = 1,
+        repeat: int = 5, desktop: bool = True, log=print) -> list:
+    records = [bench_pbkdf2(repeat)]
+    decoder = load_desktop_decoder() if desktop else None
+    
+    for size in sizes:
+        data = os.urandom(size)
+        runs = repeats_for(size, repeat)
+        
+        for cipher in ciphers:
+            encryption = FileEncryption(SECRET, chunk_size=chunk_size, cipher=cipher, parallelism=threads)
+            ssv = encryption.create_ssv_file(data, "bench.bin")
+            params = {
+                "format": f"v{int.from_bytes(ssv[:4], byteorder='big')}",
+                "cipher": cipher,
+                "size_bytes": size,
+                "chunk_size": chunk_size,
+                "threads": threads,
+            }
+            
+            cases = [
+                ("create_ssv_file", lambda: encryption.create_ssv_file(data, "bench.bin")),
+                ("parse_ssv_file", lambda: encryption.parse_ssv_file(ssv)),
+            ]
+            if decoder is not None:
+                cases.append(("desktop_decode", lambda: decoder.parse_ssv_file(ssv)))
+            
+            for case, func in cases:
+                metrics = timed(runs, func)
+                metrics["mb_s"] = size / 1e6 / metrics["seconds"]
+                metrics["ssv_bytes"] = len(ssv)
+                records.append(results.record("size_sweep", case, params, metrics))
+                log(f"{case:<17}{params['format']:<4}{cipher:<19}{format_size(size):>6}"
+                    f"{metrics['seconds'] * 1000:>12.2f} ms{metrics['mb_s']:>12.1f} MB/s")
+            
+            del ssv
+        del data
+    
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-size", default="1K")
+    parser.add_argument("--max-size", default="1G")
+    parser.add_argument("--step", type=int, default=4, help="size multiplier between points")
+    parser.add_argument("--ciphers", nargs="+", default=list(CIPHERS))
+    parser.add_argument("--chunk-kb", type=int, default=1024)
+    parser.add_argument("--threads", type=int, default=1, help="chunk threads per file (v2/v3)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per small case; best and median are kept")
+    parser.add_argument("--no-desktop", action="store_true", help="skip the desktop SSVDecoder")
+    parser.add_argument("--output", "-o", help="write JSON results here ('-' for stdout)")
+    args = parser.parse_args()
+    
+    sizes = sizes_between(parse_size(args.min_size), parse_size(args.max_size), args.step)
+    log = (lambda line: print(line, file=sys.stderr)) if args.output == "-" else print
+    
+    records = run(
+        sizes,
+        ciphers=args.ciphers,
+        chunk_size=args.chunk_kb * 1024,
+        threads=args.threads,
+        repeat=args.repeat,
+        desktop=not args.no_desktop,
+        log=log
+    )
+    log(f"pbkdf2 ({PBKDF2_ITERATIONS} iterations): {records[0]['metrics']['seconds'] * 1000:.1f} ms")
+    
+    if args.output:
+        results.write(records, args.output)
+
+
+if __name__ == "__main__":
+    main()
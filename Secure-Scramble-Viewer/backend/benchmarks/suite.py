@@ -0,0 +1,67 @@
+"""
+Run the whole benchmark suite and write one JSON results file:
+
+    size_sweep   create/parse and desktop decode over plaintext sizes, PBKDF2
+    api_load     upload/decode concurrency sweep, in-process and via uvicorn
+
+Compare two runs with:
+    python -m benchmarks.compare baseline.json results.json
+
+Run from backend/:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --output results.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from benchmarks import results, size_sweep
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def run_api_load(concurrency: list, requests: int, payload_kb: int, modes: list) -> list:
+    """api_load configures the app through its environment, so it gets its own interpreter"""
+    command = [
+        sys.executable, "-m", "benchmarks.api_load", "--output", "-",
+        "--concurrency", *map(str, concurrency),
+        "--requests", str(requests),
+        "--payload-kb", str(payload_kb),
+        "--modes", *modes,
+    ]
+    output = subprocess.run(command, cwd=BACKEND_DIR, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", "-o", default="-", help="results file ('-' for stdout)")
+    parser.add_argument("--quick", action="store_true", help="sizes up to 16 MB and a short API sweep")
+    parser.add_argument("--max-size", help="largest plaintext for the size sweep (default 1G, or 16M with --quick)")
+    parser.add_argument("--skip", nargs="+", default=[], choices=("size_sweep", "api_load"))
+    parser.add_argument("--api-modes", nargs="+", choices=("inprocess", "uvicorn"), default=["inprocess", "uvicorn"])
+    args = parser.parse_args()
+    
+    def log(line: str):
+        print(line, file=sys.stderr)
+    
+    records = []
+    
+    if "size_sweep" not in args.skip:
+        max_size = size_sweep.parse_size(args.max_size or ("16M" if args.quick else "1G"))
+        sizes = size_sweep.sizes_between(1024, max_size, 4)
+        records += size_sweep.run(sizes, repeat=3 if args.quick else 5, log=log)
+    
+    if "api_load" not in args.skip:
+        concurrency = [1, 8] if args.quick else [1, 4, 16, 64]
+        requests = 16 if args.quick else 64
+        records += run_api_load(concurrency, requests, 256, args.api_modes)
+    
+    results.write(records, args.output)
+    if args.output != "-":
+        log(f"{len(records)} results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
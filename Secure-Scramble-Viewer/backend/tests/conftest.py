@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Settings are read at import time, so point them at a throwaway database and storage root first
+_root = tempfile.mkdtemp(prefix="ssv-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_root}/ssv.db",
+    SECRET_KEY="ssv-test-secret-key-0123456789abcdef",
+    STORAGE_BACKEND="local",
+    STORAGE_PATH=os.path.join(_root, "storage"),
+    PROFILE_DIR=os.path.join(_root, "profiles")
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.api.main import app
+    
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def fail_first_commit(monkeypatch):
+    """Make the next commit raise IntegrityError, as when a concurrent upload stores the same blob first"""
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.ext.asyncio import AsyncSession
+    
+    commit = AsyncSession.commit
+    failures = [IntegrityError("INSERT", {}, Exception("duplicate content hash"))]
+    
+    async def flaky_commit(self):
+        if failures:
+            raise failures.pop()
+        await commit(self)
+    
+    monkeypatch.setattr(AsyncSession, "commit", flaky_commit)
+    return failures
@@ -0,0 +1,34 @@
+import uuid
+from sqlalchemy import create_engine, event, text
+from app.db import models  # registers the tables on Base.metadata
+from app.db.database import _create_schema
+
+
+def test_uuid_conversion_runs_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    file_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        # encrypted_files as created before ids became Uuid columns
+        conn.execute(text(
+            "CREATE TABLE encrypted_files (id VARCHAR NOT NULL PRIMARY KEY, original_filename VARCHAR NOT NULL, "
+            "encrypted_filename VARCHAR NOT NULL, file_size BIGINT NOT NULL, mime_type VARCHAR, "
+            "upload_date DATETIME DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text(
+            "INSERT INTO encrypted_files (id, original_filename, encrypted_filename, file_size) VALUES (:id, 'a', 'a.ssv', 1)"
+        ), {"id": file_id})
+    
+    updates = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: updates.append(statement) if statement.startswith("UPDATE encrypted_files") else None
+    )
+    for _ in range(2):
+        with engine.begin() as conn:
+            _create_schema(conn)
+    
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM encrypted_files")).scalar() == uuid.UUID(file_id).hex
+        assert conn.execute(text("SELECT name FROM schema_migrations")).scalars().all() == ["encrypted_files.id uuid"]
+    assert len(updates) == 1
@@ -0,0 +1,65 @@
+import os
+import pytest
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def stored(client, monkeypatch):
+    """A file stored with small chunks: (plaintext, file id, .ssv blob)"""
+    from app.api import routes
+    
+    monkeypatch.setattr(routes.encryptor, "chunk_size", CHUNK_SIZE)
+    data = os.urandom(3 * CHUNK_SIZE + 100)
+    file_id = client.post("/api/upload", files={"file": ("ranged.bin", data)}).json()["file_id"]
+    blob = client.get(f"/api/download/{file_id}").content
+    return data, file_id, blob
+
+
+def _decode(client, stored, endpoint, range_header):
+    _, file_id, blob = stored
+    headers = {"Range": range_header} if range_header else {}
+    if endpoint == "decode":
+        return client.get("/api/decode", params={"file_id": file_id}, headers=headers)
+    return client.post("/api/decode-upload", files={"file": ("ranged.ssv", blob)}, headers=headers)
+
+
+@pytest.mark.parametrize("endpoint", ["decode", "decode-upload"])
+def test_range_across_chunk_boundary(client, stored, endpoint):
+    data = stored[0]
+    start, last = CHUNK_SIZE - 10, 2 * CHUNK_SIZE + 9
+    response = _decode(client, stored, endpoint, f"bytes={start}-{last}")
+    
+    assert response.status_code == 206
+    assert response.content == data[start:last + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{last}/{len(data)}"
+    assert response.headers["content-length"] == str(last + 1 - start)
+
+
+@pytest.mark.parametrize("endpoint", ["decode", "decode-upload"])
+def test_suffix_range(client, stored, endpoint):
+    data = stored[0]
+    response = _decode(client, stored, endpoint, "bytes=-150")
+    
+    assert response.status_code == 206
+    assert response.content == data[-150:]
+    assert response.headers["content-range"] == f"bytes {len(data) - 150}-{len(data) - 1}/{len(data)}"
+
+
+@pytest.mark.parametrize("endpoint", ["decode", "decode-upload"])
+def test_unsatisfiable_range(client, stored, endpoint):
+    data = stored[0]
+    response = _decode(client, stored, endpoint, f"bytes={len(data)}-")
+    
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+
+@pytest.mark.parametrize("endpoint", ["decode", "decode-upload"])
+@pytest.mark.parametrize("range_header", ["bytes=5-3", "bytes=abc-", "bytes=-", "items=0-10"])
+def test_invalid_range_is_ignored(client, stored, endpoint, range_header):
+    response = _decode(client, stored, endpoint, range_header)
+    
+    assert response.status_code == 200
+    assert response.content == stored[0]
+    assert "content-range" not in response.headers
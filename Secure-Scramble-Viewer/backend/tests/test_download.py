@@ -0,0 +1,45 @@
+import io
+import os
+import uuid
+import zipfile
+
+
+def test_download_full_range_and_revalidation(client):
+    upload = client.post("/api/upload", files={"file": ("dl.bin", os.urandom(3000))}).json()
+    url = f"/api/download/{upload['file_id']}"
+    
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.headers["etag"] and full.headers["accept-ranges"] == "bytes"
+    
+    partial = client.get(url, headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == full.content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(full.content)}"
+    
+    assert client.get(url, headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+    assert client.get("/api/download/not-a-file-id").status_code == 404
+
+
+def test_batch_download_zip(client):
+    names = ["report.pdf", "report.txt", "notes.bin"]
+    file_ids = [
+        client.post("/api/upload", files={"file": (name, os.urandom(2000))}).json()["file_id"]
+        for name in names
+    ]
+    
+    response = client.post("/api/download/batch", json={"file_ids": file_ids})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["report.ssv", "report (2).ssv", "notes.ssv"]
+        assert archive.testzip() is None
+        for arcname, file_id in zip(archive.namelist(), file_ids):
+            assert archive.read(arcname) == client.get(f"/api/download/{file_id}").content
+    
+    unknown = str(uuid.uuid4())
+    for bad_id in (unknown, "not-a-file-id"):
+        missing = client.post("/api/download/batch", json={"file_ids": [file_ids[0], bad_id]})
+        assert missing.status_code == 404
+        assert missing.json()["detail"] == f"Files not found: {bad_id}"
@@ -0,0 +1,171 @@
+import os
+from io import BytesIO
+import pytest
+from app.utils.encryption import (
+    AEAD_CIPHERS, CIPHERS, IV_SIZE, SSV_VERSION_1, TRAILER_SIZE, V2_HEADER,
+    AEADSSVReader, FileEncryption, LegacySSVReader, SSVFormatError, SSVReader
+)
+
+SECRET = "encryption-test-secret"
+CHUNK_SIZE = 64
+# The v3 cipher id byte follows the version, salt and chunk size
+CIPHER_ID_OFFSET = 24
+
+
+@pytest.fixture(scope="module")
+def v2():
+    return FileEncryption(SECRET, chunk_size=CHUNK_SIZE, cipher="aes-256-cbc")
+
+
+@pytest.fixture(scope="module")
+def v3():
+    return FileEncryption(SECRET, chunk_size=CHUNK_SIZE)
+
+
+def _read_all(reader) -> bytes:
+    return b"".join(bytes(chunk) for chunk in reader.iter_range())
+
+
+def _flip(blob: bytes, offset: int) -> bytes:
+    tampered = bytearray(blob)
+    tampered[offset] ^= 0x01
+    return bytes(tampered)
+
+
+@pytest.mark.parametrize("size", [0, 3 * CHUNK_SIZE, 3 * CHUNK_SIZE + 1])
+def test_v2_round_trip(v2, size):
+    data = os.urandom(size)
+    blob = v2.create_ssv_file(data, "round.bin")
+    
+    reader = v2.open_ssv(BytesIO(blob))
+    assert isinstance(reader, SSVReader)
+    assert reader.chunk_count == -(-size // CHUNK_SIZE)
+    assert reader.size == size
+    assert _read_all(reader) == data
+    assert v2.parse_ssv_file(blob) == (data, "round.bin")
+
+
+def test_v2_tampering_is_detected(v2):
+    blob = v2.create_ssv_file(os.urandom(3 * CHUNK_SIZE), "tamper.bin")
+    reader = v2.open_ssv(BytesIO(blob))
+    
+    # Encrypted filename, covered by the header HMAC
+    with pytest.raises(SSVFormatError, match="Header"):
+        v2.open_ssv(BytesIO(_flip(blob, V2_HEADER.size)))
+    
+    # Ciphertext of the second chunk; the header and trailer still verify
+    tampered = v2.open_ssv(BytesIO(_flip(blob, reader.body_offset + reader.record_size + IV_SIZE)))
+    assert tampered.read_chunk(0) == reader.read_chunk(0)
+    with pytest.raises(SSVFormatError, match="Chunk 1"):
+        tampered.read_chunk(1)
+    with pytest.raises(SSVFormatError, match="Chunk 1"):
+        _read_all(tampered)
+    
+    # Plaintext size in the trailer
+    with pytest.raises(SSVFormatError, match="Trailer"):
+        v2.open_ssv(BytesIO(_flip(blob, len(blob) - TRAILER_SIZE + 15)))
+
+
+def test_v2_truncated_file_is_rejected(v2):
+    blob = v2.create_ssv_file(os.urandom(3 * CHUNK_SIZE), "truncated.bin")
+    
+    with pytest.raises(SSVFormatError, match="Truncated"):
+        v2.open_ssv(BytesIO(blob[:V2_HEADER.size - 1]))
+    # Cut inside the body, the last bytes no longer form an authentic trailer
+    with pytest.raises(SSVFormatError, match="Trailer"):
+        v2.open_ssv(BytesIO(blob[:-1]))
+
+
+def test_v2_chunk_count_mismatch_is_rejected(v2):
+    blob = v2.create_ssv_file(os.urandom(3 * CHUNK_SIZE), "dropped.bin")
+    reader = v2.open_ssv(BytesIO(blob))
+    
+    # Drop a whole record but keep the authentic trailer, which still says three chunks
+    second = reader.body_offset + reader.record_size
+    with pytest.raises(SSVFormatError, match="Chunk count mismatch"):
+        v2.open_ssv(BytesIO(blob[:second] + blob[second + reader.record_size:]))
+
+
+def test_v1_blob_decodes_with_legacy_reader(v2):
+    data = os.urandom(1000)
+    encrypted_data, salt, iv = v2.encrypt_file(data)
+    encrypted_filename, fn_salt, fn_iv = v2.encrypt_file("legacy.txt".encode('utf-8'))
+    blob = b"".join([
+        SSV_VERSION_1.to_bytes(4, byteorder='big'), salt, iv, fn_salt, fn_iv,
+        len(encrypted_filename).to_bytes(4, byteorder='big'), encrypted_filename, encrypted_data
+    ])
+    
+    reader = v2.open_ssv(BytesIO(blob))
+    assert isinstance(reader, LegacySSVReader)
+    assert (reader.filename, reader.size) == ("legacy.txt", len(data))
+    assert _read_all(reader) == data
+    assert b"".join(reader.iter_range(100, 517)) == data[100:517]
+    assert v2.parse_ssv_file(blob) == (data, "legacy.txt")
+
+
+@pytest.mark.parametrize("cipher", [name for name, cipher_id in CIPHERS.items() if cipher_id in AEAD_CIPHERS])
+def test_v3_round_trip(cipher):
+    encryption = FileEncryption(SECRET, chunk_size=CHUNK_SIZE, cipher=cipher)
+    data = os.urandom(3 * CHUNK_SIZE + 1)
+    blob = encryption.create_ssv_file(data, "aead.bin")
+    
+    reader = encryption.open_ssv(BytesIO(blob))
+    assert isinstance(reader, AEADSSVReader)
+    assert blob[CIPHER_ID_OFFSET] == CIPHERS[cipher]
+    assert (reader.chunk_count, reader.size) == (4, len(data))
+    assert _read_all(reader) == data
+    assert encryption.parse_ssv_file(blob) == (data, "aead.bin")
+
+
+def test_v3_unknown_cipher_id_is_rejected(v3):
+    blob = bytearray(v3.create_ssv_file(os.urandom(100), "cipher.bin"))
+    blob[CIPHER_ID_OFFSET] = max(AEAD_CIPHERS) + 1
+    with pytest.raises(SSVFormatError, match="Unknown cipher id"):
+        v3.open_ssv(BytesIO(bytes(blob)))
+
+
+def test_v3_nonce_and_tag_tampering_is_detected(v3):
+    blob = v3.create_ssv_file(os.urandom(3 * CHUNK_SIZE), "tamper.bin")
+    reader = v3.open_ssv(BytesIO(blob))
+    
+    # Nonce of the first record, then the tag at the end of the second
+    for offset, index in ((reader.body_offset, 0), (reader.body_offset + 2 * reader.record_size - 1, 1)):
+        tampered = v3.open_ssv(BytesIO(_flip(blob, offset)))
+        with pytest.raises(SSVFormatError, match=f"Chunk {index} authentication failed"):
+            tampered.read_chunk(index)
+    
+    # Trailer tag
+    with pytest.raises(SSVFormatError, match="Trailer"):
+        v3.open_ssv(BytesIO(_flip(blob, len(blob) - 1)))
+
+
+def test_v3_swapped_chunks_are_detected(v3):
+    data = os.urandom(3 * CHUNK_SIZE)
+    blob = v3.create_ssv_file(data, "swap.bin")
+    reader = v3.open_ssv(BytesIO(blob))
+    
+    first = reader.body_offset
+    second = first + reader.record_size
+    end = second + reader.record_size
+    swapped = blob[:first] + blob[second:end] + blob[first:second] + blob[end:]
+    
+    # Each record is authentic on its own, but its index is bound into the associated data
+    tampered = v3.open_ssv(BytesIO(swapped))
+    assert tampered.read_chunk(2) == data[2 * CHUNK_SIZE:]
+    for index in (0, 1):
+        with pytest.raises(SSVFormatError, match=f"Chunk {index} authentication failed"):
+            tampered.read_chunk(index)
+
+
+@pytest.mark.parametrize("cipher", ["aes-256-gcm", "aes-256-cbc"])
+def test_unaligned_writes_round_trip(cipher):
+    encryption = FileEncryption(SECRET, chunk_size=CHUNK_SIZE, cipher=cipher, parallelism=4)
+    data = os.urandom(10 * CHUNK_SIZE + 7)
+    output = BytesIO()
+    writer = encryption.new_writer(output, "pieces.bin")
+    # Pieces that leave a partial chunk buffered between writes
+    for offset in range(0, len(data), CHUNK_SIZE + 5):
+        writer.write(data[offset:offset + CHUNK_SIZE + 5])
+    writer.close()
+    
+    assert encryption.parse_ssv_file(output.getvalue()) == (data, "pieces.bin")
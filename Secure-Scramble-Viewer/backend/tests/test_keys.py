@@ -0,0 +1,40 @@
+import hashlib
+from app.utils.keys import PBKDF2_ITERATIONS, DerivedKeyCache
+
+MASTER_KEY = hashlib.sha256(b"key-cache-test").digest()
+
+
+def test_hits_and_misses_are_counted():
+    cache = DerivedKeyCache(MASTER_KEY, max_entries=4)
+    key = cache.derive(b"a" * 16)
+    assert key == hashlib.pbkdf2_hmac('sha256', MASTER_KEY, b"a" * 16, PBKDF2_ITERATIONS, dklen=32)
+    
+    assert cache.derive(bytearray(b"a" * 16)) == key
+    assert cache.derive(b"a" * 16) == key
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_least_recently_used_key_is_evicted():
+    cache = DerivedKeyCache(MASTER_KEY, max_entries=2)
+    for salt in (b"a", b"b"):
+        cache.derive(salt * 16)
+    # Touch "a" so "b" is the least recently used when "c" arrives
+    cache.derive(b"a" * 16)
+    cache.derive(b"c" * 16)
+    assert cache.stats()["size"] == 2
+    
+    misses = cache.misses
+    cache.derive(b"a" * 16)
+    cache.derive(b"c" * 16)
+    assert cache.misses == misses
+    cache.derive(b"b" * 16)
+    assert cache.misses == misses + 1
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = DerivedKeyCache(MASTER_KEY, max_entries=0)
+    cache.derive(b"a" * 16)
+    cache.derive(b"a" * 16)
+    assert (cache.hits, cache.misses, cache.stats()["size"]) == (0, 2, 0)
@@ -0,0 +1,66 @@
+import base64
+import os
+import uuid
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+
+def _upload(client, filename: str) -> str:
+    return client.post("/api/upload", files={"file": (filename, os.urandom(100))}).json()["file_id"]
+
+
+def _set_upload_date(file_ids, upload_date: str):
+    """Pin upload dates so several rows tie on the first keyset column"""
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.begin() as conn:
+        for file_id in file_ids:
+            conn.execute(
+                text("UPDATE encrypted_files SET upload_date = :date WHERE id = :id"),
+                {"date": upload_date, "id": uuid.UUID(file_id).hex}
+            )
+    engine.dispose()
+
+
+def _walk(client, limit: int, **params) -> list:
+    """Follow next_cursor to the end; returns one list of file ids per page"""
+    pages = []
+    cursor = None
+    while True:
+        page = client.get("/api/files", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert page.status_code == 200
+        pages.append([f["file_id"] for f in page.json()["files"]])
+        cursor = page.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_through_ties_without_gaps(client):
+    prefix = f"page-{uuid.uuid4().hex[:8]}-"
+    newer = [_upload(client, f"{prefix}new{i}.bin") for i in range(3)]
+    older = [_upload(client, f"{prefix}old{i}.bin") for i in range(4)]
+    _set_upload_date(newer, "2024-01-02 00:00:00")
+    _set_upload_date(older, "2024-01-01 00:00:00")
+    
+    pages = _walk(client, 2, filename_prefix=prefix)
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    listed = [file_id for page in pages for file_id in page]
+    # Newest first, then by id within a shared upload_date
+    assert listed == sorted(newer, reverse=True) + sorted(older, reverse=True)
+
+
+def test_filename_prefix_filter(client):
+    prefix = f"pre_{uuid.uuid4().hex[:8]}"
+    matching = _upload(client, f"{prefix}.txt")
+    # "_" is a LIKE wildcard; the prefix must still match literally
+    _upload(client, f"preX{prefix[4:]}.txt")
+    _upload(client, f"other-{prefix}.txt")
+    
+    assert _walk(client, 10, filename_prefix=prefix) == [[matching]]
+
+
+def test_malformed_cursor_is_rejected(client):
+    bad_id = base64.urlsafe_b64encode(b"2024-01-01T00:00:00|not-a-uuid").decode()
+    for cursor in ("!!!", base64.urlsafe_b64encode(b"no separator").decode(), bad_id):
+        response = client.get("/api/files", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,55 @@
+import os
+from io import BytesIO
+import pytest
+from app.utils.encryption import FileEncryption
+from benchmarks.memory_peak import SECRET, build_v1, peak_allocation
+
+# Small enough to run with the suite; the benchmark defaults to 64 MB
+SIZE = 16 * 1024 * 1024
+LIMIT = 1.5
+CIPHERS = ("aes-256-gcm", "chacha20-poly1305", "aes-256-cbc")
+
+
+@pytest.fixture(scope="module")
+def data():
+    return os.urandom(SIZE)
+
+
+def _assert_peak_within_limit(func, *args):
+    ratio = peak_allocation(func, *args) / SIZE
+    assert ratio <= LIMIT, f"peak allocation {ratio:.2f}x the payload"
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+def test_create_and_parse_in_memory(data, cipher):
+    encryption = FileEncryption(SECRET, cipher=cipher)
+    ssv = encryption.create_ssv_file(data, "payload.bin")
+    
+    _assert_peak_within_limit(encryption.create_ssv_file, data, "payload.bin")
+    _assert_peak_within_limit(encryption.parse_ssv_file, ssv)
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+def test_unaligned_writes(data, cipher):
+    encryption = FileEncryption(SECRET, cipher=cipher)
+    piece = 3 * encryption.chunk_size + 12345
+    
+    def write_unaligned():
+        output = BytesIO()
+        writer = encryption.new_writer(output, "payload.bin")
+        with memoryview(data) as view:
+            for offset in range(0, len(data), piece):
+                writer.write(view[offset:offset + piece])
+        writer.close()
+        return output
+    
+    _assert_peak_within_limit(write_unaligned)
+
+
+def test_v1(data):
+    encryption = FileEncryption(SECRET)
+    encrypted_data, salt, iv = encryption.encrypt_file(data)
+    
+    _assert_peak_within_limit(encryption.encrypt_file, data)
+    _assert_peak_within_limit(encryption.decrypt_file, encrypted_data, salt, iv)
+    _assert_peak_within_limit(encryption.parse_ssv_file, build_v1(encryption, data, "payload.bin"))
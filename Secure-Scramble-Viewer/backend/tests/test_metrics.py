@@ -0,0 +1,41 @@
+import os
+import re
+
+# name{label="value",...} value
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*\})? (\S+)$')
+
+
+def _scrape(client) -> dict:
+    """Sample values keyed by the series as written, after checking every line parses"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    
+    samples = {}
+    families = set()
+    for line in response.text.splitlines():
+        if line.startswith("# TYPE "):
+            name, kind = line.split()[2:]
+            assert kind in ("counter", "gauge", "histogram")
+            families.add(name)
+        elif not line.startswith("# HELP "):
+            match = SAMPLE.match(line)
+            assert match, f"malformed sample line: {line!r}"
+            assert re.sub(r"_(bucket|sum|count)$", "", match.group(1)) in families
+            samples[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    return samples
+
+
+def test_metrics_exposition(client):
+    client.post("/api/upload", files={"file": ("metrics.bin", os.urandom(3000))})
+    samples = _scrape(client)
+    
+    # The upload went through the encrypt stage, which is timed as a histogram
+    count = samples['ssv_stage_duration_seconds_count{stage="encrypt"}']
+    assert count >= 1
+    assert samples['ssv_stage_duration_seconds_sum{stage="encrypt"}'] >= 0
+    assert samples['ssv_stage_duration_seconds_bucket{stage="encrypt",le="+Inf"}'] == count
+    
+    assert samples['ssv_http_requests_total{method="POST",route="/api/upload",status="200"}'] >= 1
+    assert samples['ssv_key_cache_lookups_total{result="miss"}'] >= 1
+    assert "ssv_file_record_cache_entries" in samples
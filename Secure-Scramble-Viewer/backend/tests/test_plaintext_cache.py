@@ -0,0 +1,199 @@
+import os
+import pytest
+from app.utils import plaintext_cache as plaintext_cache_module
+from app.utils.plaintext_cache import DecodedFile, PlaintextCache, RedisPlaintextCache
+
+SECRET = b"plaintext-cache-test-key"
+
+
+class FakeRedis:
+    """The get/set/delete subset of redis-py RedisPlaintextCache uses, backed by a dict"""
+    
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+    
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(plaintext_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _decoded(size: int, name: str = "file.bin") -> DecodedFile:
+    return DecodedFile(name, os.urandom(size))
+
+
+def test_lru_evicts_least_recently_used_within_byte_budget():
+    cache = PlaintextCache(max_bytes=250, max_entry_bytes=100)
+    for key in "abc":
+        cache.put(key, _decoded(100))
+    # Only two 100-byte entries fit; "a" was the oldest
+    assert cache.get_local("a") is None
+    assert cache.get_local("b") is not None
+    
+    # "b" is now more recent than "c", so "c" goes next
+    cache.put("d", _decoded(100))
+    assert cache.get_local("c") is None
+    assert cache.get_local("b") is not None
+    assert cache.stats()["bytes"] == 200
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PlaintextCache(max_bytes=1000, ttl=60)
+    cache.put("a", _decoded(10))
+    clock.now += 59
+    assert cache.get("a") is not None
+    
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_size_eligibility_cutoff():
+    cache = PlaintextCache(max_bytes=1000, max_entry_bytes=100)
+    assert cache.cacheable(100)
+    assert not cache.cacheable(101)
+    
+    cache.put("big", _decoded(101))
+    assert cache.get("big") is None
+    # An entry limit above the whole budget is clamped to the budget
+    assert PlaintextCache(max_bytes=50, max_entry_bytes=100).max_entry_bytes == 50
+    # Nothing is cacheable with neither a local budget nor a shared tier
+    assert not PlaintextCache(max_bytes=0).cacheable(1)
+
+
+def test_invalidate_removes_entry_from_both_tiers():
+    redis = FakeRedis()
+    cache = PlaintextCache(max_bytes=1000, shared=RedisPlaintextCache(SECRET, client=redis))
+    cache.put("a", _decoded(10))
+    assert redis.data
+    
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert not redis.data
+
+
+def test_shared_tier_seals_values():
+    redis = FakeRedis()
+    shared = RedisPlaintextCache(SECRET, client=redis, prefix="t:")
+    decoded = DecodedFile("secret.txt", b"top secret plaintext " * 10)
+    shared.put("id", decoded, ttl=30)
+    
+    stored = redis.data["t:id"]
+    assert b"top secret" not in stored and b"secret.txt" not in stored
+    assert redis.expiry["t:id"] == 30
+    assert shared.get("id") == decoded
+    
+    # A value sealed under another SECRET_KEY reads as a miss
+    assert RedisPlaintextCache(b"another key", client=redis, prefix="t:").get("id") is None
+    # So does a value moved under another key
+    redis.data["t:other"] = stored
+    assert shared.get("other") is None
+
+
+def test_shared_hit_fills_local_tier():
+    redis = FakeRedis()
+    writer = PlaintextCache(max_bytes=1000, shared=RedisPlaintextCache(SECRET, client=redis))
+    reader = PlaintextCache(max_bytes=1000, shared=RedisPlaintextCache(SECRET, client=redis))
+    decoded = _decoded(10)
+    writer.put("a", decoded)
+    
+    assert reader.get_local("a") is None
+    assert reader.get("a") == decoded
+    assert reader.get_local("a") == decoded
+    assert reader.stats()["shared_hits"] == 1
+
+
+def test_delete_file_invalidates_cached_plaintext(client, monkeypatch):
+    from app.api import routes
+    
+    redis = FakeRedis()
+    cache = PlaintextCache(max_bytes=1024 * 1024, shared=RedisPlaintextCache(SECRET, client=redis))
+    monkeypatch.setattr(routes, "plaintext_cache", cache)
+    
+    data = os.urandom(5000)
+    file_id = client.post("/api/upload", files={"file": ("cached.bin", data)}).json()["file_id"]
+    assert client.get("/api/decode", params={"file_id": file_id}).content == data
+    assert cache.get_local(file_id) is not None
+    assert redis.data
+    
+    assert client.delete(f"/api/files/{file_id}").status_code == 200
+    assert cache.get_local(file_id) is None
+    assert not redis.data
+    assert client.get("/api/decode", params={"file_id": file_id}).status_code == 404
+
+
+def test_put_after_invalidation_is_dropped():
+    redis = FakeRedis()
+    cache = PlaintextCache(max_bytes=1000, shared=RedisPlaintextCache(SECRET, client=redis))
+    generation = cache.generation()
+    cache.invalidate("a")
+    
+    # Decrypted before the invalidation: stale, so neither tier keeps it
+    cache.put("a", _decoded(10), generation)
+    assert cache.get_local("a") is None
+    assert not redis.data
+    
+    cache.put("a", _decoded(10), cache.generation())
+    assert cache.get_local("a") is not None
+
+
+def test_invalidation_during_shared_put_is_not_undone():
+    redis = FakeRedis()
+    cache = PlaintextCache(max_bytes=1000, shared=RedisPlaintextCache(SECRET, client=redis))
+    set_value = redis.set
+    
+    def set_then_invalidate(key, value, ex=None):
+        set_value(key, value, ex)
+        # A delete lands between the local and the shared write
+        cache.invalidate("a")
+    
+    redis.set = set_then_invalidate
+    cache.put("a", _decoded(10), cache.generation())
+    assert cache.get_local("a") is None
+    assert not redis.data
+
+
+def test_delete_during_decode_is_not_undone(client, monkeypatch):
+    from app.api import routes
+    
+    redis = FakeRedis()
+    cache = PlaintextCache(max_bytes=1024 * 1024, shared=RedisPlaintextCache(SECRET, client=redis))
+    monkeypatch.setattr(routes, "plaintext_cache", cache)
+    
+    data = os.urandom(5000)
+    file_id = client.post("/api/upload", files={"file": ("racing.bin", data)}).json()["file_id"]
+    decrypt_whole = routes._decrypt_whole
+    
+    def decrypt_then_delete(encrypted_filename):
+        decoded = decrypt_whole(encrypted_filename)
+        # delete_file invalidates while this miss is still decrypting
+        cache.invalidate(file_id)
+        return decoded
+    
+    monkeypatch.setattr(routes, "_decrypt_whole", decrypt_then_delete)
+    assert client.get("/api/decode", params={"file_id": file_id}).content == data
+    assert cache.get_local(file_id) is None
+    assert not redis.data
@@ -0,0 +1,51 @@
+import pstats
+import pytest
+
+ADMIN_TOKEN = "profiling-test-token"
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    """Enable the admin endpoints with ADMIN_TOKEN; sampling stays off and is restored afterwards"""
+    from app.api.main import profiler
+    
+    monkeypatch.setattr(profiler, "admin_token", ADMIN_TOKEN)
+    monkeypatch.setattr(profiler, "sample_rate", 0.0)
+    return {"X-Admin-Token": ADMIN_TOKEN}
+
+
+def test_profiling_disabled_without_admin_token(client, monkeypatch):
+    from app.api.main import profiler
+    
+    monkeypatch.setattr(profiler, "admin_token", "")
+    for headers in ({}, {"X-Admin-Token": ""}, {"X-Admin-Token": "anything"}):
+        assert client.get("/admin/profiling", headers=headers).status_code == 403
+
+
+def test_profiling_rejects_wrong_token(client, admin):
+    for headers in ({}, {"X-Admin-Token": "wrong"}):
+        assert client.get("/admin/profiling", headers=headers).status_code == 403
+        assert client.put("/admin/profiling", json={"sample_rate": 1.0}, headers=headers).status_code == 403
+        assert client.get("/admin/profiling/anything.prof", headers=headers).status_code == 403
+
+
+def test_profile_on_request_and_download(client, admin, tmp_path):
+    assert client.put("/admin/profiling", json={"sample_rate": 2.0}, headers=admin).status_code == 422
+    updated = client.put("/admin/profiling", json={"sample_rate": 0.25}, headers=admin)
+    assert updated.status_code == 200
+    assert updated.json()["sample_rate"] == 0.25
+    # Back off, so only the explicitly requested profile below is written
+    client.put("/admin/profiling", json={"sample_rate": 0.0}, headers=admin)
+    
+    before = set(client.get("/admin/profiling", headers=admin).json()["profiles"])
+    assert client.get("/api/files", headers={**admin, "X-Profile": "1"}).status_code == 200
+    profiles = set(client.get("/admin/profiling", headers=admin).json()["profiles"]) - before
+    assert len(profiles) == 1
+    
+    dump = client.get(f"/admin/profiling/{profiles.pop()}", headers=admin)
+    assert dump.status_code == 200
+    path = tmp_path / "request.prof"
+    path.write_bytes(dump.content)
+    assert pstats.Stats(str(path)).total_calls > 0
+    
+    assert client.get("/admin/profiling/missing.prof", headers=admin).status_code == 404
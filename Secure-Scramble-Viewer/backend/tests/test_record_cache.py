@@ -0,0 +1,42 @@
+from app.utils.record_cache import FileRecord, FileRecordCache
+
+
+def _record(file_id: str) -> FileRecord:
+    return FileRecord(file_id, "file.bin", f"{file_id}.ssv", 100, None, None, None, None, None)
+
+
+def test_lookup_racing_invalidate_is_not_cached():
+    cache = FileRecordCache(max_entries=10)
+    cache.put("a", _record("a"))
+    
+    # A read-through miss takes its token, then a delete invalidates before the row comes back
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.put("a", _record("a"), generation)
+    assert cache.get("a") is None
+    
+    # Other keys are refused too: the token only says something changed
+    cache.put("b", _record("b"), generation)
+    assert cache.get("b") is None
+    
+    cache.put("a", _record("a"), cache.generation())
+    assert cache.get("a") == _record("a")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_clear_also_invalidates_outstanding_tokens():
+    cache = FileRecordCache(max_entries=10)
+    generation = cache.generation()
+    cache.clear()
+    cache.put("a", _record("a"), generation)
+    assert cache.get("a") is None
+
+
+def test_put_without_token_and_lru_bound():
+    cache = FileRecordCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, _record(key))
+    assert cache.get("a") is None
+    assert cache.get("c") == _record("c")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 2)
@@ -0,0 +1,87 @@
+import os
+import pytest
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    from app.api import routes
+    
+    monkeypatch.setattr(routes.encryptor, "chunk_size", CHUNK_SIZE)
+
+
+def _start(client, data: bytes, filename: str = "resumable.bin") -> str:
+    session = client.post("/api/uploads", json={"filename": filename, "size": len(data)})
+    assert session.status_code == 200
+    assert session.json()["chunk_size"] == CHUNK_SIZE
+    return session.json()["upload_id"]
+
+
+def test_put_after_partial_file_is_gone(client, small_chunks):
+    from app.api import routes
+    
+    data = os.urandom(2 * CHUNK_SIZE)
+    upload_id = _start(client, data)
+    # An abort or finalize removed the partial file after the PUT looked up its session
+    os.remove(routes._partial_path(upload_id))
+    
+    response = client.put(f"/api/uploads/{upload_id}", params={"offset": 0}, content=data[:CHUNK_SIZE])
+    assert response.status_code == 404
+
+
+def test_resumable_upload_in_order(client, small_chunks):
+    data = os.urandom(3 * CHUNK_SIZE + 100)
+    upload_id = _start(client, data)
+    url = f"/api/uploads/{upload_id}"
+    
+    first = client.put(url, params={"offset": 0}, content=data[:CHUNK_SIZE])
+    assert first.status_code == 200
+    assert (first.json()["received"], first.json()["complete"]) == (CHUNK_SIZE, False)
+    
+    # Offsets past what was received, or off a chunk boundary, leave a gap
+    for offset in (2 * CHUNK_SIZE, CHUNK_SIZE + 1):
+        gap = client.put(url, params={"offset": offset}, content=data[offset:offset + CHUNK_SIZE])
+        assert gap.status_code == 409
+        assert gap.json()["detail"] == f"Upload must resume at offset {CHUNK_SIZE}"
+    
+    # Only the chunk that ends the file may be short
+    short = client.put(url, params={"offset": CHUNK_SIZE}, content=data[CHUNK_SIZE:CHUNK_SIZE + 500])
+    assert short.status_code == 400
+    
+    status = client.get(url)
+    assert status.status_code == 200
+    assert status.json() == {
+        "upload_id": upload_id,
+        "filename": "resumable.bin",
+        "size": len(data),
+        "chunk_size": CHUNK_SIZE,
+        "received": CHUNK_SIZE,
+        "complete": False
+    }
+    assert client.post(f"{url}/finalize").status_code == 409
+    
+    rest = client.put(url, params={"offset": CHUNK_SIZE}, content=data[CHUNK_SIZE:])
+    assert rest.json()["complete"]
+    
+    finalized = client.post(f"{url}/finalize")
+    assert finalized.status_code == 200
+    assert finalized.json()["size"] == len(data)
+    assert client.post(f"{url}/finalize").status_code == 404
+    assert client.get(url).status_code == 404
+    
+    decoded = client.get("/api/decode", params={"file_id": upload_id})
+    assert decoded.content == data
+
+
+def test_empty_resumable_upload(client, small_chunks):
+    upload_id = _start(client, b"", "empty.txt")
+    assert client.get(f"/api/uploads/{upload_id}").json()["complete"]
+    
+    finalized = client.post(f"/api/uploads/{upload_id}/finalize")
+    assert finalized.status_code == 200
+    assert finalized.json()["size"] == 0
+    
+    decoded = client.get("/api/decode", params={"file_id": upload_id})
+    assert decoded.status_code == 200
+    assert decoded.content == b""
@@ -0,0 +1,132 @@
+import io
+import os
+import pytest
+from app.storage.local import LocalStorage
+from app.storage.s3 import MIN_PART_SIZE, S3Storage
+
+BUCKET = "ssv-test"
+
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    moto = pytest.importorskip("moto")
+    import boto3
+    
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield S3Storage(BUCKET, prefix="blobs/", part_size=MIN_PART_SIZE, client=client)
+
+
+def _record_ranges(storage: S3Storage) -> list:
+    """Capture the Range header of every GetObject the storage issues"""
+    ranges = []
+    get_object = storage.client.get_object
+    
+    def recording_get_object(**kwargs):
+        ranges.append(kwargs["Range"])
+        return get_object(**kwargs)
+    
+    storage.client.get_object = recording_get_object
+    return ranges
+
+
+def test_s3_multipart_write(s3_storage):
+    data = os.urandom(2 * MIN_PART_SIZE + 1234)
+    with s3_storage.open_write("big.ssv") as f:
+        for offset in range(0, len(data), 1024 * 1024):
+            f.write(data[offset:offset + 1024 * 1024])
+    
+    obj = s3_storage.client.get_object(Bucket=BUCKET, Key="blobs/big.ssv")
+    assert obj["Body"].read() == data
+    assert obj["ETag"].strip('"').endswith("-3")
+    assert s3_storage.size("big.ssv") == len(data)
+    assert not s3_storage.client.list_multipart_uploads(Bucket=BUCKET).get("Uploads")
+
+
+def test_s3_small_write_is_single_put(s3_storage):
+    with s3_storage.open_write("small.ssv") as f:
+        f.write(b"hello")
+    
+    obj = s3_storage.client.get_object(Bucket=BUCKET, Key="blobs/small.ssv")
+    assert obj["Body"].read() == b"hello"
+    assert "-" not in obj["ETag"]
+
+
+def test_s3_failed_write_aborts_multipart_upload(s3_storage):
+    with pytest.raises(RuntimeError):
+        with s3_storage.open_write("broken.ssv") as f:
+            f.write(os.urandom(MIN_PART_SIZE + 1))
+            raise RuntimeError("encrypt failed")
+    
+    assert not s3_storage.client.list_multipart_uploads(Bucket=BUCKET).get("Uploads")
+    with pytest.raises(FileNotFoundError):
+        s3_storage.size("broken.ssv")
+
+
+def test_s3_ranged_reads(s3_storage):
+    data = os.urandom(300 * 1024)
+    with s3_storage.open_write("blob.ssv") as f:
+        f.write(data)
+    ranges = _record_ranges(s3_storage)
+    
+    with s3_storage.open_read("blob.ssv") as reader:
+        # Small reads read ahead once and are then served from the cached range
+        assert reader.read(16) == data[:16]
+        assert reader.read(16) == data[16:32]
+        assert ranges == ["bytes=0-65535"]
+        
+        reader.seek(200 * 1024)
+        assert reader.read(100 * 1024) == data[200 * 1024:]
+        assert ranges[-1] == f"bytes={200 * 1024}-{len(data) - 1}"
+        
+        # Suffix range: the trailer at the end of the object
+        assert reader.seek(-100, io.SEEK_END) == len(data) - 100
+        assert reader.read() == data[-100:]
+        assert reader.read(10) == b""
+        
+        reader.seek(50, io.SEEK_SET)
+        reader.seek(10, io.SEEK_CUR)
+        assert reader.tell() == 60
+        assert reader.read(4) == data[60:64]
+        with pytest.raises(ValueError):
+            reader.seek(-1)
+
+
+def test_s3_delete(s3_storage):
+    with s3_storage.open_write("gone.ssv") as f:
+        f.write(b"data")
+    s3_storage.delete("gone.ssv")
+    
+    with pytest.raises(FileNotFoundError):
+        s3_storage.open_read("gone.ssv")
+    # Deleting a missing key is not an error
+    s3_storage.delete("gone.ssv")
+
+
+def test_local_sharded_path_with_legacy_fallback(tmp_path):
+    storage = LocalStorage(str(tmp_path), shard_depth=2)
+    
+    with storage.open_write("new.ssv") as f:
+        f.write(b"sharded")
+    path = storage.path("new.ssv")
+    assert os.path.relpath(path, tmp_path).count(os.sep) == 2
+    assert storage.local_path("new.ssv") == path
+    with storage.open_read("new.ssv") as f:
+        assert f.read() == b"sharded"
+    
+    # Blobs written before sharding sit flat in the root
+    (tmp_path / "old.ssv").write_bytes(b"legacy")
+    assert storage.local_path("old.ssv") == str(tmp_path / "old.ssv")
+    assert storage.size("old.ssv") == 6
+    with storage.open_read("old.ssv") as f:
+        assert f.read() == b"legacy"
+    
+    storage.delete("old.ssv")
+    storage.delete("new.ssv")
+    assert not (tmp_path / "old.ssv").exists()
+    assert not os.path.exists(path)
+    with pytest.raises(FileNotFoundError):
+        storage.open_read("new.ssv")
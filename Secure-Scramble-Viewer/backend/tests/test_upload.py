@@ -0,0 +1,34 @@
+import os
+
+
+def test_upload_round_trip(client):
+    data = os.urandom(4000)
+    upload = client.post("/api/upload", files={"file": ("round.bin", data)})
+    assert upload.status_code == 200
+    assert upload.json()["size"] == len(data)
+    
+    decoded = client.get("/api/decode", params={"file_id": upload.json()["file_id"]})
+    assert decoded.status_code == 200
+    assert decoded.content == data
+
+
+def test_upload_retry_after_conflict_keeps_content(client, fail_first_commit):
+    data = os.urandom(4000)
+    upload = client.post("/api/upload", files={"file": ("conflict.bin", data)})
+    assert upload.status_code == 200
+    assert not fail_first_commit, "the conflict path was not taken"
+    
+    decoded = client.get("/api/decode", params={"file_id": upload.json()["file_id"]})
+    assert decoded.content == data
+
+
+def test_batch_upload_retry_after_conflict_keeps_content(client, fail_first_commit):
+    parts = {"a.bin": os.urandom(5000), "b.bin": os.urandom(3000)}
+    upload = client.post("/api/upload/batch", files=[("files", (name, data)) for name, data in parts.items()])
+    assert upload.status_code == 200
+    assert not fail_first_commit, "the conflict path was not taken"
+    
+    for stored in upload.json()["files"]:
+        assert stored["size"] == len(parts[stored["filename"]])
+        decoded = client.get("/api/decode", params={"file_id": stored["file_id"]})
+        assert decoded.content == parts[stored["filename"]]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+SSV Batch Decoder - headless verify/decrypt for many .ssv files
+
+Usage:
+    python ssv_batch.py --verify archive/
+    python ssv_batch.py -o decoded/ "exports/**/*.ssv"
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from ssv_decoder import SSVDecoder
+
+CONFIG_FILE = Path.home() / ".ssv_decoder" / "config.txt"
+
+# Set once per worker process by _init_worker
+_decoder = None
+_output_dir = None
+_verify_only = False
+
+
+class _NullOutput:
+    """Sink for --verify: chunks are authenticated and decrypted, then dropped"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def write(self, data) -> int:
+        return len(data)
+
+
+def load_secret_key(key: str = None) -> str:
+    """--key, then $SSV_SECRET_KEY, then the viewer's config file"""
+    key = key or os.environ.get("SSV_SECRET_KEY")
+    if not key and CONFIG_FILE.exists():
+        key = CONFIG_FILE.read_text().strip()
+    if not key:
+        sys.exit(f"No secret key: pass --key, set SSV_SECRET_KEY or create {CONFIG_FILE}")
+    return key
+
+
+def iter_ssv_paths(patterns: list):
+    """Files, directories (searched recursively) and globs, each path once"""
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = (str(path) for path in Path(pattern).rglob("*.ssv"))
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = glob.iglob(pattern, recursive=True)
+        for path in matches:
+            if path not in seen and os.path.isfile(path):
+                seen.add(path)
+                yield path
+
+
+def _init_worker(secret_key: str, output_dir: str, verify_only: bool):
+    global _decoder, _output_dir, _verify_only
+    # The pool already uses every core, so each file decrypts on one thread
+    _decoder = SSVDecoder(secret_key, verbose=False, threads=1)
+    _output_dir = output_dir
+    _verify_only = verify_only
+
+
+def _create_output(source: str, original_filename: str):
+    """Exclusively create the output under the source's relative directory, numbering repeats"""
+    try:
+        relative = os.path.relpath(source)
+    except ValueError:
+        # On Windows, a source on another drive has no relative path
+        relative = os.path.basename(source)
+    if relative.split(os.sep, 1)[0] == os.pardir:
+        # Sources outside the working directory go straight into the output directory
+        relative = os.path.basename(source)
+    directory = os.path.join(_output_dir, os.path.dirname(relative))
+    os.makedirs(directory, exist_ok=True)
+    
+    stem, ext = os.path.splitext(os.path.basename(original_filename) or "file")
+    name, counter = f"{stem}{ext}", 1
+    while True:
+        path = os.path.join(directory, name)
+        try:
+            return path, open(path, "xb")
+        except FileExistsError:
+            counter += 1
+            name = f"{stem} ({counter}){ext}"
+
+
+def decode_one(source: str) -> tuple:
+    """Verify or decrypt one file: (source, ssv size, plaintext size, output path, error)"""
+    output = {}
+    
+    def open_output(original_filename: str):
+        if _verify_only:
+            return _NullOutput()
+        output["path"], handle = _create_output(source, original_filename)
+        return handle
+    
+    ssv_size = 0
+    try:
+        ssv_size = os.path.getsize(source)
+        _, plaintext_size = _decoder.stream_ssv_path(source, open_output)
+        return source, ssv_size, plaintext_size, output.get("path"), None
+    except Exception as e:
+        # Never leave a partial plaintext behind
+        if output.get("path"):
+            try:
+                os.remove(output["path"])
+            except OSError:
+                pass
+        return source, ssv_size, 0, None, f"{type(e).__name__}: {e}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verify or decrypt .ssv files in bulk.")
+    parser.add_argument("paths", nargs="+", help=".ssv files, directories or glob patterns")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("-o", "--output", help="directory to write decrypted files into")
+    mode.add_argument("--verify", action="store_true", help="authenticate and decrypt without writing anything")
+    parser.add_argument("-k", "--key", help="SECRET_KEY (default: $SSV_SECRET_KEY or the viewer config)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print failures and the summary")
+    args = parser.parse_args(argv)
+    
+    secret_key = load_secret_key(args.key)
+    
+    files = failures = 0
+    ssv_bytes = plaintext_bytes = 0
+    start = time.perf_counter()
+    
+    with Pool(args.jobs, initializer=_init_worker, initargs=(secret_key, args.output, args.verify)) as pool:
+        # Unordered with small batches keeps every worker busy on mixed file sizes
+        for source, ssv_size, plaintext_size, output_path, error in pool.imap_unordered(decode_one, iter_ssv_paths(args.paths), chunksize=16):
+            files += 1
+            ssv_bytes += ssv_size
+            if error:
+                failures += 1
+                print(f"FAIL {source}: {error}", file=sys.stderr)
+                continue
+            plaintext_bytes += plaintext_size
+            if not args.quiet:
+                print(f"ok   {source}" + (f" -> {output_path}" if output_path else ""))
+    
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(
+        f"{files} files, {failures} failed, {ssv_bytes / 1e6:.1f} MB read, "
+        f"{plaintext_bytes / 1e6:.1f} MB decrypted in {elapsed:.2f}s: "
+        f"{ssv_bytes / 1e6 / elapsed:.1f} MB/s, {files / elapsed:.1f} files/s"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
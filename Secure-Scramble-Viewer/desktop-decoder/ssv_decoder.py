@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+SSV decoder - parses and decrypts .ssv files (v1, v2 and v3)
+Has no GUI dependencies, so headless tools such as ssv_batch.py can use it
+on machines without Tk.
+"""
+
+import hashlib
+import hmac
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, padding
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+
+
+# .ssv v2 layout (must match backend/app/utils/encryption.py)
+V2_HEADER = struct.Struct('>I16sI16sI')  # version, salt, chunk size, filename iv, filename length
+V2_TRAILER = struct.Struct('>QQ')        # chunk count, plaintext size
+V2_IV_SIZE = 16
+V2_TAG_SIZE = 32
+V2_KEY_INFO = (b'ssv v2 filename', b'ssv v2 data', b'ssv v2 mac')
+
+# .ssv v3 (AEAD) layout; the header's cipher id picks the AEAD
+V3_HEADER = struct.Struct('>I16sIB12sI')  # version, salt, chunk size, cipher id, filename nonce, filename length
+V3_NONCE_SIZE = 12
+V3_TAG_SIZE = 16
+V3_KEY_INFO = b'ssv v3 data'
+V3_CIPHERS = {1: AESGCM, 2: ChaCha20Poly1305}
+
+
+class SSVDecoder:
+    """Standalone SSV file decoder"""
+    
+    def __init__(self, secret_key: str, verbose: bool = True, threads: int = None):
+        self.key = hashlib.sha256(secret_key.encode()).digest()
+        self.verbose = verbose
+        # Threads used to decrypt the chunks of one v3 file
+        self.threads = threads or os.cpu_count() or 1
+    
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+    
+    def _mac(self, mac_key: bytes, label: bytes, *parts: bytes) -> bytes:
+        h = hmac.new(mac_key, label, hashlib.sha256)
+        for part in parts:
+            h.update(part)
+        return h.digest()
+    
+    def _cbc_decrypt(self, key: bytes, iv: bytes, data, out=None) -> int:
+        """
+        Decrypt AES-CBC data straight into out (a writable buffer with 15
+        bytes of slack) and strip the PKCS7 padding; returns the plaintext length.
+        """
+        decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).decryptor()
+        written = decryptor.update_into(data, out)
+        decryptor.finalize()
+        
+        pad = out[written - 1] if written else 0
+        if not 1 <= pad <= 16 or bytes(out[written - pad:written]) != bytes([pad]) * pad:
+            raise ValueError("Invalid padding bytes.")
+        return written - pad
+    
+    def decrypt_file(self, encrypted_data, salt: bytes, iv: bytes) -> bytearray:
+        """Decrypt file data using AES-256-CBC, without copying the ciphertext"""
+        derived_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+        
+        original_data = bytearray(len(encrypted_data) + 15)
+        with memoryview(original_data) as out:
+            size = self._cbc_decrypt(derived_key, iv, encrypted_data, out)
+        del original_data[size:]
+        
+        return original_data
+    
+    def map_ssv_file(self, file_path: str):
+        """Read-only memory map of an .ssv file; the caller closes it"""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Empty .ssv file")
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    @staticmethod
+    def _unmap(mapping):
+        try:
+            mapping.close()
+        except BufferError:
+            # A traceback still holds a view into the mapping; it is
+            # unmapped once that view is collected
+            pass
+    
+    def parse_ssv_path(self, file_path: str, progress=None) -> tuple:
+        """
+        Parse an .ssv file through a read-only memory map. The header is read
+        from the mapping and chunks decrypt straight out of the page cache, so
+        the ciphertext is never copied onto the heap; the mapping is closed as
+        soon as decryption finishes.
+        
+        progress(done, total) is called as chunks are decrypted; raising from
+        it aborts the parse.
+        """
+        mapping = self.map_ssv_file(file_path)
+        try:
+            return self.parse_ssv_file(mapping, progress)
+        finally:
+            self._unmap(mapping)
+    
+    def parse_ssv_file(self, ssv_data: bytes, progress=None) -> tuple:
+        """Parse .ssv file and return (decrypted_data, original_filename)"""
+        self._log(f"[DEBUG] Total SSV size: {len(ssv_data)}")
+        
+        version_number = int.from_bytes(ssv_data[0:4], byteorder='big')
+        if version_number == 3:
+            return self.parse_ssv_v3(ssv_data, progress)
+        if version_number == 2:
+            return self.parse_ssv_v2(ssv_data, progress)
+        if version_number != 1:
+            raise ValueError(f"Unsupported .ssv version: {version_number}")
+        
+        original_filename, salt, iv, encrypted_data = self._open_v1(ssv_data)
+        
+        self._log(f"[DEBUG] Decrypting file data...")
+        try:
+            if progress:
+                progress(0, 1)
+            original_data = self.decrypt_file(encrypted_data, salt, iv)
+            if progress:
+                progress(1, 1)
+            self._log(f"[DEBUG] ✓ Data decrypted: {len(original_data)} bytes")
+        except Exception as e:
+            self._log(f"[DEBUG] ✗ Data decryption failed: {e}")
+            self._log(f"[DEBUG] Last 32 bytes of encrypted data: {bytes(encrypted_data[-32:]).hex()}")
+            raise
+        
+        return original_data, original_filename
+    
+    def stream_ssv_path(self, file_path: str, open_output) -> tuple:
+        """stream_ssv_file over a read-only memory map of file_path"""
+        mapping = self.map_ssv_file(file_path)
+        try:
+            return self.stream_ssv_file(mapping, open_output)
+        finally:
+            self._unmap(mapping)
+    
+    def stream_ssv_file(self, ssv_data: bytes, open_output, block_size: int = 1024 * 1024) -> tuple:
+        """
+        Decrypt an .ssv file chunk by chunk into the file returned by
+        open_output(original_filename), so the plaintext is never held in
+        memory whole. Returns (original_filename, plaintext size).
+        """
+        version_number = int.from_bytes(ssv_data[0:4], byteorder='big')
+        
+        if version_number == 1:
+            original_filename, salt, iv, encrypted_data = self._open_v1(ssv_data)
+            derived_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+            decryptor = Cipher(algorithms.AES(derived_key), modes.CBC(iv), backend=default_backend()).decryptor()
+            unpadder = padding.PKCS7(128).unpadder()
+            written = 0
+            with open_output(original_filename) as output:
+                for start in range(0, len(encrypted_data), block_size):
+                    written += output.write(unpadder.update(decryptor.update(encrypted_data[start:start + block_size])))
+                written += output.write(unpadder.update(decryptor.finalize()) + unpadder.finalize())
+            return original_filename, written
+        
+        if version_number == 3:
+            original_filename, _, chunk_count, plaintext_size, open_chunk = self._open_v3(ssv_data)
+        elif version_number == 2:
+            original_filename, _, chunk_count, plaintext_size, open_chunk = self._open_v2(ssv_data)
+        else:
+            raise ValueError(f"Unsupported .ssv version: {version_number}")
+        
+        with open_output(original_filename) as output:
+            for index in range(chunk_count):
+                output.write(open_chunk(index))
+        return original_filename, plaintext_size
+    
+    def _open_v1(self, ssv_data) -> tuple:
+        """Header of a v1 file: (filename, salt, iv, ciphertext view)"""
+        # memoryview slices reference ssv_data instead of copying the ciphertext
+        view = memoryview(ssv_data)
+        version = bytes(view[0:4])
+        salt = bytes(view[4:20])
+        iv = bytes(view[20:36])
+        fn_salt = bytes(view[36:52])
+        fn_iv = bytes(view[52:68])
+        filename_length = int.from_bytes(view[68:72], byteorder='big')
+        
+        self._log(f"[DEBUG] Version: {version.hex()}")
+        self._log(f"[DEBUG] Filename length: {filename_length}")
+        
+        encrypted_filename = view[72:72+filename_length]
+        encrypted_data = view[72+filename_length:]
+        
+        self._log(f"[DEBUG] Encrypted filename size: {len(encrypted_filename)} (multiple of 16: {len(encrypted_filename) % 16 == 0})")
+        self._log(f"[DEBUG] Encrypted data size: {len(encrypted_data)} (multiple of 16: {len(encrypted_data) % 16 == 0})")
+        
+        self._log(f"[DEBUG] Decrypting filename...")
+        try:
+            original_filename = self.decrypt_file(encrypted_filename, fn_salt, fn_iv).decode('utf-8')
+            self._log(f"[DEBUG] ✓ Filename decrypted: {original_filename}")
+        except Exception as e:
+            self._log(f"[DEBUG] ✗ Filename decryption failed: {e}")
+            raise
+        
+        return original_filename, salt, iv, encrypted_data
+    
+    def _open_v2(self, ssv_data) -> tuple:
+        """
+        Authenticate the header and trailer of a chunked v2 file. Returns
+        (filename, chunk size, chunk count, plaintext size, open_chunk), where
+        open_chunk(index) authenticates and decrypts one chunk.
+        """
+        _, salt, chunk_size, fn_iv, filename_length = V2_HEADER.unpack_from(ssv_data, 0)
+        self._log(f"[DEBUG] Version: 2 (chunk size {chunk_size})")
+        
+        # One PBKDF2 file key, split into filename/data/MAC subkeys with HKDF
+        file_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+        fn_key, enc_key, mac_key = (
+            HKDFExpand(algorithm=hashes.SHA256(), length=32, info=info, backend=default_backend()).derive(file_key)
+            for info in V2_KEY_INFO
+        )
+        
+        view = memoryview(ssv_data)
+        pos = V2_HEADER.size
+        header = view[:pos]
+        encrypted_filename = view[pos:pos + filename_length]
+        pos += filename_length
+        if not hmac.compare_digest(bytes(view[pos:pos + V2_TAG_SIZE]), self._mac(mac_key, b'H', header, encrypted_filename)):
+            raise ValueError("Header authentication failed (wrong key or corrupted file)")
+        pos += V2_TAG_SIZE
+        
+        filename_buffer = bytearray(len(encrypted_filename) + 15)
+        filename_size = self._cbc_decrypt(fn_key, fn_iv, encrypted_filename, filename_buffer)
+        original_filename = filename_buffer[:filename_size].decode('utf-8')
+        self._log(f"[DEBUG] ✓ Filename decrypted: {original_filename}")
+        
+        trailer_start = len(ssv_data) - V2_TRAILER.size - V2_TAG_SIZE
+        trailer = bytes(view[trailer_start:trailer_start + V2_TRAILER.size])
+        if not hmac.compare_digest(bytes(view[trailer_start + V2_TRAILER.size:]), self._mac(mac_key, b'T', trailer)):
+            raise ValueError("Trailer authentication failed (truncated or corrupted file)")
+        chunk_count, plaintext_size = V2_TRAILER.unpack(trailer)
+        
+        # Every record but the last is full: iv, chunk_size plus a padding block, tag
+        record_size = V2_IV_SIZE + chunk_size + 16 + V2_TAG_SIZE
+        if pos + max(chunk_count - 1, 0) * record_size > trailer_start:
+            raise ValueError("Chunk layout does not match trailer")
+        records = [
+            view[pos + index * record_size:min(pos + (index + 1) * record_size, trailer_start)]
+            for index in range(chunk_count)
+        ]
+        if pos + sum(len(record) for record in records) != trailer_start:
+            raise ValueError("Chunk layout does not match trailer")
+        
+        def open_chunk(index: int, out=None):
+            record = records[index]
+            iv = bytes(record[:V2_IV_SIZE])
+            encrypted_chunk = record[V2_IV_SIZE:-V2_TAG_SIZE]
+            expected = self._mac(mac_key, b'C', index.to_bytes(8, byteorder='big'), iv, encrypted_chunk)
+            if not hmac.compare_digest(bytes(record[-V2_TAG_SIZE:]), expected):
+                raise ValueError(f"Chunk {index} authentication failed")
+            if out is None:
+                out = memoryview(bytearray(len(encrypted_chunk) + 15))
+            return out[:self._cbc_decrypt(enc_key, iv, encrypted_chunk, out)]
+        
+        return original_filename, chunk_size, chunk_count, plaintext_size, open_chunk
+    
+    def parse_ssv_v2(self, ssv_data: bytes, progress=None) -> tuple:
+        """Parse a chunked v2 .ssv file, authenticating every chunk"""
+        original_filename, _, chunk_count, plaintext_size, open_chunk = self._open_v2(ssv_data)
+        
+        # Chunks decrypt straight into their slot of one preallocated buffer;
+        # the slack covers update_into's extra block on the last chunk
+        original_data = bytearray(plaintext_size + 32)
+        out = memoryview(original_data)
+        written = 0
+        for index in range(chunk_count):
+            written += len(open_chunk(index, out[written:]))
+            if written > plaintext_size:
+                raise ValueError("Decrypted size does not match trailer")
+            if progress:
+                progress(index + 1, chunk_count)
+        out.release()
+        
+        if written != plaintext_size:
+            raise ValueError("Decrypted size does not match trailer")
+        del original_data[written:]
+        self._log(f"[DEBUG] ✓ Data decrypted: {len(original_data)} bytes in {chunk_count} chunks")
+        
+        return original_data, original_filename
+    
+    def _open_v3(self, ssv_data) -> tuple:
+        """
+        Authenticate the header and trailer of an AEAD v3 file. Returns
+        (filename, chunk size, chunk count, plaintext size, open_chunk), where
+        open_chunk(index) authenticates and decrypts one chunk.
+        """
+        header = bytes(ssv_data[:V3_HEADER.size])
+        _, salt, chunk_size, cipher_id, fn_nonce, filename_length = V3_HEADER.unpack(header)
+        if cipher_id not in V3_CIPHERS:
+            raise ValueError(f"Unknown .ssv cipher id: {cipher_id}")
+        self._log(f"[DEBUG] Version: 3 ({V3_CIPHERS[cipher_id].__name__}, chunk size {chunk_size})")
+        
+        file_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+        data_key = HKDFExpand(algorithm=hashes.SHA256(), length=32, info=V3_KEY_INFO, backend=default_backend()).derive(file_key)
+        aead = V3_CIPHERS[cipher_id](data_key)
+        
+        view = memoryview(ssv_data)
+        pos = V3_HEADER.size
+        try:
+            original_filename = aead.decrypt(fn_nonce, view[pos:pos + filename_length], b'H' + header).decode('utf-8')
+        except InvalidTag:
+            raise ValueError("Header authentication failed (wrong key or corrupted file)")
+        pos += filename_length
+        self._log(f"[DEBUG] ✓ Filename decrypted: {original_filename}")
+        
+        trailer_start = len(ssv_data) - V2_TRAILER.size - V3_NONCE_SIZE - V3_TAG_SIZE
+        trailer = bytes(view[trailer_start:trailer_start + V2_TRAILER.size])
+        nonce = bytes(view[trailer_start + V2_TRAILER.size:trailer_start + V2_TRAILER.size + V3_NONCE_SIZE])
+        try:
+            aead.decrypt(nonce, view[trailer_start + V2_TRAILER.size + V3_NONCE_SIZE:], b'T' + trailer)
+        except InvalidTag:
+            raise ValueError("Trailer authentication failed (truncated or corrupted file)")
+        chunk_count, plaintext_size = V2_TRAILER.unpack(trailer)
+        
+        record_size = V3_NONCE_SIZE + chunk_size + V3_TAG_SIZE
+        if pos + max(chunk_count - 1, 0) * record_size > trailer_start:
+            raise ValueError("Chunk layout does not match trailer")
+        records = [
+            view[pos + index * record_size:min(pos + (index + 1) * record_size, trailer_start)]
+            for index in range(chunk_count)
+        ]
+        if pos + sum(len(record) for record in records) != trailer_start:
+            raise ValueError("Chunk layout does not match trailer")
+        if sum(len(record) - V3_NONCE_SIZE - V3_TAG_SIZE for record in records) != plaintext_size:
+            raise ValueError("Decrypted size does not match trailer")
+        
+        def open_chunk(index: int) -> bytes:
+            record = records[index]
+            try:
+                return aead.decrypt(bytes(record[:V3_NONCE_SIZE]), record[V3_NONCE_SIZE:], b'C' + index.to_bytes(8, byteorder='big'))
+            except InvalidTag:
+                raise ValueError(f"Chunk {index} authentication failed")
+        
+        return original_filename, chunk_size, chunk_count, plaintext_size, open_chunk
+    
+    def parse_ssv_v3(self, ssv_data: bytes, progress=None) -> tuple:
+        """Parse an AEAD v3 .ssv file, decrypting its chunks in parallel"""
+        original_filename, chunk_size, chunk_count, plaintext_size, open_chunk = self._open_v3(ssv_data)
+        
+        original_data = bytearray(plaintext_size)
+        out = memoryview(original_data)
+        done = [0]
+        done_lock = threading.Lock()
+        
+        def open_record(index: int):
+            chunk = open_chunk(index)
+            # Every chunk owns a disjoint slot of the output, so threads never overlap
+            out[index * chunk_size:index * chunk_size + len(chunk)] = chunk
+            if progress:
+                with done_lock:
+                    done[0] += 1
+                    progress(done[0], chunk_count)
+        
+        # Each chunk has its own nonce and tag, so they decrypt independently across cores
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = [executor.submit(open_record, index) for index in range(chunk_count)]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # A failed chunk or an aborted parse drops the chunks not yet started
+                for future in futures:
+                    future.cancel()
+                raise
+        out.release()
+        self._log(f"[DEBUG] ✓ Data decrypted: {len(original_data)} bytes in {chunk_count} chunks")
+        
+        return original_data, original_filename
@@ -6,14 +6,18 @@ Supports: Images (with zoom), PDF, Word, Excel, PowerPoint
 
 import sys
 import os
+import threading
+import codecs
 import hashlib
+import time
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
+from tkinter import font as tkfont, messagebox, scrolledtext, ttk
 from pathlib import Path
+from array import array
+from collections import OrderedDict
 from io import BytesIO
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import padding
+from concurrent.futures import ThreadPoolExecutor
+from ssv_decoder import SSVDecoder
 
 # Try to import optional libraries
 try:
@@ -47,67 +51,476 @@ except ImportError:
     PPTX_AVAILABLE = False
 
 
-class SSVDecoder:
-    """Standalone SSV file decoder"""
+# Rendered PDF pages kept around for page turns
+PDF_CACHE_BYTES = 256 * 1024 * 1024
+PDF_PREFETCH_PAGES = 2
+PDF_MIN_SCALE = 0.5
+PDF_MAX_SCALE = 4.0
+
+# Zoomable images are drawn as tiles cut from a pyramid of halved levels
+IMAGE_TILE_SIZE = 256
+IMAGE_TILE_CACHE_BYTES = 128 * 1024 * 1024
+
+# Spreadsheet grid: rows sampled for column widths, and column width bounds in characters
+GRID_SAMPLE_ROWS = 200
+GRID_MIN_CHARS = 4
+GRID_MAX_CHARS = 40
+
+# Text files are scanned for line breaks in blocks of this size
+TEXT_SCAN_BYTES = 4 * 1024 * 1024
+
+# How often the UI thread checks on a file being opened in the background
+OPEN_POLL_MS = 50
+
+# Viewer used for each file extension
+CONTENT_KINDS = {
+    **dict.fromkeys(['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'], 'image'),
+    **dict.fromkeys(['.txt', '.md', '.log', '.csv', '.json', '.xml', '.html', '.css', '.js', '.py', '.java', '.c', '.cpp'], 'text'),
+    '.pdf': 'pdf',
+    **dict.fromkeys(['.docx', '.odt'], 'word'),
+    **dict.fromkeys(['.xlsx', '.ods'], 'excel'),
+    **dict.fromkeys(['.pptx', '.odp'], 'powerpoint'),
+}
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+        
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+class OpenCancelled(Exception):
+    """Raised on the open worker when the user cancels"""
+
+
+class OpenJob:
+    """A file being decrypted and parsed on the open worker"""
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.cancelled = threading.Event()
+        self.stage = "Decrypting"
+        self.done = 0
+        self.total = 0
+        self.started = time.perf_counter()
+        self.decrypted = None
+        self.ssv_size = None
+        self.future = None
+    
+    def check(self):
+        if self.cancelled.is_set():
+            raise OpenCancelled()
     
-    def __init__(self, secret_key: str):
-        self.key = hashlib.sha256(secret_key.encode()).digest()
+    def report(self, done: int, total: int):
+        """Decoder progress callback; doubles as the cancellation point"""
+        self.check()
+        self.done, self.total = done, total
+
+
+class RenderCache:
+    """
+    LRU of rendered images (PDF pages, image tiles) bounded by their pixel
+    bytes rather than their count, so large renders cannot grow without
+    limit. Safe to share between the UI thread and a worker.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _cost(image) -> int:
+        return image.width * image.height * len(image.getbands())
+    
+    def get(self, key):
+        with self._lock:
+            image = self._pages.get(key)
+            if image is not None:
+                self._pages.move_to_end(key)
+            return image
+    
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._pages
+    
+    def put(self, key, image):
+        cost = self._cost(image)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._pages.pop(key, None)
+            if previous is not None:
+                self.size -= self._cost(previous)
+            self._pages[key] = image
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self.size -= self._cost(evicted)
     
-    def decrypt_file(self, encrypted_data: bytes, salt: bytes, iv: bytes) -> bytes:
-        """Decrypt file data using AES-256-CBC"""
-        derived_key = hashlib.pbkdf2_hmac('sha256', self.key, salt, 100000, dklen=32)
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self.size = 0
+
+
+class ImagePyramid:
+    """
+    Zoomable image cut into fixed-size tiles. Each zoom step resamples from
+    the smallest halved level that is still at least as large as the
+    target, and only for the tiles that are asked for; levels are built
+    once, on first use.
+    """
+    
+    def __init__(self, image, tile_size: int = IMAGE_TILE_SIZE):
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        self.levels = [image]
+        self.tile_size = tile_size
+        self.width, self.height = image.size
+    
+    def level_for(self, zoom: float) -> int:
+        level = 0
+        while zoom * 2 ** (level + 1) <= 1 and min(self.width, self.height) >> (level + 1) > 0:
+            level += 1
+        while len(self.levels) <= level:
+            self.levels.append(self.levels[-1].reduce(2))
+        return level
+    
+    def zoomed_size(self, zoom: float) -> tuple:
+        return max(1, round(self.width * zoom)), max(1, round(self.height * zoom))
+    
+    def tile_grid(self, zoom: float) -> tuple:
+        width, height = self.zoomed_size(zoom)
+        return -(-width // self.tile_size), -(-height // self.tile_size)
+    
+    def tile(self, zoom: float, column: int, row: int):
+        """Tile (column, row) of the image scaled by zoom"""
+        width, height = self.zoomed_size(zoom)
+        left, top = column * self.tile_size, row * self.tile_size
+        right, bottom = min(left + self.tile_size, width), min(top + self.tile_size, height)
         
-        cipher = Cipher(
-            algorithms.AES(derived_key),
-            modes.CBC(iv),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        padded_data = decryptor.update(encrypted_data) + decryptor.finalize()
+        source = self.levels[self.level_for(zoom)]
+        scale_x, scale_y = source.width / width, source.height / height
+        box = (left * scale_x, top * scale_y, right * scale_x, bottom * scale_y)
+        # resize() with a box samples straight from the level, so no crop copy
+        # is made and neighbouring tiles meet without seams
+        return source.resize((right - left, bottom - top), Image.Resampling.LANCZOS, box=box)
+
+
+class SheetRows:
+    """
+    Rows of a read-only worksheet, parsed from the XML stream only as far
+    as the view has asked for, and kept as display strings.
+    """
+    
+    def __init__(self, sheet):
+        self._source = sheet.iter_rows(values_only=True)
+        self._rows = []
+        self.exhausted = False
+        # The sheet's <dimension> tag, when present, sizes the scrollbar up front
+        self.estimated_count = getattr(sheet, 'max_row', None) or 0
+    
+    def __len__(self) -> int:
+        if self.exhausted:
+            return len(self._rows)
+        # Until the end is found, leave room past the parsed rows to scroll into
+        return max(len(self._rows) + GRID_SAMPLE_ROWS, self.estimated_count)
+    
+    def fetch(self, stop: int):
+        """Parse rows until stop rows are available or the sheet ends"""
+        while len(self._rows) < stop and not self.exhausted:
+            row = next(self._source, None)
+            if row is None:
+                self.exhausted = True
+                break
+            self._rows.append(tuple("" if cell is None else str(cell) for cell in row))
+    
+    def rows(self, start: int, stop: int) -> list:
+        self.fetch(stop)
+        return self._rows[start:stop]
+
+
+class VirtualGrid(tk.Frame):
+    """
+    Spreadsheet grid that only draws the cells in view. Vertical scrolling
+    is virtual (the scrollbar tracks a row index, not pixels), so opening
+    and scrolling cost the same for ten rows or a million.
+    """
+    
+    def __init__(self, master, rows: SheetRows, **kwargs):
+        super().__init__(master, bg="#0f3460", **kwargs)
+        self.rows = rows
+        self.first_row = 0
+        self.font = tkfont.Font(family="Consolas", size=10)
+        self.char_width = self.font.measure("0")
+        self.row_height = self.font.metrics("linespace") + 6
+        
+        sample = rows.rows(0, GRID_SAMPLE_ROWS)
+        column_count = max((len(row) for row in sample), default=0)
+        self.column_chars = [
+            min(max([GRID_MIN_CHARS] + [len(row[index]) for row in sample if index < len(row)]), GRID_MAX_CHARS)
+            for index in range(column_count)
+        ]
+        # Row-number gutter, then one x position per column
+        self.column_x = [len(str(max(len(rows), 1))) * self.char_width + 16]
+        for chars in self.column_chars:
+            self.column_x.append(self.column_x[-1] + chars * self.char_width + 12)
         
-        unpadder = padding.PKCS7(128).unpadder()
-        original_data = unpadder.update(padded_data) + unpadder.finalize()
+        self.canvas = tk.Canvas(self, bg="#0f3460", highlightthickness=0)
+        self.y_scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        x_scrollbar = tk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self._on_xscroll(x_scrollbar))
         
-        return original_data
+        self.y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+    
+    def _on_xscroll(self, scrollbar):
+        def update(first, last):
+            scrollbar.set(first, last)
+            self.redraw()
+        return update
+    
+    @property
+    def visible_rows(self) -> int:
+        return max(self.canvas.winfo_height() // self.row_height - 1, 1)
+    
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', count, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            first_row = int(float(args[1]) * len(self.rows))
+        else:
+            step = self.visible_rows if args[2] == 'pages' else 1
+            first_row = self.first_row + int(args[1]) * step
+        self.scroll_to(first_row)
+    
+    def yview_scroll(self, count: int, what: str):
+        self.yview('scroll', count, what)
     
-    def parse_ssv_file(self, ssv_data: bytes) -> tuple:
-        """Parse .ssv file and return (decrypted_data, original_filename)"""
-        print(f"[DEBUG] Total SSV size: {len(ssv_data)}")
+    def scroll_to(self, first_row: int):
+        self.first_row = min(max(first_row, 0), max(len(self.rows) - self.visible_rows, 0))
+        self.redraw()
+    
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("cell")
+        canvas.configure(scrollregion=(0, 0, self.column_x[-1], canvas.winfo_height()))
         
-        version = ssv_data[0:4]
-        salt = ssv_data[4:20]
-        iv = ssv_data[20:36]
-        fn_salt = ssv_data[36:52]
-        fn_iv = ssv_data[52:68]
-        filename_length = int.from_bytes(ssv_data[68:72], byteorder='big')
+        count = self.visible_rows
+        rows = self.rows.rows(self.first_row, self.first_row + count)
+        # Parsing may have found the real end of the sheet
+        self.first_row = min(self.first_row, max(len(self.rows) - count, 0))
         
-        print(f"[DEBUG] Version: {version.hex()}")
-        print(f"[DEBUG] Filename length: {filename_length}")
+        total = max(len(self.rows), 1)
+        self.y_scrollbar.set(self.first_row / total, min((self.first_row + count) / total, 1.0))
         
-        encrypted_filename = ssv_data[72:72+filename_length]
-        encrypted_data = ssv_data[72+filename_length:]
+        # Only the columns inside the horizontal view
+        left = canvas.canvasx(0)
+        right = left + canvas.winfo_width()
+        columns = [
+            index for index in range(len(self.column_chars))
+            if self.column_x[index + 1] < right and self.column_x[index + 2] > left
+        ]
         
-        print(f"[DEBUG] Encrypted filename size: {len(encrypted_filename)} (multiple of 16: {len(encrypted_filename) % 16 == 0})")
-        print(f"[DEBUG] Encrypted data size: {len(encrypted_data)} (multiple of 16: {len(encrypted_data) % 16 == 0})")
+        for index in columns:
+            canvas.create_text(
+                self.column_x[index + 1], self.row_height // 2,
+                text=openpyxl.utils.get_column_letter(index + 1),
+                anchor="w", font=self.font, fill="#00d4ff", tags="cell"
+            )
         
-        print(f"[DEBUG] Decrypting filename...")
-        try:
-            original_filename = self.decrypt_file(encrypted_filename, fn_salt, fn_iv).decode('utf-8')
-            print(f"[DEBUG] ✓ Filename decrypted: {original_filename}")
-        except Exception as e:
-            print(f"[DEBUG] ✗ Filename decryption failed: {e}")
-            raise
+        for offset, row in enumerate(rows, 1):
+            y = offset * self.row_height + self.row_height // 2
+            canvas.create_text(
+                4, y, text=str(self.first_row + offset),
+                anchor="w", font=self.font, fill="#888888", tags="cell"
+            )
+            for index in columns:
+                if index >= len(row) or not row[index]:
+                    continue
+                text = row[index]
+                if len(text) > self.column_chars[index]:
+                    text = text[:self.column_chars[index] - 1] + "…"
+                canvas.create_text(
+                    self.column_x[index + 1], y, text=text,
+                    anchor="w", font=self.font, fill="#ffffff", tags="cell"
+                )
+
+
+class TextDocument:
+    """
+    Decrypted text with an index of where every line starts, so any line
+    can be reached in O(1) and only the lines on screen are ever decoded.
+    """
+    
+    def __init__(self, data):
+        self.data = data
+        self.encoding = 'utf-8'
+        self.offsets = array('Q', [0])
+        
+        # One pass in blocks: validate UTF-8 with an incremental decoder (a
+        # character split across blocks carries over) and record line starts
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        view = memoryview(data)
+        size = len(data)
+        for start in range(0, size, TEXT_SCAN_BYTES):
+            end = min(start + TEXT_SCAN_BYTES, size)
+            if self.encoding == 'utf-8':
+                try:
+                    decoder.decode(view[start:end], final=end == size)
+                except UnicodeDecodeError:
+                    self.encoding = 'latin-1'
+            
+            position = data.find(b'\n', start, end)
+            while position != -1:
+                self.offsets.append(position + 1)
+                position = data.find(b'\n', position + 1, end)
+        view.release()
+        
+        # Close the last line unless the text ends with a newline
+        if self.offsets[-1] != size or size == 0:
+            self.offsets.append(size)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def lines(self, start: int, stop: int) -> list:
+        """Decoded lines [start, stop), without their line endings"""
+        start, stop = max(start, 0), min(stop, len(self))
+        if start >= stop:
+            return []
+        text = self.data[self.offsets[start]:self.offsets[stop]].decode(self.encoding, errors='replace')
+        return [line.rstrip('\r') for line in text.split('\n')[:stop - start]]
+
+
+class VirtualText(tk.Frame):
+    """
+    Read-only text view over a TextDocument. The Text widget only ever
+    holds the lines in view; the scrollbar tracks a line number.
+    """
+    
+    def __init__(self, master, document: TextDocument, **kwargs):
+        super().__init__(master, bg="#0f3460", **kwargs)
+        self.document = document
+        self.first_line = 0
+        self.font = tkfont.Font(family="Consolas", size=11)
+        
+        # Go to line
+        bar = tk.Frame(self, bg="#0f3460")
+        bar.pack(side="top", fill="x", padx=10, pady=(10, 0))
+        tk.Label(
+            bar,
+            text=f"{len(document):,} lines ({document.encoding})",
+            font=("Arial", 10),
+            bg="#0f3460",
+            fg="#aaaaaa"
+        ).pack(side="left")
+        tk.Button(
+            bar,
+            text="Go",
+            command=self._goto_entered,
+            font=("Arial", 10),
+            bg="#00d4ff",
+            fg="#1a1a2e",
+            padx=10,
+            cursor="hand2",
+            relief=tk.FLAT
+        ).pack(side="right")
+        self.line_entry = tk.Entry(bar, width=10, font=("Arial", 10))
+        self.line_entry.pack(side="right", padx=5)
+        self.line_entry.bind("<Return>", lambda e: self._goto_entered())
+        tk.Label(bar, text="Line:", font=("Arial", 10), bg="#0f3460", fg="#ffffff").pack(side="right")
+        
+        self.text = tk.Text(
+            self,
+            wrap=tk.NONE,
+            font=self.font,
+            bg="#0f3460",
+            fg="#ffffff",
+            padx=15,
+            pady=15,
+            state=tk.DISABLED
+        )
+        self.y_scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        x_scrollbar = tk.Scrollbar(self, orient="horizontal", command=self.text.xview)
+        self.text.configure(xscrollcommand=x_scrollbar.set)
         
-        print(f"[DEBUG] Decrypting file data...")
+        self.y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.bind("<Configure>", lambda e: self.redraw())
+    
+    @property
+    def visible_lines(self) -> int:
+        return max((self.text.winfo_height() - 30) // self.font.metrics("linespace"), 1)
+    
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', count, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            first_line = int(float(args[1]) * len(self.document))
+        else:
+            step = self.visible_lines if args[2] == 'pages' else 1
+            first_line = self.first_line + int(args[1]) * step
+        self.goto_line(first_line)
+    
+    def yview_scroll(self, count: int, what: str):
+        self.yview('scroll', count, what)
+    
+    def _goto_entered(self):
         try:
-            original_data = self.decrypt_file(encrypted_data, salt, iv)
-            print(f"[DEBUG] ✓ Data decrypted: {len(original_data)} bytes")
-        except Exception as e:
-            print(f"[DEBUG] ✗ Data decryption failed: {e}")
-            print(f"[DEBUG] Last 32 bytes of encrypted data: {encrypted_data[-32:].hex()}")
-            raise
+            self.goto_line(int(self.line_entry.get()) - 1)
+        except ValueError:
+            pass
+    
+    def goto_line(self, line: int):
+        self.first_line = min(max(line, 0), max(len(self.document) - self.visible_lines, 0))
+        self.redraw()
+    
+    def redraw(self):
+        count = self.visible_lines
+        lines = self.document.lines(self.first_line, self.first_line + count)
+        
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.config(state=tk.DISABLED)
         
-        return original_data, original_filename
+        total = max(len(self.document), 1)
+        self.y_scrollbar.set(self.first_line / total, min((self.first_line + count) / total, 1.0))
 
 
 class SSVViewerApp:
@@ -130,6 +543,30 @@ class SSVViewerApp:
         # PDF state
         self.pdf_document = None
         self.current_page = 0
+        self.pdf_cache = RenderCache(PDF_CACHE_BYTES)
+        # MuPDF documents are not thread-safe: every page access takes this lock
+        self.pdf_lock = threading.Lock()
+        self.pdf_prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-prefetch")
+        self.pdf_generation = 0
+        
+        # Tiled image state
+        self.image_pyramid = None
+        self.image_canvas = None
+        self.image_tiles = {}
+        self.image_offset = (0, 0)
+        self.image_zoom_shown = 1.0
+        self.image_update_pending = False
+        self.tile_cache = RenderCache(IMAGE_TILE_CACHE_BYTES)
+        
+        # Spreadsheet state
+        self.workbook = None
+        
+        # Widget that takes the mouse wheel instead of the page canvas
+        self.scroll_target = None
+        
+        # Decryption and parsing run here so the UI thread only builds widgets
+        self.open_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ssv-open")
+        self.open_job = None
         
         self.setup_ui()
         
@@ -277,6 +714,18 @@ class SSVViewerApp:
             relief=tk.FLAT
         ).pack(side=tk.LEFT, padx=5)
         
+        # Status bar (packed before the content so it keeps its row)
+        self.status_label = tk.Label(
+            self.root,
+            text="Ready",
+            font=("Arial", 9),
+            bg="#1a1a2e",
+            fg="#aaaaaa",
+            anchor="w",
+            padx=10
+        )
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+        
         # Content area with scrollbar
         self.content_container = tk.Frame(self.root, bg="#16213e")
         self.content_container.pack(fill=tk.BOTH, expand=True)
@@ -306,6 +755,9 @@ class SSVViewerApp:
         self.root.bind("<Button-3>", lambda e: "break")
     
     def _on_mousewheel(self, event):
+        if self.scroll_target is not None and self.scroll_target.winfo_exists():
+            self.scroll_target.yview_scroll(int(-1*(event.delta/120)), "units")
+            return
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
     
     def _on_canvas_configure(self, event):
@@ -336,107 +788,284 @@ class SSVViewerApp:
         self.pdf_nav_frame.pack_forget()
     
     def open_file(self, file_path: str):
-        """Open and display SSV file"""
+        """Open and display SSV file without blocking the UI"""
+        if self.open_job is not None:
+            self.open_job.cancelled.set()
+        
+        # Drop the previous document before decrypting the next one
+        self.current_data = None
+        self.close_image()
+        self.close_pdf()
+        self.close_workbook()
+        
+        job = OpenJob(file_path)
+        self.open_job = job
+        self.show_progress(job)
+        job.future = self.open_worker.submit(self.load_file, job)
+        self.root.after(OPEN_POLL_MS, self.poll_open, job)
+    
+    def load_file(self, job: OpenJob) -> tuple:
+        """Decrypt and parse on the open worker; returns (data, filename, prepared)"""
+        job.ssv_size = os.path.getsize(job.file_path)
+        
+        # Debug info
+        print(f"[DEBUG] File size: {job.ssv_size} bytes")
+        print(f"[DEBUG] Secret key (first 20 chars): {self.secret_key[:20]}...")
+        print(f"[DEBUG] Key hash: {hashlib.sha256(self.secret_key.encode()).hexdigest()[:40]}...")
+        
+        original_data, original_filename = self.decoder.parse_ssv_path(job.file_path, job.report)
+        job.decrypted = time.perf_counter()
+        
+        job.check()
+        job.stage = "Preparing preview"
+        prepared = self.prepare_content(original_data, original_filename)
         try:
-            with open(file_path, 'rb') as f:
-                ssv_data = f.read()
-            
-            # Debug info
-            print(f"[DEBUG] File size: {len(ssv_data)} bytes")
-            print(f"[DEBUG] Secret key (first 20 chars): {self.secret_key[:20]}...")
-            print(f"[DEBUG] Key hash: {hashlib.sha256(self.secret_key.encode()).hexdigest()[:40]}...")
-            
-            original_data, original_filename = self.decoder.parse_ssv_file(ssv_data)
-            
-            self.current_data = original_data
-            self.current_filename = original_filename
-            
-            file_size = len(original_data) / 1024
-            self.info_label.config(
-                text=f"📄 {original_filename} ({file_size:.1f} KB) - View Only"
-            )
-            
-            self.display_content(original_data, original_filename)
-            
+            job.check()
+        except OpenCancelled:
+            self.close_prepared(prepared)
+            raise
+        
+        return original_data, original_filename, prepared
+    
+    def show_progress(self, job: OpenJob):
+        """Replace the content area with a progress bar and a cancel button"""
+        self.hide_toolbars()
+        for widget in self.scrollable_frame.winfo_children():
+            widget.destroy()
+        
+        panel = tk.Frame(self.scrollable_frame, bg="#16213e")
+        panel.pack(expand=True, pady=200)
+        
+        self.progress_label = tk.Label(
+            panel,
+            text=f"🔓 Opening {os.path.basename(job.file_path)}",
+            font=("Arial", 12),
+            bg="#16213e",
+            fg="#aaaaaa"
+        )
+        self.progress_label.pack(pady=10)
+        
+        self.progress_bar = ttk.Progressbar(panel, length=400, mode="determinate", maximum=100)
+        self.progress_bar.pack(pady=10)
+        
+        tk.Button(
+            panel,
+            text="Cancel",
+            command=self.cancel_open,
+            font=("Arial", 10),
+            bg="#888888",
+            fg="#ffffff",
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            relief=tk.FLAT
+        ).pack(pady=10)
+        
+        self.status_label.config(text=f"Opening {job.file_path}")
+    
+    def cancel_open(self):
+        """Abort the file being opened"""
+        if self.open_job is not None:
+            self.open_job.cancelled.set()
+            self.progress_label.config(text="Cancelling…")
+    
+    def poll_open(self, job: OpenJob):
+        """Mirror the worker's progress until the job finishes"""
+        if job is not self.open_job:
+            # Superseded: nothing will display what it prepares, so close it once it finishes
+            job.future.add_done_callback(self.discard_open_result)
+            return
+        
+        if not job.future.done():
+            if not job.cancelled.is_set():
+                if job.total:
+                    self.progress_bar['value'] = 100 * job.done / job.total
+                self.progress_label.config(text=f"🔓 {job.stage} {os.path.basename(job.file_path)}…")
+            self.root.after(OPEN_POLL_MS, self.poll_open, job)
+            return
+        
+        self.open_job = None
+        try:
+            original_data, original_filename, prepared = job.future.result()
+        except OpenCancelled:
+            self.show_welcome()
+            self.status_label.config(text="Open cancelled")
+            return
         except Exception as e:
             import traceback
-            error_details = traceback.format_exc()
+            error_details = "".join(traceback.format_exception(type(e), e, e.__traceback__))
             print(f"[ERROR] {error_details}")
             
             messagebox.showerror(
                 "Decryption Error",
                 f"Failed to decrypt file:\n\n{str(e)}\n\n"
                 f"Debug info:\n"
-                f"File: {file_path}\n"
-                f"Size: {len(ssv_data) if 'ssv_data' in locals() else 'unknown'} bytes\n"
+                f"File: {job.file_path}\n"
+                f"Size: {job.ssv_size if job.ssv_size is not None else 'unknown'} bytes\n"
                 f"Key configured: {self.secret_key[:20]}...\n\n"
                 f"Possible causes:\n"
                 f"1. Wrong secret key\n2. Corrupted file\n3. File encrypted with different key\n\n"
                 f"Check console for detailed error."
             )
             self.show_welcome()
+            self.status_label.config(text="Ready")
+            return
+        
+        self.current_data = original_data
+        self.current_filename = original_filename
+        
+        file_size = len(original_data) / 1024
+        self.info_label.config(
+            text=f"📄 {original_filename} ({file_size:.1f} KB) - View Only"
+        )
+        
+        self.display_content(original_data, original_filename, prepared)
+        self.root.update_idletasks()
+        self.show_open_stats(time.perf_counter() - job.started, job.decrypted - job.started)
+    
+    def show_open_stats(self, open_seconds: float, decrypt_seconds: float):
+        """Report cold-open time and peak memory in the status bar"""
+        text = f"Opened in {open_seconds * 1000:.0f} ms (decrypt {decrypt_seconds * 1000:.0f} ms)"
+        peak = peak_rss_bytes()
+        if peak is not None:
+            text += f"  •  Peak RSS {peak / (1024 * 1024):.1f} MB"
+        self.status_label.config(text=text)
+    
+    def discard_open_result(self, future):
+        """Done-callback for an open job whose result will never be shown"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.close_prepared(future.result()[2])
     
-    def display_content(self, data: bytes, filename: str):
+    @staticmethod
+    def close_prepared(prepared):
+        """Release a prepared document that holds a file handle (PDF document, read-only workbook)"""
+        close = getattr(prepared, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"[DEBUG] Closing discarded preview failed: {e}")
+    
+    def prepare_content(self, data: bytes, filename: str):
+        """
+        Parse the document on the open worker so the UI thread only has to
+        build widgets. Returns None when there is nothing to prepare or
+        parsing failed; the display method then reports the error itself.
+        """
+        ext = os.path.splitext(filename)[1].lower()
+        kind = CONTENT_KINDS.get(ext)
+        try:
+            if kind == 'image' and PILLOW_AVAILABLE:
+                return self.parse_image(data)
+            if kind == 'text':
+                return self.parse_text(data)
+            if kind == 'pdf' and PDF_AVAILABLE:
+                return self.parse_pdf(data)
+            if kind == 'word' and ext == '.odt':
+                return self.parse_odt(data)
+            if kind == 'word' and DOCX_AVAILABLE:
+                return self.parse_word(data)
+            if kind == 'excel' and EXCEL_AVAILABLE:
+                return self.parse_excel(data)
+            if kind == 'powerpoint' and PPTX_AVAILABLE:
+                return self.parse_powerpoint(data)
+        except Exception as e:
+            print(f"[DEBUG] Background parse failed: {e}")
+        return None
+    
+    def display_content(self, data: bytes, filename: str, prepared=None):
         """Display content based on file type"""
         self.hide_toolbars()
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         
         ext = os.path.splitext(filename)[1].lower()
+        kind = CONTENT_KINDS.get(ext)
         
-        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-            self.display_image(data, filename)
-        elif ext in ['.txt', '.md', '.log', '.csv', '.json', '.xml', '.html', '.css', '.js', '.py', '.java', '.c', '.cpp']:
-            self.display_text(data, filename)
-        elif ext == '.pdf':
-            self.display_pdf(data, filename)
-        elif ext in ['.docx', '.odt']:
-            self.display_word(data, filename, ext)
-        elif ext in ['.xlsx', '.ods']:
-            self.display_excel(data, filename)
-        elif ext in ['.pptx', '.odp']:
-            self.display_powerpoint(data, filename)
+        if kind == 'image':
+            self.display_image(data, filename, prepared)
+        elif kind == 'text':
+            self.display_text(data, filename, prepared)
+        elif kind == 'pdf':
+            self.display_pdf(data, filename, prepared)
+        elif kind == 'word':
+            self.display_word(data, filename, ext, prepared)
+        elif kind == 'excel':
+            self.display_excel(data, filename, prepared)
+        elif kind == 'powerpoint':
+            self.display_powerpoint(data, filename, prepared)
         else:
             self.display_binary_info(data, filename)
     
-    def display_image(self, data: bytes, filename: str):
+    def parse_image(self, data: bytes) -> ImagePyramid:
+        image = Image.open(BytesIO(data))
+        # Decode now rather than on first draw
+        image.load()
+        return ImagePyramid(image)
+    
+    def display_image(self, data: bytes, filename: str, pyramid: ImagePyramid = None):
         """Display image with zoom support"""
         if not PILLOW_AVAILABLE:
             self.show_library_missing("Pillow", "image viewing", "pip install Pillow")
             return
         
         try:
-            self.current_image = Image.open(BytesIO(data))
+            self.close_image()
+            self.image_pyramid = pyramid or self.parse_image(data)
+            self.current_image = self.image_pyramid.levels[0]
             self.zoom_level = 1.0
             self.zoom_frame.pack(side=tk.LEFT, padx=20, pady=10)
+            self.build_image_view()
             self.render_image()
         except Exception as e:
             self.show_error(f"Failed to display image: {str(e)}")
     
-    def render_image(self):
-        """Render image at current zoom level"""
-        if not self.current_image:
-            return
+    def close_image(self):
+        """Forget the open image, its levels and its tiles"""
+        self.current_image = None
+        self.image_pyramid = None
+        self.image_canvas = None
+        self.image_tiles = {}
+        self.tile_cache.clear()
+        self.scroll_target = None
+    
+    def build_image_view(self):
+        """Canvas the tiles are drawn on; it is kept for the life of the image"""
+        self.root.update_idletasks()
+        viewport_width = max(self.canvas.winfo_width() - 20, 200)
+        viewport_height = max(self.canvas.winfo_height() - 60, 200)
         
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        frame = tk.Frame(self.scrollable_frame, bg="#16213e")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
         
-        # Calculate size
-        img_width, img_height = self.current_image.size
-        new_width = int(img_width * self.zoom_level)
-        new_height = int(img_height * self.zoom_level)
+        self.image_canvas = tk.Canvas(
+            frame,
+            width=viewport_width,
+            height=viewport_height,
+            bg="#16213e",
+            highlightthickness=0
+        )
+        x_scrollbar = tk.Scrollbar(frame, orient="horizontal", command=self.image_canvas.xview)
+        y_scrollbar = tk.Scrollbar(frame, orient="vertical", command=self.image_canvas.yview)
         
-        # Resize
-        resized = self.current_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        photo = ImageTk.PhotoImage(resized)
+        def on_scroll(scrollbar):
+            def update(first, last):
+                scrollbar.set(first, last)
+                self.schedule_tile_update()
+            return update
         
-        # Display - centered
-        label = tk.Label(self.scrollable_frame, image=photo, bg="#16213e")
-        label.image = photo
-        label.pack(expand=True, pady=20)
+        self.image_canvas.configure(xscrollcommand=on_scroll(x_scrollbar), yscrollcommand=on_scroll(y_scrollbar))
+        y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        self.image_canvas.pack(side="left", fill="both", expand=True)
         
-        # Update zoom label
-        self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
+        # Drag to pan
+        self.image_canvas.bind("<ButtonPress-1>", lambda e: self.image_canvas.scan_mark(e.x, e.y))
+        self.image_canvas.bind("<B1-Motion>", lambda e: self.image_canvas.scan_dragto(e.x, e.y, gain=1))
+        # A resize changes the centring offsets, so lay out again (tiles come from the cache)
+        self.image_canvas.bind("<Configure>", lambda e: self.render_image())
+        self.scroll_target = self.image_canvas
         
         # Watermark
         watermark = tk.Label(
@@ -448,6 +1077,97 @@ class SSVViewerApp:
         )
         watermark.pack(pady=10)
     
+    def render_image(self):
+        """Lay the image out at the current zoom level, keeping the view centred"""
+        if not self.current_image or not self.image_canvas:
+            return
+        
+        canvas = self.image_canvas
+        self.root.update_idletasks()
+        viewport_width, viewport_height = canvas.winfo_width(), canvas.winfo_height()
+        
+        # Fraction of the image at the centre of the view, to keep it there
+        center_x = center_y = 0.5
+        if self.image_tiles:
+            old_width, old_height = self.image_pyramid.zoomed_size(self.image_zoom_shown)
+            offset_x, offset_y = self.image_offset
+            center_x = (canvas.canvasx(viewport_width / 2) - offset_x) / old_width
+            center_y = (canvas.canvasy(viewport_height / 2) - offset_y) / old_height
+        
+        for item, _ in self.image_tiles.values():
+            canvas.delete(item)
+        self.image_tiles = {}
+        self.image_zoom_shown = self.zoom_level
+        
+        # Images smaller than the view are centred in it
+        width, height = self.image_pyramid.zoomed_size(self.zoom_level)
+        region_width, region_height = max(width, viewport_width), max(height, viewport_height)
+        self.image_offset = ((region_width - width) // 2, (region_height - height) // 2)
+        canvas.configure(scrollregion=(0, 0, region_width, region_height))
+        
+        if region_width > viewport_width:
+            canvas.xview_moveto(min(max((center_x * width - viewport_width / 2) / region_width, 0), 1))
+        if region_height > viewport_height:
+            canvas.yview_moveto(min(max((center_y * height - viewport_height / 2) / region_height, 0), 1))
+        
+        # Update zoom label
+        self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
+        
+        self.update_image_tiles()
+    
+    def schedule_tile_update(self):
+        """Coalesce scroll and resize events into one tile update per idle pass"""
+        if not self.image_update_pending:
+            self.image_update_pending = True
+            self.root.after_idle(self.update_image_tiles)
+    
+    def update_image_tiles(self):
+        """Draw the tiles that intersect the view and drop those that left it"""
+        self.image_update_pending = False
+        if not self.image_pyramid or not self.image_canvas or not self.image_canvas.winfo_exists():
+            return
+        
+        canvas = self.image_canvas
+        pyramid = self.image_pyramid
+        zoom = self.zoom_level
+        tile_size = pyramid.tile_size
+        offset_x, offset_y = self.image_offset
+        columns, rows = pyramid.tile_grid(zoom)
+        
+        # Visible tiles plus a one-tile margin so small pans need no new tiles
+        left = canvas.canvasx(0) - offset_x
+        top = canvas.canvasy(0) - offset_y
+        first_column = max(int(left // tile_size) - 1, 0)
+        first_row = max(int(top // tile_size) - 1, 0)
+        last_column = min(int((left + canvas.winfo_width()) // tile_size) + 1, columns - 1)
+        last_row = min(int((top + canvas.winfo_height()) // tile_size) + 1, rows - 1)
+        visible = {
+            (column, row)
+            for column in range(first_column, last_column + 1)
+            for row in range(first_row, last_row + 1)
+        }
+        
+        for position in list(self.image_tiles):
+            if position not in visible:
+                item, _ = self.image_tiles.pop(position)
+                canvas.delete(item)
+        
+        for column, row in sorted(visible - self.image_tiles.keys()):
+            key = (zoom, column, row)
+            tile = self.tile_cache.get(key)
+            if tile is None:
+                tile = pyramid.tile(zoom, column, row)
+                self.tile_cache.put(key, tile)
+            photo = ImageTk.PhotoImage(tile)
+            item = canvas.create_image(
+                offset_x + column * tile_size,
+                offset_y + row * tile_size,
+                image=photo,
+                anchor="nw"
+            )
+            # The PhotoImage must stay referenced for as long as it is drawn
+            self.image_tiles[(column, row)] = (item, photo)
+    
     def zoom_in(self):
         """Zoom in"""
         if self.zoom_level < 3.0:
@@ -465,20 +1185,89 @@ class SSVViewerApp:
         self.zoom_level = 1.0
         self.render_image()
     
-    def display_pdf(self, data: bytes, filename: str):
+    def parse_pdf(self, data: bytes):
+        return fitz.open(stream=data, filetype="pdf")
+    
+    def display_pdf(self, data: bytes, filename: str, document=None):
         """Display PDF with page navigation"""
         if not PDF_AVAILABLE:
             self.show_library_missing("PyMuPDF", "PDF viewing", "pip install PyMuPDF")
             return
         
         try:
-            self.pdf_document = fitz.open(stream=data, filetype="pdf")
+            self.close_pdf()
+            self.pdf_document = document or self.parse_pdf(data)
             self.current_page = 0
             self.pdf_nav_frame.pack(side=tk.LEFT, padx=20, pady=10)
             self.render_pdf_page()
         except Exception as e:
             self.show_error(f"Failed to display PDF: {str(e)}")
     
+    def close(self):
+        """Stop background work and close the window"""
+        if self.open_job is not None:
+            self.open_job.cancelled.set()
+        self.open_worker.shutdown(wait=False, cancel_futures=True)
+        self.close_pdf()
+        self.pdf_prefetcher.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def close_pdf(self):
+        """Forget the open PDF, its rendered pages and any pending prefetch"""
+        self.pdf_generation += 1
+        with self.pdf_lock:
+            if self.pdf_document is not None:
+                self.pdf_document.close()
+            self.pdf_document = None
+        self.pdf_cache.clear()
+    
+    def pdf_scale(self, page_index: int) -> float:
+        """Scale that fits the page to the viewport width"""
+        self.root.update_idletasks()
+        viewport = max(self.canvas.winfo_width() - 40, 200)
+        with self.pdf_lock:
+            page_width = self.pdf_document[page_index].rect.width or viewport
+        scale = min(max(viewport / page_width, PDF_MIN_SCALE), PDF_MAX_SCALE)
+        # Rounded so small resizes still hit the cache
+        return round(scale, 2)
+    
+    def _render_page(self, document, page_index: int, scale: float):
+        """Rasterize one page; callers hold pdf_lock"""
+        pix = document[page_index].get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        samples = getattr(pix, 'samples_mv', None) or pix.samples
+        return Image.frombytes("RGB", (pix.width, pix.height), samples, "raw", "RGB", pix.stride)
+    
+    def get_pdf_page(self, page_index: int, scale: float):
+        """Rendered page from the cache, rendering it on a miss"""
+        key = (page_index, scale)
+        image = self.pdf_cache.get(key)
+        if image is None:
+            with self.pdf_lock:
+                image = self.pdf_cache.get(key)
+                if image is None:
+                    image = self._render_page(self.pdf_document, page_index, scale)
+                    self.pdf_cache.put(key, image)
+        return image
+    
+    def prefetch_pdf_pages(self, page_index: int, scale: float):
+        """Render the neighbouring pages on the worker so page turns hit the cache"""
+        generation = self.pdf_generation
+        document = self.pdf_document
+        total_pages = len(document)
+        
+        def prefetch(index: int):
+            key = (index, scale)
+            with self.pdf_lock:
+                # Skip work for a document that has since been closed
+                if generation != self.pdf_generation or key in self.pdf_cache:
+                    return
+                self.pdf_cache.put(key, self._render_page(document, index, scale))
+        
+        for distance in range(1, PDF_PREFETCH_PAGES + 1):
+            for index in (page_index + distance, page_index - distance):
+                if 0 <= index < total_pages:
+                    self.pdf_prefetcher.submit(prefetch, index)
+    
     def render_pdf_page(self):
         """Render current PDF page"""
         if not self.pdf_document:
@@ -487,9 +1276,8 @@ class SSVViewerApp:
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         
-        page = self.pdf_document[self.current_page]
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for clarity
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        scale = self.pdf_scale(self.current_page)
+        img = self.get_pdf_page(self.current_page, scale)
         
         photo = ImageTk.PhotoImage(img)
         label = tk.Label(self.scrollable_frame, image=photo, bg="#16213e")
@@ -509,6 +1297,8 @@ class SSVViewerApp:
             fg="#888888"
         )
         watermark.pack(pady=10)
+        
+        self.prefetch_pdf_pages(self.current_page, scale)
     
     def pdf_next_page(self):
         """Go to next PDF page"""
@@ -522,11 +1312,14 @@ class SSVViewerApp:
             self.current_page -= 1
             self.render_pdf_page()
     
-    def display_word(self, data: bytes, filename: str, ext: str = '.docx'):
+    def parse_word(self, data: bytes) -> list:
+        return [para.text for para in Document(BytesIO(data)).paragraphs]
+    
+    def display_word(self, data: bytes, filename: str, ext: str = '.docx', paragraphs: list = None):
         """Display Word document or ODT"""
         # Handle ODT files
         if ext == '.odt':
-            self.display_odt(data, filename)
+            self.display_odt(data, filename, paragraphs)
             return
             
         if not DOCX_AVAILABLE:
@@ -534,7 +1327,8 @@ class SSVViewerApp:
             return
         
         try:
-            doc = Document(BytesIO(data))
+            if paragraphs is None:
+                paragraphs = self.parse_word(data)
             
             text_widget = scrolledtext.ScrolledText(
                 self.scrollable_frame,
@@ -547,8 +1341,7 @@ class SSVViewerApp:
             )
             text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
             
-            for para in doc.paragraphs:
-                text_widget.insert(tk.END, para.text + "\n\n")
+            text_widget.insert(tk.END, "".join(text + "\n\n" for text in paragraphs))
             
             text_widget.config(state=tk.DISABLED)
             
@@ -565,80 +1358,87 @@ class SSVViewerApp:
             # Try to display as text if docx parsing fails
             self.display_text(data, filename)
     
-    def display_odt(self, data: bytes, filename: str):
+    def parse_odt(self, data: bytes) -> list:
+        import zipfile
+        from xml.etree import ElementTree as ET
+        
+        with zipfile.ZipFile(BytesIO(data)) as zf:
+            content = zf.read('content.xml')
+        root = ET.fromstring(content)
+        
+        # Extract text from ODT
+        return [elem.text for elem in root.iter() if elem.text]
+    
+    def display_odt(self, data: bytes, filename: str, text_content: list = None):
         """Display ODT (OpenDocument Text) file"""
         try:
-            import zipfile
-            from xml.etree import ElementTree as ET
+            if text_content is None:
+                text_content = self.parse_odt(data)
             
-            with zipfile.ZipFile(BytesIO(data)) as zf:
-                content = zf.read('content.xml')
-                root = ET.fromstring(content)
-                
-                # Extract text from ODT
-                text_content = []
-                for elem in root.iter():
-                    if elem.text:
-                        text_content.append(elem.text)
-                
-                text_widget = scrolledtext.ScrolledText(
-                    self.scrollable_frame,
-                    wrap=tk.WORD,
-                    font=("Arial", 11),
-                    bg="#0f3460",
-                    fg="#ffffff",
-                    padx=15,
-                    pady=15
-                )
-                text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-                text_widget.insert(tk.END, '\n'.join(text_content))
-                text_widget.config(state=tk.DISABLED)
-                
-                watermark = tk.Label(
-                    self.scrollable_frame,
-                    text=f"🔒 {filename} - View Only Mode",
-                    font=("Arial", 10),
-                    bg="#16213e",
-                    fg="#888888"
-                )
-                watermark.pack(pady=5)
+            text_widget = scrolledtext.ScrolledText(
+                self.scrollable_frame,
+                wrap=tk.WORD,
+                font=("Arial", 11),
+                bg="#0f3460",
+                fg="#ffffff",
+                padx=15,
+                pady=15
+            )
+            text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            text_widget.insert(tk.END, '\n'.join(text_content))
+            text_widget.config(state=tk.DISABLED)
+            
+            watermark = tk.Label(
+                self.scrollable_frame,
+                text=f"🔒 {filename} - View Only Mode",
+                font=("Arial", 10),
+                bg="#16213e",
+                fg="#888888"
+            )
+            watermark.pack(pady=5)
         except Exception as e:
             self.show_error(f"Failed to display ODT: {str(e)}")
     
-    def display_excel(self, data: bytes, filename: str):
+    def parse_excel(self, data: bytes):
+        # Read-only mode streams each sheet's XML instead of building every cell
+        return openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    
+    def display_excel(self, data: bytes, filename: str, workbook=None):
         """Display Excel spreadsheet"""
         if not EXCEL_AVAILABLE:
             self.show_library_missing("openpyxl", "Excel viewing", "pip install openpyxl")
             return
         
         try:
-            wb = openpyxl.load_workbook(BytesIO(data))
+            self.close_workbook()
+            self.workbook = workbook or self.parse_excel(data)
+            
+            self.root.update_idletasks()
+            viewport_height = max(self.canvas.winfo_height() - 100, 200)
             
             # Create notebook for sheets
-            notebook = ttk.Notebook(self.scrollable_frame)
+            notebook = ttk.Notebook(self.scrollable_frame, height=viewport_height)
             notebook.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
             
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                
+            # Sheets are parsed only when their tab is first selected
+            frames = {}
+            for sheet_name in self.workbook.sheetnames:
                 frame = tk.Frame(notebook, bg="#0f3460")
-                text_widget = scrolledtext.ScrolledText(
-                    frame,
-                    wrap=tk.NONE,
-                    font=("Consolas", 10),
-                    bg="#0f3460",
-                    fg="#ffffff",
-                    padx=10,
-                    pady=10
-                )
-                text_widget.pack(fill=tk.BOTH, expand=True)
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = "\t".join([str(cell) if cell is not None else "" for cell in row])
-                    text_widget.insert(tk.END, row_text + "\n")
-                
-                text_widget.config(state=tk.DISABLED)
                 notebook.add(frame, text=sheet_name)
+                frames[str(frame)] = (frame, sheet_name)
+            
+            def on_tab_changed(event):
+                frame, sheet_name = frames[notebook.select()]
+                grid = getattr(frame, 'grid_view', None)
+                if grid is None:
+                    grid = VirtualGrid(frame, SheetRows(self.workbook[sheet_name]))
+                    grid.pack(fill=tk.BOTH, expand=True)
+                    frame.grid_view = grid
+                self.scroll_target = grid
+            
+            notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+            if frames:
+                on_tab_changed(None)
             
             watermark = tk.Label(
                 self.scrollable_frame,
@@ -652,14 +1452,29 @@ class SSVViewerApp:
         except Exception as e:
             self.show_error(f"Failed to display Excel file: {str(e)}")
     
-    def display_powerpoint(self, data: bytes, filename: str):
+    def close_workbook(self):
+        """Close the open read-only workbook and its archive"""
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+        self.scroll_target = None
+    
+    def parse_powerpoint(self, data: bytes) -> list:
+        """Text of every shape, slide by slide"""
+        return [
+            [shape.text for shape in slide.shapes if hasattr(shape, "text")]
+            for slide in Presentation(BytesIO(data)).slides
+        ]
+    
+    def display_powerpoint(self, data: bytes, filename: str, slides: list = None):
         """Display PowerPoint presentation"""
         if not PPTX_AVAILABLE:
             self.show_library_missing("python-pptx", "PowerPoint viewing", "pip install python-pptx")
             return
         
         try:
-            prs = Presentation(BytesIO(data))
+            if slides is None:
+                slides = self.parse_powerpoint(data)
             
             text_widget = scrolledtext.ScrolledText(
                 self.scrollable_frame,
@@ -672,11 +1487,10 @@ class SSVViewerApp:
             )
             text_widget.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
             
-            for i, slide in enumerate(prs.slides, 1):
+            for i, texts in enumerate(slides, 1):
                 text_widget.insert(tk.END, f"=== Slide {i} ===\n\n", "heading")
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text_widget.insert(tk.END, shape.text + "\n\n")
+                for text in texts:
+                    text_widget.insert(tk.END, text + "\n\n")
                 text_widget.insert(tk.END, "\n" + "="*50 + "\n\n")
             
             text_widget.tag_config("heading", font=("Arial", 12, "bold"))
@@ -684,7 +1498,7 @@ class SSVViewerApp:
             
             watermark = tk.Label(
                 self.scrollable_frame,
-                text=f"🔒 {filename} - View Only Mode - {len(prs.slides)} slides",
+                text=f"🔒 {filename} - View Only Mode - {len(slides)} slides",
                 font=("Arial", 10),
                 bg="#16213e",
                 fg="#888888"
@@ -694,26 +1508,22 @@ class SSVViewerApp:
         except Exception as e:
             self.show_error(f"Failed to display PowerPoint: {str(e)}")
     
-    def display_text(self, data: bytes, filename: str):
+    def parse_text(self, data: bytes) -> TextDocument:
+        return TextDocument(data)
+    
+    def display_text(self, data: bytes, filename: str, document: TextDocument = None):
         """Display text content"""
         try:
-            try:
-                text_content = data.decode('utf-8')
-            except:
-                text_content = data.decode('latin-1')
+            if document is None:
+                document = self.parse_text(data)
             
-            text_widget = scrolledtext.ScrolledText(
-                self.scrollable_frame,
-                wrap=tk.WORD,
-                font=("Consolas", 11),
-                bg="#0f3460",
-                fg="#ffffff",
-                padx=15,
-                pady=15
-            )
-            text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-            text_widget.insert(1.0, text_content)
-            text_widget.config(state=tk.DISABLED)
+            self.root.update_idletasks()
+            viewport_height = max(self.canvas.winfo_height() - 60, 200)
+            
+            text_view = VirtualText(self.scrollable_frame, document, height=viewport_height)
+            text_view.pack_propagate(False)
+            text_view.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            self.scroll_target = text_view
             
             watermark = tk.Label(
                 self.scrollable_frame,
@@ -786,7 +1596,7 @@ def main():
     
     root = tk.Tk()
     app = SSVViewerApp(root, ssv_file)
-    root.protocol("WM_DELETE_WINDOW", root.destroy)
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
 
 
@@ -19,6 +19,8 @@ function App() {
     return saved ? 'dashboard' : 'home'
   })
   const [files, setFiles] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [selectedFile, setSelectedFile] = useState(null)
   const [loading, setLoading] = useState(false)
   const [uploading, setUploading] = useState(false)
@@ -58,7 +60,8 @@ function App() {
     try {
       setLoading(true)
       const data = await listFiles()
-      setFiles(data)
+      setFiles(data.files)
+      setNextCursor(data.next_cursor)
     } catch (error) {
       showMessage('error', 'Failed to load files')
     } finally {
@@ -66,6 +69,20 @@ function App() {
     }
   }
 
+  const loadMoreFiles = async () => {
+    if (!nextCursor || loadingMore) return
+    try {
+      setLoadingMore(true)
+      const data = await listFiles({ cursor: nextCursor })
+      setFiles(prev => [...prev, ...data.files])
+      setNextCursor(data.next_cursor)
+    } catch (error) {
+      showMessage('error', 'Failed to load more files')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleUpload = async () => {
     if (!selectedFile) return
     try {
@@ -283,6 +300,11 @@ function App() {
                     </tbody>
                   </table>
                 )}
+                {!loading && nextCursor && (
+                  <button className="btn btn-ghost" style={{ width: '100%', marginTop: '1rem' }} onClick={loadMoreFiles} disabled={loadingMore}>
+                    {loadingMore ? 'Loading...' : 'Load more files'}
+                  </button>
+                )}
               </div>
             </div>
 
@@ -326,7 +348,7 @@ function App() {
                 <div style={{ display: 'grid', gap: '1rem' }}>
                   <div style={{ display: 'flex', justifyContent: 'space-between', padding: '0.75rem', background: 'rgba(255,255,255,0.02)', borderRadius: '10px' }}>
                     <span style={{ color: 'var(--text-muted)' }}>Total Files</span>
-                    <span style={{ fontWeight: 600 }}>{files.length}</span>
+                    <span style={{ fontWeight: 600 }}>{files.length}{nextCursor ? '+' : ''}</span>
                   </div>
                   <div style={{ display: 'flex', justifyContent: 'space-between', padding: '0.75rem', background: 'rgba(255,255,255,0.02)', borderRadius: '10px' }}>
                     <span style={{ color: 'var(--text-muted)' }}>Total Size</span>
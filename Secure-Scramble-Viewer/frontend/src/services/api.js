@@ -22,8 +22,63 @@ export const uploadFile = async (file) => {
   return response.data;
 };
 
-export const listFiles = async () => {
-  const response = await api.get('/files');
+export const uploadFiles = async (files) => {
+  const formData = new FormData();
+  for (const file of files) {
+    formData.append('files', file);
+  }
+  
+  const response = await api.post('/upload/batch', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  });
+  
+  return response.data.files;
+};
+
+// Resumable upload for large files: each PUT carries a few SSV chunks, and a
+// dropped request is retried from the offset the server last acknowledged.
+export const uploadFileResumable = async (file, { chunksPerRequest = 8, onProgress } = {}) => {
+  const { data: session } = await api.post('/uploads', {
+    filename: file.name,
+    size: file.size,
+    mime_type: file.type || null,
+  });
+  
+  const step = session.chunk_size * chunksPerRequest;
+  let offset = session.received;
+  
+  while (offset < file.size) {
+    try {
+      const { data } = await api.put(`/uploads/${session.upload_id}`, file.slice(offset, offset + step), {
+        params: { offset },
+        headers: { 'Content-Type': 'application/octet-stream' },
+      });
+      offset = data.received;
+    } catch (error) {
+      const { data } = await api.get(`/uploads/${session.upload_id}`);
+      if (data.received === offset) throw error;
+      offset = data.received;
+    }
+    
+    if (onProgress) onProgress(offset / file.size);
+  }
+  
+  const response = await api.post(`/uploads/${session.upload_id}/finalize`);
+  return response.data;
+};
+
+export const listFiles = async ({ cursor, limit, mimeType, filenamePrefix } = {}) => {
+  const response = await api.get('/files', {
+    params: {
+      cursor,
+      limit,
+      mime_type: mimeType,
+      filename_prefix: filenamePrefix,
+    },
+  });
+  
   return response.data;
 };
 
@@ -35,6 +90,14 @@ export const downloadFile = async (fileId) => {
   return response.data;
 };
 
+export const downloadFiles = async (fileIds) => {
+  const response = await api.post('/download/batch', { file_ids: fileIds }, {
+    responseType: 'blob',
+  });
+  
+  return response.data;
+};
+
 export const deleteFile = async (fileId) => {
   const response = await api.delete(`/files/${fileId}`);
   return response.data;